@@ -0,0 +1,157 @@
+"""Desenho de autômatos grandes com QGraphicsScene (usado por simulador_v2.py).
+
+Em vez de recalcular e redesenhar tudo a cada `paintEvent`, cada estado e cada
+transição vira um item da cena uma única vez, com a geometria (linha, seta, laço)
+já calculada. O índice espacial da cena (árvore BSP) faz com que só os itens dentro
+da área visível sejam desenhados, e os itens são do Qt (QGraphicsEllipseItem,
+QGraphicsPathItem), então o desenho não passa por Python.
+
+Nível de detalhe: com pouco zoom os nomes e símbolos (a maioria dos itens) são
+escondidos de uma vez, pelo item que agrupa os rótulos. Destacar estados ativos só
+muda o pincel dos estados que entraram ou saíram do destaque, e o Qt redesenha apenas
+a área deles.
+"""
+import math
+
+from PyQt5.QtCore import QPointF, QRectF, Qt
+from PyQt5.QtGui import QBrush, QColor, QFont, QPainter, QPainterPath, QPen
+from PyQt5.QtWidgets import (QGraphicsEllipseItem, QGraphicsPathItem, QGraphicsRectItem,
+                             QGraphicsScene, QGraphicsSimpleTextItem, QGraphicsView)
+
+RAIO = 20
+ESCALA_ROTULOS = 0.45  # Abaixo desta escala os rótulos ficam escondidos
+ESCALA_MINIMA = 0.002
+ESCALA_MAXIMA = 8.0
+
+
+def _caminho_transicao(origem, destino, deslocamento):
+    """Linha com seta (ou laço) e ponto do símbolo de uma transição."""
+    caminho = QPainterPath()
+    if origem == destino:
+        caminho.addEllipse(QRectF(origem[0] - 30, origem[1] - 60, 60, 40))
+        return caminho, QPointF(origem[0] - 5, origem[1] - 62 - deslocamento)
+    caminho.moveTo(*origem)
+    caminho.lineTo(*destino)
+    angulo = math.atan2(destino[1] - origem[1], destino[0] - origem[0])
+    ponta = QPointF(destino[0] - RAIO * math.cos(angulo), destino[1] - RAIO * math.sin(angulo))
+    abertura = math.pi / 6
+    caminho.moveTo(ponta)
+    caminho.lineTo(ponta.x() - 10 * math.cos(angulo - abertura), ponta.y() - 10 * math.sin(angulo - abertura))
+    caminho.lineTo(ponta.x() - 10 * math.cos(angulo + abertura), ponta.y() - 10 * math.sin(angulo + abertura))
+    caminho.closeSubpath()
+    meio = QPointF((origem[0] + destino[0]) / 2 + deslocamento, (origem[1] + destino[1]) / 2 + deslocamento)
+    return caminho, meio
+
+
+class CenaAutomato(QGraphicsScene):
+    """Itens de estados e transições, montados uma vez e atualizados só no que muda."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.itens = {}   # nome -> QGraphicsEllipseItem do estado
+        self.posicoes = {}
+        self.ativos = set()
+        self.rotulos = None
+        self.fonte = QFont("Arial", 10)
+        self.pincel_ativo = QBrush(Qt.green)
+        self.pincel_inativo = QBrush(Qt.white)
+        self.caneta = QPen(Qt.black, 0)  # Cosmética: espessura constante em qualquer zoom
+
+    def montar(self, nomes, transicoes, finais, posicoes):
+        """Recria os itens; `transicoes` é uma sequência de (origem, símbolo, destino) por nome
+        e `posicoes` dá (x, y) para cada nome, na mesma ordem de `nomes`."""
+        self.clear()
+        self.itens = {}
+        self.posicoes = dict(zip(nomes, map(tuple, posicoes)))
+        self.ativos = set()
+        # Todos os textos ficam sob um único item, escondido de uma vez no zoom afastado
+        self.rotulos = QGraphicsRectItem()
+        self.rotulos.setPen(QPen(Qt.NoPen))
+        self.rotulos.setZValue(2)
+        self.addItem(self.rotulos)
+
+        vistos = {}  # (origem, destino) -> transições já desenhadas entre eles
+        for origem, simbolo, destino in transicoes:
+            deslocamento = 20 * vistos.get((origem, destino), 0)
+            vistos[(origem, destino)] = vistos.get((origem, destino), 0) + 1
+            caminho, meio = _caminho_transicao(self.posicoes[origem], self.posicoes[destino],
+                                               deslocamento)
+            item = QGraphicsPathItem(caminho)
+            item.setPen(self.caneta)
+            if origem != destino:
+                item.setBrush(QBrush(Qt.black))  # Preenche a seta (laços não têm seta)
+            self.addItem(item)
+            self._rotulo("(ε)" if simbolo == 'ε' else simbolo, meio)
+
+        for nome in nomes:
+            x, y = self.posicoes[nome]
+            item = QGraphicsEllipseItem(x - RAIO, y - RAIO, 2 * RAIO, 2 * RAIO)
+            item.setPen(self.caneta)
+            item.setBrush(self.pincel_inativo)
+            item.setZValue(1)
+            if nome in finais:
+                # Círculo externo dos estados finais, filho do estado para acompanhar o destaque
+                anel = QGraphicsEllipseItem(x - RAIO - 5, y - RAIO - 5, 2 * RAIO + 10, 2 * RAIO + 10, item)
+                anel.setPen(self.caneta)
+                anel.setFlag(QGraphicsEllipseItem.ItemStacksBehindParent)
+            self.addItem(item)
+            self.itens[nome] = item
+            self._rotulo(nome, QPointF(x - 10, y - 8))
+        self.setSceneRect(self.itemsBoundingRect().adjusted(-40, -40, 40, 40))
+
+    def _rotulo(self, texto, ponto):
+        rotulo = QGraphicsSimpleTextItem(texto, self.rotulos)
+        rotulo.setFont(self.fonte)
+        rotulo.setPos(ponto)
+
+    def destacar(self, estados):
+        """Pinta de verde os `estados` ativos; só os itens que mudaram são redesenhados."""
+        estados = set(estados) & self.itens.keys()
+        for nome in self.ativos - estados:
+            self.itens[nome].setBrush(self.pincel_inativo)
+        for nome in estados - self.ativos:
+            self.itens[nome].setBrush(self.pincel_ativo)
+        self.ativos = estados
+
+    def mostrar_rotulos(self, mostrar):
+        if self.rotulos is not None and self.rotulos.isVisible() != mostrar:
+            self.rotulos.setVisible(mostrar)
+
+
+class VisaoAutomato(QGraphicsView):
+    """Visão da `CenaAutomato` com zoom pela roda do mouse e arraste para mover."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cena = CenaAutomato(self)
+        self.setScene(self.cena)
+        self.setRenderHint(QPainter.Antialiasing)
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setViewportUpdateMode(QGraphicsView.MinimalViewportUpdate)
+        self.setOptimizationFlags(QGraphicsView.DontSavePainterState
+                                  | QGraphicsView.DontAdjustForAntialiasing)
+        self.setBackgroundBrush(QBrush(QColor("white")))
+
+    def escala(self):
+        return self.transform().m11()
+
+    def wheelEvent(self, event):
+        fator = 1.25 if event.angleDelta().y() > 0 else 0.8
+        escala = self.escala() * fator
+        if ESCALA_MINIMA <= escala <= ESCALA_MAXIMA:
+            self.scale(fator, fator)
+            self._ajustar_detalhe()
+
+    def enquadrar(self):
+        """Mostra a cena inteira (sem ampliar além de 1:1)."""
+        self.resetTransform()
+        retangulo = self.cena.sceneRect()
+        if retangulo.width() > self.viewport().width() or retangulo.height() > self.viewport().height():
+            self.fitInView(retangulo, Qt.KeepAspectRatio)
+        self._ajustar_detalhe()
+
+    def _ajustar_detalhe(self):
+        self.cena.mostrar_rotulos(self.escala() >= ESCALA_ROTULOS)
+        # Antialiasing custa caro com milhares de itens visíveis e pouco se nota de longe
+        self.setRenderHint(QPainter.Antialiasing, self.escala() >= ESCALA_ROTULOS)
@@ -0,0 +1,137 @@
+"""Controles de linha do tempo compartilhados pelos simuladores passo a passo."""
+from PyQt5.QtCore import QTimer, Qt, pyqtSignal
+from PyQt5.QtWidgets import QComboBox, QHBoxLayout, QLabel, QPushButton, QSlider, QSpinBox, QWidget
+
+# Rótulo e passos por segundo de cada velocidade; None reproduz sem limite
+VELOCIDADES = (
+    ("1 passo/s", 1),
+    ("2 passos/s", 2),
+    ("5 passos/s", 5),
+    ("10 passos/s", 10),
+    ("100 passos/s", 100),
+    ("1000 passos/s", 1000),
+    ("Sem limite", None),
+)
+QUADRO_MS = 16  # Intervalo mínimo entre atualizações da tela
+
+
+class ControleLinhaDoTempo(QWidget):
+    """Barra com início, voltar, reproduzir, avançar, fim, salto para um passo e velocidade.
+
+    Opera sobre uma `nucleo.linha_do_tempo.LinhaDoTempo` e emite `posicao_alterada` a
+    cada mudança de posição; quem exibe a simulação lê a configuração da linha.
+    """
+    posicao_alterada = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.linha = None
+        self.tocando = False
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._tique)
+
+        self.inicio_button = QPushButton("|<", self)
+        self.inicio_button.clicked.connect(lambda: self.ir_para(0))
+        self.voltar_button = QPushButton("<", self)
+        self.voltar_button.clicked.connect(self.voltar)
+        self.tocar_button = QPushButton("Reproduzir", self)
+        self.tocar_button.clicked.connect(self.alternar)
+        self.avancar_button = QPushButton(">", self)
+        self.avancar_button.clicked.connect(self.avancar)
+        self.fim_button = QPushButton(">|", self)
+        self.fim_button.clicked.connect(lambda: self.ir_para(self.linha.fim))
+        self.slider = QSlider(Qt.Horizontal, self)
+        self.slider.valueChanged.connect(self.ir_para)
+        self.passo_spin = QSpinBox(self)
+        self.passo_spin.setPrefix("Passo ")
+        self.passo_spin.valueChanged.connect(self.ir_para)
+        self.total_label = QLabel("/ 0", self)
+        self.velocidade_combo = QComboBox(self)
+        for rotulo, _ in VELOCIDADES:
+            self.velocidade_combo.addItem(rotulo)
+        self.velocidade_combo.currentIndexChanged.connect(self._ajustar_timer)
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        for widget in (self.inicio_button, self.voltar_button, self.tocar_button,
+                       self.avancar_button, self.fim_button, self.slider, self.passo_spin,
+                       self.total_label, self.velocidade_combo):
+            layout.addWidget(widget)
+        self.setLayout(layout)
+        self.definir_linha(None)
+
+    def definir_linha(self, linha):
+        """Troca a simulação exibida e volta para o passo 0."""
+        self.pausar()
+        self.linha = linha
+        total = len(linha) if linha is not None else 0
+        for widget in (self.slider, self.passo_spin):
+            widget.blockSignals(True)
+            widget.setRange(0, total)
+            widget.setValue(0)
+            widget.blockSignals(False)
+        self.total_label.setText(f"/ {total}")
+        self.setEnabled(linha is not None)
+        if linha is not None:
+            self.ir_para(0)
+
+    def ir_para(self, posicao):
+        if self.linha is None:
+            return
+        self.linha.ir_para(posicao)
+        posicao = self.linha.posicao
+        for widget in (self.slider, self.passo_spin):
+            if widget.value() != posicao:
+                widget.blockSignals(True)
+                widget.setValue(posicao)
+                widget.blockSignals(False)
+        self.posicao_alterada.emit(posicao)
+
+    def avancar(self):
+        if self.linha is not None:
+            self.ir_para(self.linha.posicao + 1)
+
+    def voltar(self):
+        if self.linha is not None:
+            self.ir_para(self.linha.posicao - 1)
+
+    def reproduzir(self):
+        if self.linha is None:
+            return
+        if self.linha.terminou:
+            self.ir_para(0)
+        self.tocando = True
+        self.tocar_button.setText("Pausar")
+        self._ajustar_timer()
+
+    def pausar(self):
+        self.tocando = False
+        self.timer.stop()
+        self.tocar_button.setText("Reproduzir")
+
+    def alternar(self):
+        if self.tocando:
+            self.pausar()
+        else:
+            self.reproduzir()
+
+    def _ritmo(self):
+        """(intervalo do timer em ms, passos por disparo) para a velocidade escolhida."""
+        por_segundo = VELOCIDADES[self.velocidade_combo.currentIndex()][1]
+        if por_segundo is None:
+            # Sem limite: um bloco entre pontos de controle por disparo, sem esperar
+            return 0, self.linha.intervalo if self.linha is not None else 1
+        intervalo = max(1000 // por_segundo, QUADRO_MS)
+        return intervalo, max(1, por_segundo * intervalo // 1000)
+
+    def _ajustar_timer(self):
+        if self.tocando:
+            self.timer.start(self._ritmo()[0])
+
+    def _tique(self):
+        if self.linha is None or self.linha.terminou:
+            self.pausar()
+            return
+        self.ir_para(min(self.linha.posicao + self._ritmo()[1], self.linha.fim))
+        if self.linha.terminou:
+            self.pausar()
@@ -6,5 +6,6 @@ conda activate lfa
 #Instalar os seguintes pacotes:
 pip install pyqt5
 pip install graphviz
+pip install numpy
 
 
@@ -0,0 +1 @@
+"""Núcleo dos simuladores: motores de simulação sem dependência de interface gráfica."""
@@ -0,0 +1,5 @@
+import sys
+
+from nucleo.cli import main
+
+sys.exit(main())
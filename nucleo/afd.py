@@ -0,0 +1,381 @@
+"""Modelo de autômato finito determinístico usado por simulator_automato.py.
+
+Não depende de PyQt5; o graphviz só é importado quando `gerar_grafo` é chamado.
+"""
+import os
+from array import array
+from collections.abc import Mapping, MutableMapping
+
+from nucleo.binario import EXTENSAO as EXTENSAO_BINARIA, carregar_binario, salvar_binario
+from nucleo.compilado import AutomatoCompilado
+from nucleo.fluxo import classificar_linhas, simular_fluxo
+from nucleo.minimizacao import minimizar
+from nucleo.prefixos import simular_prefixos
+from nucleo.transicoes import TabelaTransicoes
+
+
+# Classe para representar um estado do autômato
+class Estado:
+    """Um estado do `Automato`: só o autômato e o id; nome, aceitação e transições ficam nas tabelas dele.
+
+    Os objetos são criados sob demanda: dois acessos ao mesmo estado dão objetos iguais
+    (`==`), mas não necessariamente o mesmo objeto.
+    """
+    __slots__ = ('automato', 'id')
+
+    def __init__(self, automato, id):
+        self.automato = automato
+        self.id = id
+
+    @property
+    def nome(self):
+        return self.automato.grafo.nomes[self.id]
+
+    @property
+    def final(self):
+        return bool(self.automato.finais[self.id])
+
+    @final.setter
+    def final(self, final):
+        self.automato.finais[self.id] = bool(final)
+        self.automato.invalidar()
+
+    @property
+    def transicoes(self):
+        """Vista { símbolo: estado } das transições que saem deste estado."""
+        return TransicoesEstado(self.automato, self.id)
+
+    def __eq__(self, outro):
+        return isinstance(outro, Estado) and outro.automato is self.automato and outro.id == self.id
+
+    def __hash__(self):
+        return hash((id(self.automato), self.id))
+
+    def __repr__(self):
+        return f"Estado({self.nome!r}, final={self.final})"
+
+
+class TransicoesEstado(MutableMapping):
+    """Vista { símbolo: Estado } sobre a linha de um estado na `TabelaTransicoes`."""
+    __slots__ = ('automato', 'id', '_linha', '_versao')
+
+    def __init__(self, automato, id):
+        self.automato = automato
+        self.id = id
+        self._linha = None
+        self._versao = None
+
+    def _ler(self):
+        grafo = self.automato.grafo
+        if self._versao != grafo.versao:
+            self._linha = grafo.linha(self.id)
+            self._versao = grafo.versao
+        return self._linha
+
+    def __getitem__(self, simbolo):
+        destino = self._ler().get(self.automato.grafo.codigos.get(simbolo))
+        if destino is None:
+            raise KeyError(simbolo)
+        return Estado(self.automato, destino)
+
+    def __iter__(self):
+        simbolos = self.automato.grafo.simbolos
+        return iter([simbolos[codigo] for codigo in self._ler()])
+
+    def __len__(self):
+        return len(self._ler())
+
+    def __setitem__(self, simbolo, estado):
+        self.automato.adicionar_transicao(self.automato.grafo.nomes[self.id], simbolo, estado.nome)
+
+    def __delitem__(self, simbolo):
+        self.automato.remover_transicao(self.automato.grafo.nomes[self.id], simbolo)
+
+
+class EstadosAutomato(Mapping):
+    """Vista { nome: Estado } dos estados de um `Automato`, na ordem em que foram criados."""
+    __slots__ = ('automato',)
+
+    def __init__(self, automato):
+        self.automato = automato
+
+    def __getitem__(self, nome):
+        return Estado(self.automato, self.automato.grafo.ids[nome])
+
+    def __contains__(self, nome):
+        return nome in self.automato.grafo.ids
+
+    def __iter__(self):
+        return iter(self.automato.grafo.nomes)
+
+    def __len__(self):
+        return len(self.automato.grafo.nomes)
+
+
+# Classe para representar um autômato
+class Automato:
+    def __init__(self, nome):
+        self.nome = nome
+        self.grafo = TabelaTransicoes()  # Nomes, símbolos e transições em vetores de inteiros
+        self.finais = bytearray()  # id -> 1 se o estado é de aceitação
+        self._inicial = None  # id do estado inicial
+        self._compilado = None  # Tabela densa, refeita após qualquer alteração
+
+    @property
+    def estados(self):
+        return EstadosAutomato(self)
+
+    @property
+    def estado_inicial(self):
+        return None if self._inicial is None else Estado(self, self._inicial)
+
+    @estado_inicial.setter
+    def estado_inicial(self, estado):
+        self._inicial = None if estado is None else self.grafo.ids[estado.nome]
+        self._compilado = None
+
+    def compilar(self):
+        """Devolve a forma compilada (tabela densa) do autômato, recompilando só após alterações."""
+        if self._compilado is None:
+            self._compilado = AutomatoCompilado.compilar(self)
+        return self._compilado
+
+    def invalidar(self):
+        """Descarta a forma compilada; use após alterar um `Estado` diretamente."""
+        self._compilado = None
+
+    def definir_estado_inicial(self, nome):
+        if nome in self.grafo.ids:
+            self._inicial = self.grafo.ids[nome]
+            self._compilado = None
+        else:
+            raise ValueError(f"Estado inicial '{nome}' não existe no automato.")
+        
+    def adicionar_estado(self, nome, final=False):
+        estado = self.grafo.ids.get(nome)
+        if estado is None:
+            estado = self.grafo.estado(nome)
+            self.finais.append(bool(final))
+        else:
+            # Readicionar um estado o recria: as transições que saem dele são descartadas
+            self.finais[estado] = bool(final)
+            for codigo in self.grafo.linha(estado):
+                self.grafo.remover(estado, codigo)
+        if self._inicial is None:
+            self._inicial = estado
+        self._compilado = None
+
+    def adicionar_transicao(self, origem, simbolo, destino):
+        ids = self.grafo.ids
+        if origem in ids and destino in ids:
+            self.grafo.acrescentar(ids[origem], self.grafo.codigo(simbolo), ids[destino])
+            self._compilado = None
+        else:
+            raise ValueError("Estado de origem ou destino não existe.")
+
+    def remover_transicao(self, origem, simbolo):
+        estado = self.grafo.ids.get(origem)
+        codigo = self.grafo.codigos.get(simbolo)
+        if estado is None or codigo not in self.grafo.linha(estado):
+            raise KeyError((origem, simbolo))
+        self.grafo.remover(estado, codigo)
+        self._compilado = None
+
+    def simular(self, cadeia):
+        # Executa sobre a tabela compilada; símbolo sem transição leva ao sumidouro (rejeição)
+        return self.compilar().simular(cadeia)
+
+    def simular_lote(self, cadeias):
+        """Simula muitas cadeias de uma vez; devolve (aceitas, estados finais) como vetores NumPy."""
+        from nucleo.lote import simular_lote  # NumPy só é necessário para simulação em lote
+        return simular_lote(self.compilar(), cadeias)
+    
+    def simular_prefixos(self, cadeias):
+        """Vereditos (bytearray, 1 se aceita) de muitas cadeias, percorrendo uma vez cada prefixo comum."""
+        return simular_prefixos(self.compilar(), cadeias)
+
+    def simular_paralelo(self, cadeia, **opcoes):
+        """Simula uma única cadeia longa dividindo-a em blocos processados em paralelo."""
+        from nucleo.paralelo import simular_paralelo  # concurrent.futures pesa na importação
+        return simular_paralelo(self.compilar(), cadeia, **opcoes)
+
+    def simular_arquivo(self, caminho, **opcoes):
+        """Aceita ou rejeita o conteúdo inteiro de um arquivo, lido em blocos (memória constante)."""
+        return simular_fluxo(self.compilar(), caminho, **opcoes)
+
+    def classificar_linhas(self, caminho, caminho_saida, **opcoes):
+        """Escreve em `caminho_saida` um veredito para cada linha de `caminho`; devolve (linhas, aceitas)."""
+        return classificar_linhas(self.compilar(), caminho, caminho_saida, **opcoes)
+
+    def minimizar(self):
+        """Devolve (automato mínimo equivalente, relatório de redução); este autômato não muda."""
+        return minimizar(self)
+
+    # Formatação requisitada do arquivo txt
+    def salvar(self, caminho):
+        with open(caminho, 'w') as f:
+            nomes = self.grafo.nomes
+            simbolos = self.grafo.simbolos
+            origens, rotulos, destinos = self.grafo.vetores()
+            # Escrevendo estados
+            f.write("#states\n")
+            f.writelines(f"{nome}\n" for nome in nomes)
+            # Escrevendo estado inicial
+            f.write("#initial\n")
+            f.write(f"{self.estado_inicial.nome}\n")
+            # Escrevendo estados de aceitação
+            f.write("#accepting\n")
+            f.writelines(f"{nome}\n" for nome, final in zip(nomes, self.finais) if final)
+            # Escrevendo alfabeto (obtendo a partir das transições)
+            f.write("#alphabet\n")
+            alfabeto = {simbolos[rotulo] for rotulo in set(rotulos)}
+            for simbolo in sorted(alfabeto):
+                f.write(f"{simbolo}\n")
+            # Escrevendo transições
+            f.write("#transitions\n")
+            f.writelines(f"{nomes[origem]}:{simbolos[rotulo]}>{nomes[destino]}\n"
+                         for origem, rotulo, destino in zip(origens, rotulos, destinos))
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Carrega o formato .txt (#states/#initial/...) validando-o; ver nucleo.carregador."""
+        if not caminho.endswith('.txt'):
+            raise ValueError("O arquivo deve estar no formato .txt.")
+        from nucleo.carregador import ler_txt  # Carregado sob demanda: json só serve aqui
+        return ler_txt(caminho).para_automato(cls)
+
+    @classmethod
+    def carregar_json(cls, caminho):
+        """Carrega o formato JSON {"nome": ..., "estados": {nome: {"final", "transicoes"}}}.
+
+        O estado inicial é o indicado em "inicial" ou, na falta dele, o primeiro estado.
+        """
+        from nucleo.carregador import ler_json
+        return ler_json(caminho).para_automato(cls)
+
+    @classmethod
+    def de_compilado(cls, compilado, nome="AutomatoCarregado", grafo=None):
+        """Reconstrói o autômato a partir da forma compilada, que passa a ser usada por ele.
+
+        `grafo`, se dado, é a `TabelaTransicoes` com as mesmas transições (a de quem leu o
+        arquivo, por exemplo), usada em vez de remontá-la a partir da tabela.
+        """
+        automato = cls(nome)
+        morto = compilado.morto
+        automato.grafo = grafo if grafo is not None else _grafo_de(compilado)
+        automato.finais = bytearray(compilado.finais[:morto])
+        if compilado.inicial != morto:
+            automato._inicial = compilado.inicial
+        elif compilado.nomes:
+            automato._inicial = 0
+        automato._compilado = compilado
+        return automato
+
+    def salvar_binario(self, caminho):
+        """Salva a forma compilada no formato binário .afdb (ver nucleo.binario)."""
+        salvar_binario(self.compilar(), caminho)
+
+    @classmethod
+    def carregar_binario(cls, caminho):
+        return cls.de_compilado(carregar_binario(caminho))
+
+    def assinatura(self):
+        """Hash da estrutura (estados, símbolos, finais, inicial e transições), para caches."""
+        import hashlib
+        import json
+        origens, rotulos, destinos = self.grafo.vetores()
+        resumo = hashlib.blake2b(digest_size=16)
+        resumo.update(json.dumps([self.grafo.nomes, self.grafo.simbolos, self._inicial]).encode('utf-8'))
+        resumo.update(bytes(self.finais))
+        for vetor in (origens, rotulos, destinos):
+            resumo.update(vetor.tobytes())
+        return resumo.hexdigest()
+
+    def gerar_grafo(self, caminho_imagem, cache=None, **opcoes):
+        """Grava a imagem do autômato em `caminho_imagem` (.png ou .svg) e devolve o caminho.
+
+        A imagem vem do cache (nucleo.cache_grafo) quando a estrutura e as `opcoes` de
+        layout já foram renderizadas; senão o `dot` roda e o resultado fica no cache.
+        """
+        import shutil
+        formato = _formato(caminho_imagem)
+        destino = os.path.splitext(caminho_imagem)[0] + '.' + formato
+        shutil.copyfile(self.imagem_em_cache(formato, cache, **opcoes), destino)
+        return destino
+
+    def imagem_em_cache(self, formato='svg', cache=None, **opcoes):
+        """Caminho da imagem do autômato dentro do cache, renderizando só se ela não estiver lá."""
+        from nucleo.cache_grafo import CacheGrafos, chave
+        cache = cache or CacheGrafos()
+        chave_imagem = chave(self.assinatura(), formato, opcoes)
+        return (cache.obter(chave_imagem, formato)
+                or cache.guardar(chave_imagem, formato, self.grafo_dot(formato, **opcoes)))
+
+    def grafo_dot(self, formato='png', **opcoes):
+        """Descrição graphviz do autômato (ainda não renderizada); `opcoes` são atributos do grafo."""
+        import graphviz  # Carregado sob demanda: só a renderização precisa dele
+        dot = graphviz.Digraph(format=formato)
+        if opcoes:
+            dot.attr(**opcoes)
+        dot.attr('node', shape='circle')
+
+        for estado in self.estados.values():
+            if estado.final:
+                dot.node(estado.nome, shape='doublecircle')
+            else:
+                dot.node(estado.nome)
+
+        for estado in self.estados.values():
+            for simbolo, destino in estado.transicoes.items():
+                dot.edge(estado.nome, destino.nome, label=simbolo)
+
+        # Estado inicial
+        if self.estado_inicial:
+            dot.node('', shape='none', label='')
+            dot.edge('', self.estado_inicial.nome)
+        return dot
+
+    def simular_passo(self, cadeia, rastro=None):
+        """Devolve (aceita, rastro dos passos); ver nucleo.rastro para os modos limitados."""
+        return self.compilar().simular_passo(cadeia, rastro)
+
+
+def _grafo_de(compilado):
+    """Tabela de transições (um símbolo por transição) lida da tabela por classes."""
+    nomes = list(compilado.nomes)
+    morto = compilado.morto
+    largura = compilado.largura
+    simbolos = sorted(compilado.colunas, key=compilado.colunas.get)
+    # Uma coluna pode ser a classe de vários símbolos (códigos consecutivos, nesta ordem)
+    membros = [[] for _ in range(largura)]
+    for codigo, simbolo in enumerate(simbolos):
+        membros[compilado.colunas[simbolo]].append(codigo)
+
+    # Posições da tabela (sem a linha do sumidouro) com transição de verdade, já em ordem;
+    # cada uma vira uma transição por símbolo da classe da coluna
+    tabela = compilado.tabela
+    origens, rotulos, destinos = array('i'), array('i'), array('i')
+    for origem in range(morto):
+        linha = tabela[origem * largura:(origem + 1) * largura]
+        for coluna, destino in enumerate(linha):
+            if destino == morto:
+                continue
+            for codigo in membros[coluna]:
+                origens.append(origem)
+                rotulos.append(codigo)
+                destinos.append(destino)
+    return TabelaTransicoes.de_vetores(nomes, simbolos, origens, rotulos, destinos, ordenados=True)
+
+
+def _formato(caminho_imagem):
+    extensao = os.path.splitext(caminho_imagem)[1].lower().lstrip('.')
+    return extensao if extensao == 'svg' else 'png'
+
+
+def carregar_automato(caminho):
+    """Carrega um `Automato` do formato .txt (#states/#initial/...), JSON ou binário (.afdb)."""
+    if caminho.endswith('.json'):
+        return Automato.carregar_json(caminho)
+    if caminho.endswith(EXTENSAO_BINARIA):
+        return Automato.carregar_binario(caminho)
+    return Automato.carregar(caminho)
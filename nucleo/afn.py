@@ -0,0 +1,417 @@
+"""Autômatos finitos não determinísticos (com transições em vazio) e seu motor bit-paralelo.
+
+`Automato` é o modelo usado por simulador_v2.py. Para simular, seus estados são
+numerados e a configuração ativa passa a ser um inteiro: o bit `i` ligado indica que
+o estado `i` está ativo. Para cada par (estado, símbolo) o `AFNBits` guarda uma
+máscara de sucessores já fechada por transições em vazio, de modo que cada passo da
+simulação é só uma sequência de OR.
+"""
+from collections.abc import Mapping, Set
+from itertools import groupby
+
+from nucleo.determinizacao import DeterminizacaoPreguicosa
+from nucleo.prefixos import simular_prefixos
+from nucleo.transicoes import TabelaTransicoes
+
+EPSILON = ('%', 'ε')  # Símbolos usados para transição em vazio
+POUCOS_IDS = 16  # Abaixo disso, `mascara_de` usa OR em vez do bytearray
+
+
+def calcular_fechos(estados, vazios):
+    """Fecho em vazio de cada estado, via componentes fortemente conexas (Tarjan iterativo).
+
+    `vazios` mapeia estado -> destinos por transição em vazio. As componentes saem em
+    ordem topológica reversa, então o fecho de cada uma é a união dos seus membros com
+    os fechos (já prontos) das componentes sucessoras; ciclos de vazio não custam nada
+    a mais. Estados da mesma componente compartilham o mesmo conjunto.
+    """
+    indice = {}
+    baixo = {}
+    pilha = []
+    na_pilha = set()
+    fechos = {}
+    for raiz in estados:
+        if raiz in indice:
+            continue
+        if raiz not in vazios:
+            # Sem transições em vazio: componente de um estado só, fechada em si mesma
+            indice[raiz] = len(indice)
+            fechos[raiz] = {raiz}
+            continue
+        indice[raiz] = baixo[raiz] = len(indice)
+        pilha.append(raiz)
+        na_pilha.add(raiz)
+        trabalho = [(raiz, iter(vazios.get(raiz, ())))]
+        while trabalho:
+            estado, filhos = trabalho[-1]
+            for filho in filhos:
+                if filho not in indice:
+                    indice[filho] = baixo[filho] = len(indice)
+                    pilha.append(filho)
+                    na_pilha.add(filho)
+                    trabalho.append((filho, iter(vazios.get(filho, ()))))
+                    break
+                if filho in na_pilha:
+                    baixo[estado] = min(baixo[estado], indice[filho])
+            else:
+                trabalho.pop()
+                if trabalho:
+                    pai = trabalho[-1][0]
+                    baixo[pai] = min(baixo[pai], baixo[estado])
+                if baixo[estado] == indice[estado]:
+                    componente = []
+                    while True:
+                        membro = pilha.pop()
+                        na_pilha.discard(membro)
+                        componente.append(membro)
+                        if membro == estado:
+                            break
+                    fecho = set(componente)
+                    for membro in componente:
+                        for destino in vazios.get(membro, ()):
+                            if destino not in fecho:
+                                fecho |= fechos[destino]
+                    for membro in componente:
+                        fechos[membro] = fecho
+    return fechos
+
+
+def acrescentar_vazio(fechos, origem, destino):
+    """Atualiza `fechos` no lugar após a inclusão da transição em vazio origem -> destino.
+
+    Todo estado cujo fecho contém `origem` passa a alcançar também o fecho de `destino`.
+    """
+    for estado in (origem, destino):
+        if estado not in fechos:
+            fechos[estado] = {estado}
+    if destino in fechos[origem]:
+        return
+    novos = frozenset(fechos[destino])
+    for fecho in fechos.values():
+        if origem in fecho:
+            fecho |= novos
+
+
+def mascara_de(ids):
+    """Inteiro com os bits `ids` ligados.
+
+    Com muitos ids, a máscara é montada de uma vez num bytearray, sem um OR por id (cada
+    OR copia o inteiro inteiro); com poucos, os OR saem mais baratos que a conversão.
+    """
+    if len(ids) < POUCOS_IDS:
+        mascara = 0
+        for i in ids:
+            mascara |= 1 << i
+        return mascara
+    bits = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class AFNBits:
+    """Forma compilada de um AFN: estados numerados e máscaras de sucessores por símbolo."""
+
+    def __init__(self, nomes, sucessores, fechos, finais, inicial):
+        self.nomes = nomes            # id -> nome do estado
+        self.ids = {nome: i for i, nome in enumerate(nomes)}
+        self.sucessores = sucessores  # símbolo -> lista (por id) de máscaras de destino
+        # símbolo -> máscara dos estados que têm alguma transição com ele
+        self.origens = {
+            simbolo: mascara_de([i for i, destino in enumerate(linha) if destino])
+            for simbolo, linha in sucessores.items()
+        }
+        self.fechos = fechos          # id -> máscara do fecho em vazio (None: sem transições em vazio)
+        self.finais = finais          # máscara dos estados de aceitação
+        self.inicial = inicial        # máscara da configuração inicial (já fechada)
+
+    @classmethod
+    def compilar(cls, automato):
+        grafo = automato.grafo
+        nomes = list(grafo.nomes)
+        inicial = automato.estado_inicial_configurado
+        if inicial is not None and inicial not in grafo.ids:
+            nomes.append(inicial)
+        ids = {nome: i for i, nome in enumerate(nomes)}
+
+        fechos = None
+        if any(simbolo in grafo.codigos for simbolo in EPSILON):
+            # Fechos em vazio vêm prontos do autômato (calculados uma vez e mantidos em dia)
+            fechos_nomes = automato.fechos()
+            fechos = []
+            convertidos = {}  # Estados de uma mesma componente compartilham o conjunto do fecho
+            for nome in nomes:
+                fecho = fechos_nomes.get(nome)
+                if fecho is None:
+                    fechos.append((ids[nome],))
+                    continue
+                if id(fecho) not in convertidos:
+                    convertidos[id(fecho)] = [ids[alcancado] for alcancado in fecho]
+                fechos.append(convertidos[id(fecho)])
+
+        # As transições já estão numeradas na tabela compacta do autômato
+        origens, rotulos, destinos = grafo.vetores()
+        finais = [ids[nome] for nome in automato.estados_finais if nome in ids]
+        return cls.montar(nomes, grafo.simbolos, origens, rotulos, destinos, finais,
+                          ids.get(inicial), fechos)
+
+    @classmethod
+    def montar(cls, nomes, simbolos, origens, rotulos, destinos, finais, inicial, fechos=None):
+        """Monta o motor a partir dos vetores de ids das transições.
+
+        `simbolos[r]` é o símbolo do rótulo `r`; as transições em vazio são ignoradas (já
+        estão nos fechos). `fechos[i]` lista os ids alcançáveis em vazio a partir de `i` (o
+        mesmo objeto pode ser compartilhado por vários estados), ou `fechos` é None se não
+        há transições em vazio. `finais` são ids e `inicial` é um id ou None.
+        """
+        # Destinos de cada (símbolo, origem): um id, ou uma lista se houver mais de um
+        alvos = {}
+        for origem, rotulo, destino in zip(origens, rotulos, destinos):
+            linha = alvos.get(rotulo)
+            if linha is None:
+                if simbolos[rotulo] in EPSILON:
+                    continue
+                linha = alvos[rotulo] = [None] * len(nomes)
+            atual = linha[origem]
+            if atual is None:
+                linha[origem] = destino
+            elif type(atual) is int:
+                linha[origem] = [atual, destino]
+            else:
+                atual.append(destino)
+
+        fechos_mascara = None
+        if fechos is not None:
+            # Uma máscara por fecho, compartilhada pelos estados da mesma componente
+            mascaras = {}
+            fechos_mascara = []
+            for fecho in fechos:
+                mascara = mascaras.get(id(fecho))
+                if mascara is None:
+                    mascara = mascaras[id(fecho)] = mascara_de(fecho)
+                fechos_mascara.append(mascara)
+
+        sucessores = {}
+        for rotulo, linha in alvos.items():
+            mascaras_linha = [0] * len(nomes)
+            for origem, alvo in enumerate(linha):
+                if alvo is None:
+                    continue
+                if type(alvo) is int:
+                    mascaras_linha[origem] = 1 << alvo if fechos is None else fechos_mascara[alvo]
+                elif fechos is None:
+                    mascaras_linha[origem] = mascara_de(alvo)
+                else:
+                    mascaras_linha[origem] = mascara_de({alcancado for destino in alvo
+                                                         for alcancado in fechos[destino]})
+            sucessores[simbolos[rotulo]] = mascaras_linha
+
+        if inicial is None:
+            mascara_inicial = 0
+        else:
+            mascara_inicial = 1 << inicial if fechos is None else fechos_mascara[inicial]
+        return cls(nomes, sucessores, fechos_mascara, mascara_de(finais), mascara_inicial)
+
+    def passo(self, mascara, simbolo):
+        """Consome `simbolo` a partir da configuração `mascara` e devolve a nova configuração."""
+        linha = self.sucessores.get(simbolo)
+        if linha is None:
+            return 0
+        mascara &= self.origens[simbolo]
+        nova = 0
+        while mascara:
+            menor = mascara & -mascara
+            nova |= linha[menor.bit_length() - 1]
+            mascara ^= menor
+        return nova
+
+    def avancar(self, mascara, cadeia):
+        for simbolo in cadeia:
+            mascara = self.passo(mascara, simbolo)
+            if not mascara:
+                break
+        return mascara
+
+    def aceita(self, mascara):
+        return bool(mascara & self.finais)
+
+    def simular(self, cadeia):
+        return self.aceita(self.avancar(self.inicial, cadeia))
+
+    def mascara(self, estados):
+        """Converte um conjunto de nomes de estados em máscara."""
+        mascara = 0
+        for nome in estados:
+            if nome in self.ids:
+                mascara |= 1 << self.ids[nome]
+        return mascara
+
+    def estados(self, mascara):
+        """Converte uma máscara no conjunto de nomes dos estados ativos."""
+        estados = set()
+        while mascara:
+            menor = mascara & -mascara
+            estados.add(self.nomes[menor.bit_length() - 1])
+            mascara ^= menor
+        return estados
+
+
+class EstadosAFN(Set):
+    """Vista do conjunto de nomes dos estados de um `Automato`."""
+    __slots__ = ('automato',)
+
+    def __init__(self, automato):
+        self.automato = automato
+
+    @classmethod
+    def _from_iterable(cls, iteravel):
+        # Resultados de |, & e - são conjuntos comuns
+        return set(iteravel)
+
+    def __contains__(self, nome):
+        return nome in self.automato.grafo.ids
+
+    def __iter__(self):
+        return iter(self.automato.grafo.nomes)
+
+    def __len__(self):
+        return len(self.automato.grafo.nomes)
+
+    def add(self, nome):
+        self.automato.grafo.estado(nome)
+        self.automato._motor = None
+
+
+class TransicoesAFN(Mapping):
+    """Vista { (origem, símbolo): frozenset(destinos) } sobre a tabela compacta de um `Automato`."""
+    __slots__ = ('grafo', '_origem', '_linha', '_versao')
+
+    def __init__(self, grafo):
+        self.grafo = grafo
+        self._origem = self._linha = self._versao = None
+
+    def _ler(self, origem):
+        # Guarda a última linha lida: consultas seguidas costumam ser da mesma origem
+        if self._origem != origem or self._versao != self.grafo.versao:
+            self._linha = self.grafo.linha(origem)
+            self._origem = origem
+            self._versao = self.grafo.versao
+        return self._linha
+
+    def __getitem__(self, chave):
+        origem, simbolo = chave
+        estado = self.grafo.ids.get(origem)
+        destinos = None if estado is None else self._ler(estado).get(self.grafo.codigos.get(simbolo))
+        if not destinos:
+            raise KeyError(chave)
+        nomes = self.grafo.nomes
+        return frozenset(nomes[destino] for destino in destinos)
+
+    def _pares(self):
+        origens, rotulos, _ = self.grafo.vetores()
+        return [par for par, _ in groupby(zip(origens, rotulos))]
+
+    def __iter__(self):
+        nomes = self.grafo.nomes
+        simbolos = self.grafo.simbolos
+        return ((nomes[origem], simbolos[rotulo]) for origem, rotulo in self._pares())
+
+    def __len__(self):
+        return len(self._pares())
+
+
+class Automato:
+    def __init__(self):
+        self.grafo = TabelaTransicoes(multiplos=True)  # Estados e transições em vetores de inteiros
+        self.estado_atual = None
+        self.estados_finais = set()
+        self.estado_inicial_configurado = None  # Armazena o estado inicial configurado
+        self._motor = None  # Forma bit-paralela, refeita após qualquer alteração
+        self._fechos = None  # Fechos em vazio por estado, atualizados a cada nova transição
+        self._afd = None  # AFD construído sob demanda sobre o motor atual
+        self.max_estados_afd = 4096  # Limite de estados do AFD guardados em memória
+
+    @property
+    def estados(self):
+        return EstadosAFN(self)
+
+    @property
+    def transicoes(self):
+        """Vista { (origem, símbolo): destinos }; transições agora armazenam múltiplos destinos."""
+        return TransicoesAFN(self.grafo)
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Carrega um autômato .txt ou .json validando-o; ver nucleo.carregador."""
+        from nucleo.carregador import carregar_definicao  # nucleo.carregador importa este módulo
+        return carregar_definicao(caminho).para_automato_afn(cls)
+
+    def adicionar_transicao(self, origem, simbolo, destino):
+        """Adiciona uma transição do estado 'origem' para o estado 'destino' usando o 'simbolo'.
+        Se simbolo for '%', é uma transição em vazio."""
+        grafo = self.grafo
+        grafo.acrescentar(grafo.estado(origem), grafo.codigo(simbolo), grafo.estado(destino))
+        self._motor = None
+        if self._fechos is not None:
+            if simbolo in EPSILON:
+                acrescentar_vazio(self._fechos, origem, destino)
+            else:
+                for estado in (origem, destino):
+                    self._fechos.setdefault(estado, {estado})
+
+    def definir_estado_inicial(self, estado):
+        self.estado_atual = estado
+        self.estado_inicial_configurado = estado 
+        self._motor = None
+
+    def definir_estados_finais(self, finais):
+        self.estados_finais = set(finais)
+        self._motor = None
+
+    def fechos(self):
+        """Devolve {estado: fecho em vazio}, calculado uma única vez para todos os estados."""
+        if self._fechos is None:
+            grafo = self.grafo
+            nomes = grafo.nomes
+            vazios = {}
+            codigos = {grafo.codigos[simbolo] for simbolo in EPSILON if simbolo in grafo.codigos}
+            if codigos:
+                for origem, rotulo, destino in zip(*grafo.vetores()):
+                    if rotulo in codigos:
+                        vazios.setdefault(nomes[origem], []).append(nomes[destino])
+            self._fechos = calcular_fechos(nomes, vazios)
+        return self._fechos
+
+    def motor(self):
+        """Devolve o motor bit-paralelo do autômato, recompilando só após alterações."""
+        if self._motor is None:
+            self._motor = AFNBits.compilar(self)
+        return self._motor
+
+    def determinizacao(self):
+        """Devolve o AFD preguiçoso do autômato; é descartado junto com o motor após alterações."""
+        motor = self.motor()
+        if self._afd is None or self._afd.afn is not motor:
+            self._afd = DeterminizacaoPreguicosa(motor, self.max_estados_afd)
+        return self._afd
+
+    def simular(self, cadeia):
+        """Aceita ou rejeita a cadeia a partir do estado inicial configurado."""
+        return self.determinizacao().simular(cadeia)
+
+    def simular_prefixos(self, cadeias):
+        """Vereditos (bytearray, 1 se aceita) de muitas cadeias, percorrendo uma vez cada prefixo comum."""
+        return simular_prefixos(self.determinizacao(), cadeias)
+
+    def proximo_estado(self, simbolo):
+        """Para AFN com transições em vazio (`%` ou `ε`), devolve todos os estados possíveis, incluindo os alcançados por transições em vazio."""
+        fechos = self.fechos()
+        atuais = fechos.get(self.estado_atual, {self.estado_atual})
+        if simbolo in EPSILON:
+            return set(atuais)
+
+        estados_possiveis = set()
+        for estado_atual in atuais:
+            for destino in self.transicoes.get((estado_atual, simbolo), ()):
+                estados_possiveis |= fechos[destino]
+        return estados_possiveis
@@ -0,0 +1,322 @@
+"""Benchmark dos motores dos três simuladores sobre autômatos sintéticos, sem interface gráfica.
+
+Uso: `python -m nucleo.benchmark [-o resultados.json] [--comparar anterior.json]`.
+
+Para cada combinação de simulador, número de estados, tamanho do alfabeto e tamanho
+das cadeias, um autômato aleatório (nucleo.geradores) é salvo em .txt e medido:
+
+    carga_s           carregar o arquivo e compilar o motor (melhor de N)
+    memoria_pico_kib  pico de memória alocada durante a carga (tracemalloc)
+    cadeias_por_s     vazão simulando cadeias aleatórias (melhor de N)
+    ns_por_simbolo    tempo médio por símbolo consumido (a simulação de um AFN para
+                      quando nenhum estado fica ativo)
+
+Simuladores: `afd` é o `Automato.simular` de simulator_automato.py (AFD completo, que
+consome sempre a cadeia inteira); `afn` e
+`afn_vazio` repetem o passo a passo de simulador_v2.py (`motor.passo` por símbolo), o
+segundo com muitas transições em vazio; `passo_a_passo` chama
+`Automato.proximo_estado` de simulador_passo_a_passo.py, construído em memória. Os
+resultados saem em JSON, com o commit atual, para comparar execuções com `--comparar`.
+
+Com `--layout`, mede também o posicionamento de estados de nucleo.layout (precisa do
+NumPy) sobre AFDs aleatórios de 2 símbolos, em "layout" no JSON:
+
+    completo_s        layout inteiro com as iterações padrão (melhor de N)
+    iteracoes         iterações usadas por ele (`iteracoes_padrao`)
+    incremental_s     acomodar um estado novo, ligado a um existente (melhor de N)
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from nucleo import geradores
+
+FORMATO = 1
+SIMULADORES = ('afd', 'afn', 'afn_vazio', 'passo_a_passo')
+ESTADOS = (10, 100, 1000)
+ALFABETOS = (2, 16)
+TAMANHOS = (10, 1000)
+VOLUME = 20000  # Símbolos simulados por caso (divididos em cadeias do tamanho pedido)
+REPETICOES = 3
+ESTADOS_LAYOUT = (100, 1000, 5000)
+
+
+def _definicao(simulador, estados, alfabeto, semente):
+    if simulador in ('afd', 'passo_a_passo'):
+        return geradores.afd_aleatorio(estados, alfabeto, semente=semente)
+    vazios = 2.0 if simulador == 'afn_vazio' else 0.0
+    return geradores.afn_aleatorio(estados, alfabeto, densidade=0.5, vazios=vazios,
+                                   semente=semente)
+
+
+def _carregador(simulador, definicao, caminho):
+    """Função sem argumentos que carrega o autômato pronto para simular e devolve o simulador."""
+    if simulador == 'afd':
+        from nucleo.afd import Automato
+
+        def carregar():
+            automato = Automato.carregar(caminho)
+            automato.compilar()
+            return automato
+    elif simulador == 'passo_a_passo':
+        from nucleo.passo_a_passo import Automato
+        estados = definicao["estados"]
+
+        def carregar():
+            transicoes = {(nome, simbolo): destino for nome, campos in estados.items()
+                          for simbolo, destino in campos["transicoes"].items()}
+            finais = {nome for nome, campos in estados.items() if campos["final"]}
+            return Automato(set(estados), transicoes, next(iter(estados)), finais)
+    else:
+        from nucleo.afn import Automato
+
+        def carregar():
+            automato = Automato.carregar(caminho)
+            automato.motor()
+            return automato
+    return carregar
+
+
+def _simulacao(simulador, automato):
+    """Função que simula uma lista de cadeias e devolve (aceitas, símbolos consumidos)."""
+    if simulador == 'afd':
+        def simular(cadeias):
+            return sum(map(automato.simular, cadeias)), sum(map(len, cadeias))
+    elif simulador == 'passo_a_passo':
+        inicial = automato.estado_atual
+        finais = automato.estados_finais
+
+        def simular(cadeias):
+            aceitas = consumidos = 0
+            for cadeia in cadeias:
+                automato.estado_atual = inicial
+                for simbolo in cadeia:
+                    consumidos += 1
+                    if automato.proximo_estado(simbolo) is None:
+                        break
+                else:
+                    aceitas += automato.estado_atual in finais
+            return aceitas, consumidos
+    else:
+        motor = automato.motor()
+
+        def simular(cadeias):
+            # Como em SimulatorApp.proximo_passo: um passo do motor por símbolo
+            aceitas = consumidos = 0
+            for cadeia in cadeias:
+                configuracao = motor.inicial
+                for simbolo in cadeia:
+                    consumidos += 1
+                    configuracao = motor.passo(configuracao, simbolo)
+                    if not configuracao:
+                        break
+                aceitas += motor.aceita(configuracao)
+            return aceitas, consumidos
+    return simular
+
+
+def _melhor_tempo(funcao, argumento, repeticoes):
+    melhor = None
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        resultado = funcao(*argumento)
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor, resultado
+
+
+def medir_caso(simulador, estados, alfabeto, tamanho, pasta, volume=VOLUME,
+               repeticoes=REPETICOES, semente=0):
+    """Mede um caso e devolve o dicionário de resultados dele."""
+    definicao = _definicao(simulador, estados, alfabeto, semente)
+    caminho = os.path.join(pasta, f"{simulador}_{estados}_{alfabeto}.txt")
+    if not os.path.exists(caminho):
+        geradores.salvar_txt(definicao, caminho)
+    carregar = _carregador(simulador, definicao, caminho)
+
+    carga, automato = _melhor_tempo(carregar, (), repeticoes)
+    tracemalloc.start()
+    carregar()
+    memoria = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    quantidade = max(1, volume // max(tamanho, 1))
+    cadeias = geradores.cadeias_aleatorias(alfabeto, quantidade, tamanho, semente)
+    simular = _simulacao(simulador, automato)
+    tempo, (aceitas, simbolos) = _melhor_tempo(simular, (cadeias,), repeticoes)
+    return {
+        "simulador": simulador,
+        "estados": estados,
+        "alfabeto": alfabeto,
+        "tamanho": tamanho,
+        "cadeias": quantidade,
+        "aceitas": aceitas,
+        "simbolos": simbolos,
+        "carga_s": carga,
+        "memoria_pico_kib": memoria / 1024,
+        "cadeias_por_s": quantidade / tempo if tempo else 0.0,
+        "ns_por_simbolo": tempo * 1e9 / simbolos if simbolos else 0.0,
+    }
+
+
+def medir_layout(estados, repeticoes=REPETICOES, semente=0):
+    """Mede o layout completo e uma atualização incremental de um AFD com `estados` estados."""
+    from nucleo import layout
+
+    definicao = geradores.afd_aleatorio(estados, 2, semente=semente)
+    ids = {nome: i for i, nome in enumerate(definicao["estados"])}
+    origens, destinos = [], []
+    for nome, campos in definicao["estados"].items():
+        for destino in campos["transicoes"].values():
+            origens.append(ids[nome])
+            destinos.append(ids[destino])
+
+    def completo():
+        incremental = layout.LayoutIncremental(semente=semente)
+        incremental.atualizar(estados, origens, destinos)
+        return incremental
+
+    tempo_completo, incremental = _melhor_tempo(completo, (), repeticoes)
+    posicoes = incremental.posicoes
+
+    def acrescentar():
+        # Sempre a partir do mesmo desenho: um estado novo ligado ao estado 0
+        incremental.posicoes = posicoes
+        incremental.atualizar(estados + 1, origens + [0], destinos + [estados], alterados=[0])
+
+    tempo_incremental, _ = _melhor_tempo(acrescentar, (), repeticoes)
+    return {
+        "estados": estados,
+        "transicoes": len(origens),
+        "iteracoes": layout.iteracoes_padrao(estados),
+        "completo_s": tempo_completo,
+        "incremental_s": tempo_incremental,
+    }
+
+
+def _commit():
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=raiz, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(simuladores=SIMULADORES, estados=ESTADOS, alfabetos=ALFABETOS, tamanhos=TAMANHOS,
+             volume=VOLUME, repeticoes=REPETICOES, semente=0, progresso=None, estados_layout=(),
+             progresso_layout=None):
+    """Roda todas as combinações e devolve o documento de resultados (serializável em JSON).
+
+    `estados_layout`, se dado, acrescenta as medidas de `medir_layout` para cada tamanho.
+    """
+    resultados = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for simulador in simuladores:
+            for n in estados:
+                for k in alfabetos:
+                    for tamanho in tamanhos:
+                        resultado = medir_caso(simulador, n, k, tamanho, pasta, volume,
+                                               repeticoes, semente)
+                        resultados.append(resultado)
+                        if progresso:
+                            progresso(resultado)
+    medidas_layout = []
+    for n in estados_layout:
+        medida = medir_layout(n, repeticoes, semente)
+        medidas_layout.append(medida)
+        if progresso_layout:
+            progresso_layout(medida)
+    documento = {
+        "formato": FORMATO,
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": {"volume": volume, "repeticoes": repeticoes, "semente": semente},
+        "resultados": resultados,
+    }
+    if medidas_layout:
+        documento["layout"] = medidas_layout
+    return documento
+
+
+def _chave(resultado):
+    return (resultado["simulador"], resultado["estados"], resultado["alfabeto"],
+            resultado["tamanho"])
+
+
+def _linha(resultado, razao=None):
+    texto = (f"{resultado['simulador']:<14}{resultado['estados']:>8}{resultado['alfabeto']:>9}"
+             f"{resultado['tamanho']:>9}{resultado['carga_s'] * 1000:>11.2f}"
+             f"{resultado['memoria_pico_kib']:>11.0f}{resultado['cadeias_por_s']:>13,.0f}"
+             f"{resultado['ns_por_simbolo']:>12.0f}")
+    if razao is not None:
+        texto += f"{razao:>9.2f}x"
+    return texto
+
+
+def main(argv=None):
+    def inteiros(texto):
+        return tuple(int(valor) for valor in texto.split(','))
+
+    parser = argparse.ArgumentParser(prog='python -m nucleo.benchmark',
+                                     description="Mede os motores dos simuladores em escala.")
+    parser.add_argument('-o', '--saida', help="arquivo JSON com os resultados")
+    parser.add_argument('--comparar', help="resultados anteriores (JSON) para comparar a vazão")
+    parser.add_argument('--simuladores', default=','.join(SIMULADORES),
+                        help="lista separada por vírgulas entre: " + ', '.join(SIMULADORES))
+    parser.add_argument('--estados', type=inteiros, default=ESTADOS, help="ex.: 10,100,1000")
+    parser.add_argument('--alfabetos', type=inteiros, default=ALFABETOS, help="ex.: 2,16")
+    parser.add_argument('--tamanhos', type=inteiros, default=TAMANHOS, help="ex.: 10,1000")
+    parser.add_argument('--volume', type=int, default=VOLUME, help="símbolos simulados por caso")
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--layout', nargs='?', type=inteiros, const=ESTADOS_LAYOUT, default=(),
+                        help="mede também o layout (estados, ex.: 100,1000,5000)")
+    args = parser.parse_args(argv)
+
+    simuladores = args.simuladores.split(',')
+    desconhecidos = set(simuladores) - set(SIMULADORES)
+    if desconhecidos:
+        parser.error(f"simulador desconhecido: {', '.join(sorted(desconhecidos))}")
+    base = {}
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = {_chave(r): r for r in json.load(f)["resultados"]}
+
+    print(f"{'simulador':<14}{'estados':>8}{'alfabeto':>9}{'tamanho':>9}{'carga ms':>11}"
+          f"{'mem KiB':>11}{'cadeias/s':>13}{'ns/símbolo':>12}" + ("    vs base" if base else ""))
+
+    def progresso(resultado):
+        razao = None
+        antigo = base.get(_chave(resultado))
+        if antigo and antigo["cadeias_por_s"]:
+            razao = resultado["cadeias_por_s"] / antigo["cadeias_por_s"]
+        print(_linha(resultado, razao), flush=True)
+
+    def progresso_layout(medida):
+        if medida["estados"] == args.layout[0]:
+            print(f"\n{'layout':<14}{'estados':>8}{'iterações':>11}{'completo ms':>13}"
+                  f"{'incremental ms':>16}")
+        print(f"{'':<14}{medida['estados']:>8}{medida['iteracoes']:>11}"
+              f"{medida['completo_s'] * 1000:>13.0f}{medida['incremental_s'] * 1000:>16.0f}",
+              flush=True)
+
+    documento = executar(simuladores, args.estados, args.alfabetos, args.tamanhos, args.volume,
+                         args.repeticoes, args.semente, progresso, args.layout, progresso_layout)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(documento, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
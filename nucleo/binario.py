@@ -0,0 +1,172 @@
+"""Formato binário (.afdb) da forma compilada de um AFD, próprio para `mmap`.
+
+Layout (inteiros little-endian, cada seção alinhada em 4 bytes):
+
+    cabeçalho   magic b'AFDB', versão, estados, símbolos, largura, inicial
+    nomes       (estados + 1) deslocamentos uint32 e os nomes em UTF-8 concatenados
+    símbolos    (símbolos + 1) deslocamentos uint32, os símbolos em UTF-8 e a coluna
+                (int32) de cada um
+    aceitação   bitmap com um bit por id (o sumidouro incluído)
+    transições  (estados + 1) * largura destinos int32, a mesma tabela plana do
+                `AutomatoCompilado`
+
+Ao carregar com `mmap`, a tabela de transições é usada diretamente do arquivo mapeado
+(sem cópia) e os nomes dos estados só são decodificados quando alguém os pede.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+from nucleo.compilado import AutomatoCompilado
+
+MAGIC = b'AFDB'
+VERSAO = 1
+CABECALHO = struct.Struct('<4sIIIIi')
+EXTENSAO = '.afdb'
+
+# byte do bitmap -> 8 bytes 0/1, para expandir a aceitação sem laço por bit
+_EXPANSAO = [bytes((b >> j) & 1 for j in range(8)) for b in range(256)]
+
+
+def _alinhar(posicao):
+    return (posicao + 3) & ~3
+
+
+class TabelaNomes(Sequence):
+    """Sequência de strings sobre deslocamentos e bytes UTF-8, decodificada sob demanda."""
+
+    def __init__(self, deslocamentos, dados):
+        self._deslocamentos = deslocamentos
+        self._dados = dados
+
+    def __len__(self):
+        return len(self._deslocamentos) - 1
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError(indice)
+        inicio = self._deslocamentos[indice]
+        fim = self._deslocamentos[indice + 1]
+        return bytes(self._dados[inicio:fim]).decode('utf-8')
+
+
+def _tabela_strings(textos):
+    """Serializa textos como (deslocamentos uint32, bytes UTF-8 concatenados)."""
+    codificados = [t.encode('utf-8') for t in textos]
+    deslocamentos = array('I', [0])
+    total = 0
+    for c in codificados:
+        total += len(c)
+        deslocamentos.append(total)
+    return deslocamentos, b''.join(codificados)
+
+
+def _little_endian(vetor):
+    if sys.byteorder != 'little':
+        vetor = array(vetor.typecode, vetor)
+        vetor.byteswap()
+    return vetor.tobytes()
+
+
+def salvar_binario(compilado, caminho):
+    nomes = list(compilado.nomes)
+    simbolos = list(compilado.colunas)
+    desloc_nomes, dados_nomes = _tabela_strings(nomes)
+    desloc_simbolos, dados_simbolos = _tabela_strings(simbolos)
+    colunas = array('i', (compilado.colunas[s] for s in simbolos))
+    bitmap = bytearray((len(nomes) + 1 + 7) // 8)
+    for estado in range(len(nomes) + 1):
+        if compilado.finais[estado]:
+            bitmap[estado >> 3] |= 1 << (estado & 7)
+    tabela = compilado.tabela
+    if not isinstance(tabela, array) or tabela.typecode != 'i':
+        tabela = array('i', tabela)
+
+    with open(caminho, 'wb') as f:
+        def escrever(dados):
+            f.write(dados)
+            f.write(b'\0' * (_alinhar(f.tell()) - f.tell()))
+
+        escrever(CABECALHO.pack(MAGIC, VERSAO, len(nomes), len(simbolos), compilado.largura,
+                                compilado.inicial))
+        escrever(_little_endian(desloc_nomes))
+        escrever(dados_nomes)
+        escrever(_little_endian(desloc_simbolos))
+        escrever(dados_simbolos)
+        escrever(_little_endian(colunas))
+        escrever(bytes(bitmap))
+        escrever(_little_endian(tabela))
+
+
+def carregar_binario(caminho, usar_mmap=True):
+    """Carrega um .afdb como `AutomatoCompilado`.
+
+    Com `usar_mmap`, a tabela de transições e os nomes apontam para o arquivo mapeado
+    em memória; sem ele, o arquivo é lido inteiro para a memória.
+    """
+    with open(caminho, 'rb') as f:
+        if usar_mmap:
+            dados = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            dados = f.read()
+    visao = memoryview(dados)
+    if len(visao) < CABECALHO.size:
+        raise ValueError(f"Arquivo binário de autômato truncado: {caminho}")
+    magic, versao, estados, simbolos, largura, inicial = CABECALHO.unpack_from(visao, 0)
+    if magic != MAGIC:
+        raise ValueError(f"O arquivo não é um autômato binário (.afdb): {caminho}")
+    if versao != VERSAO:
+        raise ValueError(f"Versão {versao} do formato binário não suportada.")
+
+    posicao = _alinhar(CABECALHO.size)
+
+    def secao(tamanho, formato=None):
+        nonlocal posicao
+        if posicao + tamanho > len(visao):
+            raise ValueError(f"Arquivo binário de autômato truncado: {caminho}")
+        pedaco = visao[posicao:posicao + tamanho]
+        posicao = _alinhar(posicao + tamanho)
+        if formato is None:
+            return pedaco
+        if sys.byteorder != 'little':
+            vetor = array(formato, pedaco.tobytes())
+            vetor.byteswap()
+            return vetor
+        return pedaco.cast(formato)
+
+    desloc_nomes = secao(4 * (estados + 1), 'I')
+    nomes = TabelaNomes(desloc_nomes, secao(desloc_nomes[-1]))
+    desloc_simbolos = secao(4 * (simbolos + 1), 'I')
+    lista_simbolos = TabelaNomes(desloc_simbolos, secao(desloc_simbolos[-1]))
+    colunas = dict(zip(lista_simbolos, secao(4 * simbolos, 'i')))
+    bitmap = secao((estados + 1 + 7) // 8)
+    finais = bytearray(b''.join(_EXPANSAO[b] for b in bitmap)[:estados + 1])
+    tabela = secao(4 * (estados + 1) * largura, 'i')
+    return AutomatoCompilado(nomes, colunas, tabela, finais, inicial, largura)
+
+
+def txt_para_binario(origem, destino):
+    """Converte um autômato .txt (ou .json) para o formato binário."""
+    from nucleo.afd import carregar_automato
+    salvar_binario(carregar_automato(origem).compilar(), destino)
+
+
+def binario_para_txt(origem, destino):
+    """Converte um autômato binário de volta para o formato .txt."""
+    from nucleo.afd import Automato
+    Automato.de_compilado(carregar_binario(origem, usar_mmap=False)).salvar(destino)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit(f"Uso: python -m nucleo.binario ORIGEM DESTINO (um dos dois terminado em {EXTENSAO})")
+    if sys.argv[1].endswith(EXTENSAO):
+        binario_para_txt(sys.argv[1], sys.argv[2])
+    else:
+        txt_para_binario(sys.argv[1], sys.argv[2])
@@ -0,0 +1,94 @@
+"""Cache em disco das imagens do graphviz (ver `Automato.gerar_grafo`).
+
+A chave é um hash da estrutura do autômato (`Automato.assinatura`) com o formato e as
+opções de layout: mostrar de novo um autômato que não mudou (ou que voltou a uma
+estrutura já renderizada) não roda o `dot`. As imagens ficam em `diretorio_padrao()`,
+fora da pasta de trabalho; quando o total passa de `limite` bytes, as usadas há mais
+tempo são apagadas (cada acerto atualiza a data de modificação do arquivo).
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+LIMITE = 64 << 20  # 64 MiB
+FORMATOS = ('png', 'svg')
+
+
+def diretorio_padrao():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'simulador-automatos', 'grafos')
+
+
+def chave(assinatura, formato, opcoes=None):
+    """Chave do cache para a estrutura `assinatura` renderizada em `formato` com `opcoes`."""
+    texto = json.dumps([assinatura, formato, sorted((opcoes or {}).items())])
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class CacheGrafos:
+    """Pasta de imagens renderizadas, indexadas por `chave` e limitada a `limite` bytes."""
+
+    def __init__(self, diretorio=None, limite=LIMITE):
+        self.diretorio = diretorio or diretorio_padrao()
+        self.limite = limite
+
+    def caminho(self, chave, formato):
+        return os.path.join(self.diretorio, f"{chave}.{formato}")
+
+    def obter(self, chave, formato):
+        """Caminho da imagem já renderizada, ou None."""
+        caminho = self.caminho(chave, formato)
+        try:
+            os.utime(caminho)  # Marca como usada agora, para o despejo
+        except FileNotFoundError:
+            return None
+        return caminho
+
+    def guardar(self, chave, formato, dot):
+        """Renderiza `dot` (um graphviz.Digraph) em `formato` e devolve o caminho no cache.
+
+        Não usa o autômato, então pode rodar fora da thread da interface.
+        """
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de imagem não suportado: {formato}")
+        os.makedirs(self.diretorio, exist_ok=True)
+        destino = self.caminho(chave, formato)
+        # Renderiza numa pasta temporária e move: um leitor nunca vê a imagem pela metade
+        with tempfile.TemporaryDirectory(dir=self.diretorio) as pasta:
+            gerado = dot.render(os.path.join(pasta, 'grafo'), format=formato, cleanup=True)
+            if not os.path.exists(gerado):
+                raise FileNotFoundError(f"A imagem não foi criada no caminho: {gerado}")
+            os.replace(gerado, destino)
+        self.despejar(manter=destino)
+        return destino
+
+    def despejar(self, manter=None):
+        """Apaga as imagens usadas há mais tempo até o total caber em `limite`."""
+        entradas = []
+        try:
+            with os.scandir(self.diretorio) as pasta:
+                for entrada in pasta:
+                    if entrada.is_file():
+                        info = entrada.stat()
+                        entradas.append((info.st_mtime, info.st_size, entrada.path))
+        except FileNotFoundError:
+            return
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.limite:
+                break
+            if caminho == manter:
+                continue
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+            total -= tamanho
+
+    def limpar(self):
+        limite, self.limite = self.limite, 0
+        try:
+            self.despejar()
+        finally:
+            self.limite = limite
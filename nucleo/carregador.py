@@ -0,0 +1,592 @@
+"""Carregador em fluxo dos formatos de autômato em texto (.txt) e JSON.
+
+Os três dialetos existentes são lidos pelo mesmo código:
+
+- o .txt com seções #states/#initial/#accepting/#alphabet/#transitions gravado por
+  simulator_automato.py (um destino por par estado/símbolo);
+- o mesmo .txt gravado por simulador_v2.py, com vários destinos e `%` para vazio;
+- o JSON de teste01.json/teste_tamanho.json ({"nome", "estados": {nome: {"final",
+  "transicoes"}}, "inicial"}), em que um destino também pode ser uma lista.
+
+O arquivo é lido numa única passada, sem guardá-lo inteiro na memória: o texto em
+pedaços de linhas inteiras, o JSON em pedaços, um estado por vez. Nomes de estados e símbolos são
+internados como ids inteiros e as transições ficam em vetores `array`, a partir dos
+quais a forma compilada (`AutomatoCompilado` ou `AFNBits`) é montada diretamente, sem
+criar um objeto por estado. Erros de formato são `ErroFormato`, com o caminho e a
+linha do problema.
+"""
+import json
+from array import array
+
+from nucleo.afn import EPSILON, AFNBits, calcular_fechos
+from nucleo.compilado import AutomatoCompilado, agrupar_simbolos
+from nucleo.transicoes import TabelaTransicoes
+
+SECOES = ('#states', '#initial', '#accepting', '#alphabet', '#transitions')
+TAMANHO_PEDACO = 1 << 20  # Caracteres lidos por vez
+# Espaços ASCII que `str.strip` tira das pontas das linhas, e a linha em branco
+_ESPACOS_ASCII = (' ', '\t', '\r', '\x0b', '\x0c', '\x1c', '\x1d', '\x1e', '\x1f', '\n\n')
+# Bytes apagados do texto das transições para sobrarem só os separadores ':', '>' e '\n'
+_NAO_SEPARADORES = bytes(range(256)).translate(None, b':>\n')
+_ESPACOS = ' \t\r\n'
+
+
+class ErroFormato(ValueError):
+    """Erro de formato num arquivo de autômato, com o caminho e a linha."""
+
+    def __init__(self, caminho, linha, mensagem):
+        super().__init__(f"{caminho}:{linha}: {mensagem}")
+        self.caminho = caminho
+        self.linha = linha
+        self.mensagem = mensagem
+
+
+class Definicao:
+    """Autômato lido de um arquivo, com estados e símbolos numerados.
+
+    As transições ficam em vetores paralelos (origem, símbolo, destino e linha do
+    arquivo); `nomes` e `colunas` traduzem os ids de volta para os nomes.
+    """
+
+    def __init__(self, caminho, nome="AutomatoCarregado"):
+        self.caminho = caminho
+        self.nome = nome
+        self.nomes = []      # id -> nome do estado
+        self.ids = {}        # nome do estado -> id
+        self.colunas = {}    # símbolo -> id do símbolo, na ordem em que aparecem
+        self.finais = set()  # ids dos estados de aceitação
+        self.inicial = None  # id do estado inicial (o primeiro estado, se não for indicado)
+        self.origens = array('i')
+        self.simbolos = array('i')
+        self.destinos = array('i')
+        self.linhas = array('I')
+        self._tabela = None
+
+    def erro(self, linha, mensagem):
+        raise ErroFormato(self.caminho, linha, mensagem)
+
+    def internar(self, nome):
+        estado = self.ids.get(nome)
+        if estado is None:
+            estado = self.ids[nome] = len(self.nomes)
+            self.nomes.append(nome)
+        return estado
+
+    def simbolo(self, simbolo):
+        coluna = self.colunas.get(simbolo)
+        if coluna is None:
+            coluna = self.colunas[simbolo] = len(self.colunas)
+        return coluna
+
+    def _montar_tabela(self):
+        """Tabela densa do AFD, ou a linha e a mensagem do primeiro não determinismo."""
+        if self._tabela is None:
+            simbolos = list(self.colunas)
+            vazios = [coluna for coluna, simbolo in enumerate(simbolos) if simbolo in EPSILON]
+            if vazios:
+                linha = self.linhas[self.simbolos.index(vazios[0])]
+                self._tabela = None, (linha, "transição em vazio num autômato determinístico")
+                return self._tabela
+            morto = len(self.nomes)
+            # Uma coluna por classe de símbolos equivalentes (ver nucleo.compilado)
+            classe, largura, tabela = agrupar_simbolos(len(simbolos), morto, self.origens,
+                                                       self.simbolos, self.destinos)
+            # Se cada transição ocupou uma posição própria da tabela (contadas em C), não há
+            # par (origem, símbolo) repetido nem conflito. Senão, num conflito o último
+            # destino escrito não bate com algum anterior; só então a busca linha a linha
+            # acha o primeiro
+            conflito = False
+            if largura != len(simbolos) or len(tabela) - tabela.count(morto) != len(self.origens):
+                for origem, coluna, destino in zip(self.origens, self.simbolos, self.destinos):
+                    if tabela[origem * largura + classe[coluna]] != destino:
+                        conflito = True
+                        break
+            if conflito:
+                primeiro = {}
+                for origem, coluna, destino, linha in zip(self.origens, self.simbolos, self.destinos,
+                                                          self.linhas):
+                    anterior = primeiro.setdefault((origem, coluna), destino)
+                    if anterior != destino:
+                        self._tabela = None, (linha, (
+                            f"transição não determinística: '{self.nomes[origem]}' com "
+                            f"'{simbolos[coluna]}' já leva a '{self.nomes[anterior]}'"))
+                        return self._tabela
+            self._tabela = (tabela, largura, classe), None
+        return self._tabela
+
+    @property
+    def deterministico(self):
+        """True se não há transições em vazio nem dois destinos para o mesmo par."""
+        return self._montar_tabela()[0] is not None
+
+    def para_compilado(self):
+        """Monta o `AutomatoCompilado`; falha com a linha do problema se não for um AFD."""
+        montada, problema = self._montar_tabela()
+        if montada is None:
+            self.erro(*problema)
+        tabela, largura, classe = montada
+        finais = bytearray(len(self.nomes) + 1)
+        for estado in self.finais:
+            finais[estado] = 1
+        return AutomatoCompilado(list(self.nomes), dict(zip(self.colunas, classe)), tabela, finais,
+                                 self.inicial, largura)
+
+    def para_afn(self):
+        """Monta o motor bit-paralelo `AFNBits` (aceita vários destinos e transições em vazio)."""
+        simbolos = list(self.colunas)
+        vazio = [simbolo in EPSILON for simbolo in simbolos]
+        fechos = None
+        if any(vazio):
+            vazios = {}
+            for origem, coluna, destino in zip(self.origens, self.simbolos, self.destinos):
+                if vazio[coluna]:
+                    vazios.setdefault(origem, []).append(destino)
+            por_estado = calcular_fechos(range(len(self.nomes)), vazios)
+            fechos = [por_estado[estado] for estado in range(len(self.nomes))]
+        return AFNBits.montar(list(self.nomes), simbolos, self.origens, self.simbolos, self.destinos,
+                              self.finais, self.inicial, fechos)
+
+    def para_automato(self, cls=None):
+        """Cria o `Automato` de nucleo.afd (ou de `cls`) já com a forma compilada pronta."""
+        if cls is None:
+            from nucleo.afd import Automato as cls  # nucleo.afd importa este módulo
+        compilado = self.para_compilado()
+        # As transições lidas já são a tabela do autômato: não é preciso extraí-las do compilado
+        grafo = TabelaTransicoes.de_vetores(self.nomes, self.colunas, self.origens, self.simbolos,
+                                            self.destinos, ids=self.ids)
+        return cls.de_compilado(compilado, self.nome, grafo)
+
+    def para_automato_afn(self, cls=None):
+        """Cria o `Automato` de nucleo.afn (ou de `cls`), mantendo `%` e vários destinos."""
+        if cls is None:
+            from nucleo.afn import Automato as cls
+        automato = cls()
+        nomes = self.nomes
+        automato.grafo = TabelaTransicoes.de_vetores(nomes, self.colunas, self.origens,
+                                                     self.simbolos, self.destinos, multiplos=True,
+                                                     ids=self.ids)
+        automato.estados_finais = {nomes[estado] for estado in self.finais}
+        # O motor bit-paralelo (um inteiro por estado e símbolo) só é montado na primeira
+        # simulação, por `Automato.motor`; carregar fica no custo das tabelas
+        automato.definir_estado_inicial(nomes[self.inicial])
+        return automato
+
+
+class _LeitorTxt:
+    """Lê o formato de texto em pedaços de linhas; `secao` é a seção em que a leitura está.
+
+    Cada trecho de um pedaço entre dois cabeçalhos vai de uma vez para a sua seção. As
+    transições são separadas em bloco (ver `_campos`), com uma consulta de dicionário por
+    nome; um trecho fora do caso simples, ou com algum erro, é refeito linha a linha por
+    `_transicao`, que dá a mensagem e a linha exatas.
+    """
+
+    def __init__(self, definicao):
+        self.definicao = definicao
+        self.secao = None
+        self.alfabeto = None  # símbolos de #alphabet, se a seção existir
+        self.numero = 0       # linhas lidas até agora
+
+    def processar(self, texto):
+        """Processa `texto`, linhas inteiras do arquivo, cada uma terminada em quebra de linha."""
+        numero = self.numero + 1
+        self.numero += texto.count('\n')
+        if (not texto.isascii() or texto.startswith('\n')
+                or any(espaco in texto for espaco in _ESPACOS_ASCII)):
+            # Espaços a tirar das pontas ou linhas em branco: só então linha a linha
+            texto = '\n'.join([linha.strip() for linha in texto.split('\n')])
+        inicio = 0
+        for posicao in _cabecalhos(texto):
+            fim = texto.index('\n', posicao)
+            numero = self._trecho(numero, texto[inicio:posicao])
+            self._cabecalho(numero, texto[posicao:fim])
+            numero += 1
+            inicio = fim + 1
+        self._trecho(numero, texto[inicio:])
+
+    def _cabecalho(self, numero, linha):
+        if linha not in SECOES:
+            self.definicao.erro(numero, f"seção desconhecida '{linha}'")
+        self.secao = linha
+        if linha == '#alphabet' and self.alfabeto is None:
+            self.alfabeto = set()
+
+    def _trecho(self, primeira, trecho):
+        """Linhas da seção atual, sem espaços nas pontas e terminadas em quebra de linha.
+
+        A primeira linha de `trecho` tem o número `primeira`; devolve o número da seguinte.
+        """
+        definicao = self.definicao
+        seguinte = primeira + trecho.count('\n')
+        if trecho.startswith('\n') or '\n\n' in trecho:
+            # Linhas em branco no meio: cada linha útil guarda o próprio número
+            linhas = trecho.split('\n')
+            numeros = [numero for numero, linha in enumerate(linhas, primeira) if linha]
+            bloco = '\n'.join([linha for linha in linhas if linha])
+        else:
+            numeros = range(primeira, seguinte)
+            bloco = trecho[:-1]
+        if not numeros:
+            return seguinte
+        if self.secao == '#transitions':
+            self._transicoes(numeros, bloco)
+            return seguinte
+        linhas = bloco.split('\n')
+        if self.secao == '#states':
+            self._estados(numeros, linhas)
+        elif self.secao is None:
+            definicao.erro(numeros[0], "linha fora de uma seção (esperava #states)")
+        elif self.secao == '#alphabet':
+            self.alfabeto.update(linhas)
+        elif self.secao == '#accepting':
+            try:
+                definicao.finais.update([definicao.ids[nome] for nome in linhas])
+            except KeyError:
+                for numero, linha in zip(numeros, linhas):
+                    definicao.finais.add(self._id(numero, linha))
+        else:
+            for numero, linha in zip(numeros, linhas):
+                estado = self._id(numero, linha)
+                if definicao.inicial is not None and definicao.inicial != estado:
+                    definicao.erro(numero, "mais de um estado inicial")
+                definicao.inicial = estado
+        return seguinte
+
+    def _estados(self, numeros, nomes):
+        definicao = self.definicao
+        inicio = len(definicao.nomes)
+        definicao.ids.update(zip(nomes, range(inicio, inicio + len(nomes))))
+        definicao.nomes.extend(nomes)
+        if len(definicao.ids) != len(definicao.nomes):
+            # Algum nome repetido: procura a primeira repetição para apontar a linha
+            vistos = set(definicao.nomes[:inicio])
+            for numero, nome in zip(numeros, nomes):
+                if nome in vistos:
+                    definicao.erro(numero, f"estado '{nome}' declarado duas vezes")
+                vistos.add(nome)
+
+    def _transicoes(self, numeros, bloco):
+        definicao = self.definicao
+        campos = _campos(bloco, len(numeros))
+        if campos is not None:
+            origens, simbolos, destinos = campos
+            # Símbolos novos e válidos entram na ordem em que aparecem no arquivo
+            for simbolo in dict.fromkeys(simbolos):
+                if simbolo and simbolo not in definicao.colunas and not self._fora_do_alfabeto(simbolo):
+                    definicao.simbolo(simbolo)
+            ids = definicao.ids
+            colunas = definicao.colunas
+            try:
+                origens = [ids[nome] for nome in origens]
+                simbolos = [colunas[simbolo] for simbolo in simbolos]
+                destinos = [ids[nome] for nome in destinos]
+            except KeyError:
+                campos = None  # Algum erro: a leitura linha a linha aponta qual
+        if campos is None:
+            origens, simbolos, destinos = [], [], []
+            for numero, linha in zip(numeros, bloco.split('\n')):
+                origem, coluna, destino = self._transicao(numero, linha)
+                origens.append(origem)
+                simbolos.append(coluna)
+                destinos.append(destino)
+        definicao.origens.fromlist(origens)
+        definicao.simbolos.fromlist(simbolos)
+        definicao.destinos.fromlist(destinos)
+        definicao.linhas.extend(numeros)
+
+    def _id(self, numero, nome):
+        estado = self.definicao.ids.get(nome)
+        if estado is None:
+            self.definicao.erro(numero, f"estado '{nome}' não declarado em #states")
+        return estado
+
+    def _fora_do_alfabeto(self, simbolo):
+        return (self.alfabeto is not None and simbolo not in self.alfabeto
+                and simbolo not in EPSILON and simbolo not in self.definicao.colunas)
+
+    def _transicao(self, numero, linha):
+        """Valida uma transição por completo e devolve (origem, símbolo, destino) em ids."""
+        definicao = self.definicao
+        origem, separador, resto = linha.partition(':')
+        simbolo, separador_destino, destino = resto.rpartition('>')
+        if not separador or not separador_destino or not simbolo:
+            definicao.erro(numero, f"transição mal formada '{linha}' "
+                                   "(esperava origem:símbolo>destino)")
+        origem = self._id(numero, origem)
+        destino = self._id(numero, destino)
+        if self._fora_do_alfabeto(simbolo):
+            definicao.erro(numero, f"símbolo '{simbolo}' fora do alfabeto")
+        return origem, definicao.simbolo(simbolo), destino
+
+
+def _cabecalhos(texto):
+    """Posições em `texto` das linhas que começam com '#', achadas sem percorrê-lo linha a linha."""
+    posicoes = [0] if texto.startswith('#') else []
+    posicao = texto.find('\n#')
+    while posicao != -1:
+        posicoes.append(posicao + 1)
+        posicao = texto.find('\n#', posicao + 1)
+    return posicoes
+
+
+def _campos(bloco, total):
+    """(origens, símbolos, destinos) das `total` linhas origem:símbolo>destino de `bloco`.
+
+    O bloco é dividido de uma vez nos ':' e '>'. Antes, confere-se que a sequência de
+    separadores é exatamente ':', '>', quebra de linha, ... (em UTF-8 esses bytes não
+    aparecem dentro de outros caracteres); se alguma linha foge disso (símbolos com esses
+    caracteres, linhas mal formadas), o resultado é None.
+    """
+    separadores = bloco.encode().translate(None, _NAO_SEPARADORES)
+    if separadores != (b':>\n' * total)[:-1]:
+        return None
+    campos = bloco.replace(':', '\n').replace('>', '\n').split('\n')
+    return campos[0::3], campos[1::3], campos[2::3]
+
+
+def ler_txt(caminho, codificacao='utf-8', tamanho_pedaco=TAMANHO_PEDACO):
+    """Lê o formato #states/#initial/#accepting/#alphabet/#transitions numa única passada.
+
+    O arquivo é lido em pedaços de `tamanho_pedaco` caracteres, cortados em fins de
+    linha. Linhas em branco são ignoradas. Se houver seção #alphabet, todo símbolo das
+    transições (exceto `%` e `ε`) precisa estar nela. O estado inicial padrão é o
+    primeiro estado declarado.
+    """
+    definicao = Definicao(caminho)
+    leitor = _LeitorTxt(definicao)
+    with open(caminho, 'r', encoding=codificacao) as arquivo:
+        pendente = ''
+        while True:
+            pedaco = arquivo.read(tamanho_pedaco)
+            if not pedaco:
+                break
+            texto = pendente + pedaco
+            corte = texto.rfind('\n') + 1
+            pendente = texto[corte:]
+            if corte:
+                leitor.processar(texto[:corte])
+        if pendente:
+            leitor.processar(pendente + '\n')
+    if not definicao.nomes:
+        definicao.erro(leitor.numero, "nenhum estado declarado em #states")
+    if definicao.inicial is None:
+        definicao.inicial = 0
+    return definicao
+
+
+class _LexicoJSON:
+    """Percorre a estrutura externa de um JSON lido em pedaços.
+
+    Só chaves e pontuação dos objetos externos são tratadas aqui; cada valor (um estado
+    inteiro, por exemplo) é decodificado de uma vez pelo `JSONDecoder`. As quebras de
+    linha só são contadas quando alguém pergunta a `linha`.
+    """
+
+    def __init__(self, arquivo, caminho, tamanho_pedaco=TAMANHO_PEDACO):
+        self.arquivo = arquivo
+        self.caminho = caminho
+        self.tamanho_pedaco = tamanho_pedaco
+        self.decodificador = json.JSONDecoder()
+        self.texto = ''
+        self.posicao = 0
+        self.fim = False
+        self._linha = 1    # linha da posição `_contado`
+        self._contado = 0
+
+    @property
+    def linha(self):
+        """Linha da posição atual."""
+        self._linha += self.texto.count('\n', self._contado, self.posicao)
+        self._contado = self.posicao
+        return self._linha
+
+    def erro(self, mensagem, linha=None):
+        raise ErroFormato(self.caminho, self.linha if linha is None else linha, mensagem)
+
+    def _ler_mais(self):
+        """Acrescenta um pedaço do arquivo ao texto pendente; False no fim do arquivo."""
+        if self.fim:
+            return False
+        # O pedaço cresce com o texto pendente, para valores grandes não serem relidos muitas vezes
+        pedaco = self.arquivo.read(max(self.tamanho_pedaco, len(self.texto) - self.posicao))
+        if not pedaco:
+            self.fim = True
+            return False
+        self._linha = self.linha
+        self.texto = self.texto[self.posicao:] + pedaco
+        self.posicao = self._contado = 0
+        return True
+
+    def espiar(self):
+        """Próximo caractere que não é espaço ('' no fim do arquivo)."""
+        while True:
+            texto = self.texto
+            posicao = self.posicao
+            while posicao < len(texto) and texto[posicao] in _ESPACOS:
+                posicao += 1
+            self.posicao = posicao
+            if posicao < len(texto):
+                return texto[posicao]
+            if not self._ler_mais():
+                return ''
+
+    def consumir(self, esperado):
+        caractere = self.espiar()
+        if caractere != esperado:
+            self.erro(f"esperava '{esperado}', encontrou {_descrever(caractere)}")
+        self.posicao += 1
+
+    def valor(self):
+        """Decodifica o próximo valor JSON inteiro."""
+        self.espiar()
+        while True:
+            try:
+                valor, fim = self.decodificador.raw_decode(self.texto, self.posicao)
+            except json.JSONDecodeError as e:
+                if self._ler_mais():
+                    continue  # Valor partido entre dois pedaços
+                self.erro(e.msg, self.linha + self.texto.count('\n', self.posicao, e.pos))
+            if fim < len(self.texto) or not self._ler_mais():
+                break  # Um número no fim do pedaço pode continuar no próximo
+        self.posicao = fim
+        return valor
+
+    def membros(self):
+        """Gera (chave, linha) para cada membro de um objeto; o valor deve ser lido por quem chama."""
+        self.consumir('{')
+        if self.espiar() == '}':
+            self.posicao += 1
+            return
+        while True:
+            if self.espiar() != '"':
+                self.erro("esperava o nome de um campo entre aspas")
+            linha = self.linha
+            chave = self.valor()
+            self.consumir(':')
+            yield chave, linha
+            caractere = self.espiar()
+            if caractere not in (',', '}'):
+                self.erro(f"esperava ',' ou '}}', encontrou {_descrever(caractere)}")
+            self.posicao += 1
+            if caractere == '}':
+                return
+
+
+def _descrever(caractere):
+    return repr(caractere) if caractere else "o fim do arquivo"
+
+
+def ler_json(caminho, codificacao='utf-8', tamanho_pedaco=TAMANHO_PEDACO):
+    """Lê o formato JSON de teste01.json em pedaços, validando-o numa única passada.
+
+    Os estados são decodificados e processados um a um. Destinos podem ser referenciados
+    antes de o estado ser declarado; no fim, todo estado referenciado precisa ter
+    aparecido em "estados". Erros dentro de um estado apontam a linha em que ele começa.
+    """
+    definicao = Definicao(caminho)
+    leitura = _LeituraJSON(definicao)
+    inicial = None
+    with open(caminho, 'r', encoding=codificacao) as arquivo:
+        lexico = _LexicoJSON(arquivo, caminho, tamanho_pedaco)
+        for chave, _ in lexico.membros():
+            if chave == 'estados':
+                for nome, linha in lexico.membros():
+                    leitura.estado(nome, linha, lexico.valor())
+            elif chave in ('nome', 'inicial'):
+                linha = lexico.linha
+                valor = lexico.valor()
+                if not isinstance(valor, str):
+                    definicao.erro(linha, f"'{chave}' deve ser um texto")
+                if chave == 'nome':
+                    definicao.nome = valor
+                else:
+                    inicial = valor, linha
+            else:
+                lexico.valor()  # Campo desconhecido: ignorado
+        if lexico.espiar():
+            lexico.erro("conteúdo após o fim do objeto principal")
+
+    if leitura.referencias:
+        estado, linha = min(leitura.referencias.items(), key=lambda item: item[1])
+        definicao.erro(linha, f"estado '{definicao.nomes[estado]}' não declarado em \"estados\"")
+    if not definicao.nomes:
+        definicao.erro(lexico.linha, "nenhum estado declarado em \"estados\"")
+    leitura.ordenar()
+    if inicial is not None:
+        nome, linha = inicial
+        if nome not in definicao.ids:
+            definicao.erro(linha, f"estado inicial '{nome}' não existe")
+        definicao.inicial = definicao.ids[nome]
+    else:
+        definicao.inicial = 0
+    return definicao
+
+
+class _LeituraJSON:
+    """Registra os estados do JSON à medida que são decodificados."""
+
+    def __init__(self, definicao):
+        self.definicao = definicao
+        self.declarados = []  # ids na ordem de declaração
+        self.vistos = set()
+        self.referencias = {}  # estado ainda não declarado -> linha da primeira referência
+
+    def estado(self, nome, linha, campos):
+        definicao = self.definicao
+        estado = definicao.ids.get(nome)
+        if estado is None:
+            estado = definicao.internar(nome)
+        elif estado in self.vistos:
+            definicao.erro(linha, f"estado '{nome}' declarado duas vezes")
+        else:
+            self.referencias.pop(estado, None)
+        self.declarados.append(estado)
+        self.vistos.add(estado)
+
+        if type(campos) is not dict:
+            definicao.erro(linha, f"o estado '{nome}' deve ser um objeto")
+        final = campos.get('final', False)
+        if type(final) is not bool:
+            definicao.erro(linha, f"'final' deve ser true ou false em '{nome}'")
+        if final:
+            definicao.finais.add(estado)
+        transicoes = campos.get('transicoes', {})
+        if type(transicoes) is not dict:
+            definicao.erro(linha, f"'transicoes' deve ser um objeto em '{nome}'")
+
+        for simbolo, alvos in transicoes.items():
+            if type(alvos) is str:
+                alvos = [alvos]  # AFD: um destino; AFN: uma lista deles
+            elif type(alvos) is not list or any(type(alvo) is not str for alvo in alvos):
+                definicao.erro(linha, f"destino de '{simbolo}' em '{nome}' deve ser um texto ou uma lista")
+            for alvo in alvos:
+                destino = definicao.ids.get(alvo)
+                if destino is None:
+                    # Estado ainda não visto: é criado e precisa ser declarado mais adiante
+                    destino = definicao.internar(alvo)
+                    self.referencias[destino] = linha
+                definicao.origens.append(estado)
+                definicao.simbolos.append(definicao.simbolo(simbolo))
+                definicao.destinos.append(destino)
+                definicao.linhas.append(linha)
+
+    def ordenar(self):
+        """Renumera os estados na ordem de declaração (referências adiantadas a bagunçam)."""
+        definicao = self.definicao
+        if self.declarados == list(range(len(self.declarados))):
+            return
+        novo = [0] * len(definicao.nomes)
+        for posicao, estado in enumerate(self.declarados):
+            novo[estado] = posicao
+        definicao.nomes = [definicao.nomes[estado] for estado in self.declarados]
+        definicao.ids = {nome: estado for estado, nome in enumerate(definicao.nomes)}
+        definicao.finais = {novo[estado] for estado in definicao.finais}
+        definicao.origens = array('i', [novo[estado] for estado in definicao.origens])
+        definicao.destinos = array('i', [novo[estado] for estado in definicao.destinos])
+
+
+def carregar_definicao(caminho, **opcoes):
+    """Lê `caminho` (.json ou o formato de texto) e devolve a `Definicao`."""
+    if caminho.endswith('.json'):
+        return ler_json(caminho, **opcoes)
+    return ler_txt(caminho, **opcoes)
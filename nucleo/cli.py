@@ -0,0 +1,172 @@
+"""Execução em lote pela linha de comando, sem interface gráfica.
+
+Uso: `python -m nucleo AUTOMATO [AUTOMATO...] CADEIAS [-o SAIDA] [-j TRABALHADORES] [--prefixos]`.
+
+O autômato (.txt no formato #states/#initial/#accepting/#alphabet/#transitions,
+.json no formato de teste01.json ou o binário .afdb) é compilado uma vez e enviado uma
+única vez para cada processo do `ProcessPoolExecutor`; autômatos não determinísticos
+(vários destinos ou `%`) viram um AFD preguiçoso em cada processo. O arquivo de cadeias
+(uma por linha) é lido em lotes, distribuídos entre os processos; os vereditos saem na
+ordem das linhas e as estatísticas de vazão vão para a saída de erro.
+
+Com vários autômatos, todos são simulados juntos pelo produto preguiçoso de
+nucleo.produto (uma leitura de cada cadeia) e cada linha da saída traz os arquivos dos
+autômatos que aceitam a cadeia, separados por vírgula (`-` se nenhum).
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from nucleo.binario import EXTENSAO as EXTENSAO_BINARIA, carregar_binario
+from nucleo.carregador import carregar_definicao
+from nucleo.determinizacao import DeterminizacaoPreguicosa
+from nucleo.prefixos import simular_prefixos
+from nucleo.produto import ProdutoPreguicoso
+
+TAMANHO_LOTE = 20000
+
+_compilado = None  # Autômato compilado de cada processo trabalhador
+
+
+def _iniciar_trabalhador(compilado):
+    global _compilado
+    _compilado = compilado
+
+
+def _classificar(cadeias):
+    """Devolve um byte por cadeia: 1 se aceita, 0 se rejeitada."""
+    motor = _compilado
+    aceita = motor.aceita
+    avancar = motor.avancar
+    inicial = motor.inicial
+    return bytes(aceita(avancar(inicial, cadeia)) for cadeia in cadeias)
+
+
+def _classificar_prefixos(cadeias):
+    """Como `_classificar`, mas percorrendo uma vez cada prefixo comum do lote (nucleo.prefixos)."""
+    return bytes(simular_prefixos(_compilado, cadeias))
+
+
+def _classificar_produto(cadeias):
+    """Com um `ProdutoPreguicoso`: a máscara dos autômatos que aceitam cada cadeia."""
+    return list(map(_compilado.classificar, cadeias))
+
+
+def carregar_motor(caminho):
+    """Motor do arquivo: o AFD compilado, ou um AFD preguiçoso se o autômato não é determinístico."""
+    if caminho.endswith(EXTENSAO_BINARIA):
+        # O formato binário já é a forma compilada: nada de objetos por estado
+        return carregar_binario(caminho)
+    # Direto do arquivo para a forma compilada; AFN viram um AFD preguiçoso
+    definicao = carregar_definicao(caminho)
+    if definicao.deterministico:
+        return definicao.para_compilado()
+    return DeterminizacaoPreguicosa(definicao.para_afn())
+
+
+def ler_lotes(caminho, tamanho_lote=TAMANHO_LOTE):
+    """Gera listas de até `tamanho_lote` cadeias (linhas sem a quebra) de `caminho`."""
+    lote = []
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            lote.append(linha[:-1] if linha.endswith('\n') else linha)
+            if len(lote) == tamanho_lote:
+                yield lote
+                lote = []
+    if lote:
+        yield lote
+
+
+def executar(compilado, lotes, trabalhadores, classificar=_classificar):
+    """Gera `(lote, vereditos)` na ordem dos lotes, processando-os em `trabalhadores` processos.
+
+    No máximo dois lotes por processo ficam em andamento, então a memória não cresce
+    com o tamanho do arquivo de cadeias. `classificar` é `_classificar`,
+    `_classificar_prefixos` ou, com um produto, `_classificar_produto`.
+    """
+    if trabalhadores <= 1:
+        _iniciar_trabalhador(compilado)
+        for lote in lotes:
+            yield lote, classificar(lote)
+        return
+
+    with ProcessPoolExecutor(trabalhadores, initializer=_iniciar_trabalhador,
+                             initargs=(compilado,)) as executor:
+        pendentes = deque()
+        for lote in lotes:
+            pendentes.append((lote, executor.submit(classificar, lote)))
+            if len(pendentes) >= 2 * trabalhadores:
+                lote, futuro = pendentes.popleft()
+                yield lote, futuro.result()
+        while pendentes:
+            lote, futuro = pendentes.popleft()
+            yield lote, futuro.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m nucleo',
+                                     description="Simula um arquivo de cadeias em lote.")
+    parser.add_argument('automatos', nargs='+', metavar='automato',
+                        help="arquivo do autômato (.txt, .json ou .afdb); com vários, "
+                             "todos são simulados numa única passada")
+    parser.add_argument('cadeias', help="arquivo com uma cadeia por linha")
+    parser.add_argument('-o', '--saida', help="arquivo de vereditos (padrão: saída padrão)")
+    parser.add_argument('-j', '--trabalhadores', type=int, default=os.cpu_count() or 1,
+                        help="número de processos (padrão: número de núcleos)")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE,
+                        help="cadeias enviadas por vez a cada processo")
+    parser.add_argument('--prefixos', action='store_true',
+                        help="simula cada prefixo comum uma vez por lote (cadeias com prefixos "
+                             "longos em comum; use lotes grandes)")
+    args = parser.parse_args(argv)
+
+    varios = len(args.automatos) > 1
+    if varios and args.prefixos:
+        parser.error("--prefixos aceita um único autômato")
+    try:
+        motores = [carregar_motor(caminho) for caminho in args.automatos]
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"erro ao carregar o autômato: {e}")
+    compilado = ProdutoPreguicoso(motores) if varios else motores[0]
+    if not os.path.isfile(args.cadeias):
+        parser.error(f"arquivo de cadeias não encontrado: {args.cadeias}")
+
+    saida = open(args.saida, 'w', encoding='utf-8') if args.saida else sys.stdout
+    inicio = time.perf_counter()
+    total = aceitas = simbolos = 0
+    try:
+        lotes = ler_lotes(args.cadeias, args.lote)
+        if varios:
+            classificar = _classificar_produto
+        else:
+            classificar = _classificar_prefixos if args.prefixos else _classificar
+        nomes = {}  # máscara -> automatos que aceitam, como escritos na saída
+        for lote, vereditos in executar(compilado, lotes, args.trabalhadores, classificar):
+            if varios:
+                for mascara in vereditos:
+                    if mascara not in nomes:
+                        nomes[mascara] = ','.join(
+                            c for i, c in enumerate(args.automatos) if mascara >> i & 1) or '-'
+                saida.write(''.join(
+                    f"{nomes[m]}\t{cadeia}\n" for cadeia, m in zip(lote, vereditos)))
+                aceitas += sum(1 for m in vereditos if m)
+            else:
+                saida.write(''.join(
+                    f"{'aceita' if v else 'rejeitada'}\t{cadeia}\n" for cadeia, v in zip(lote, vereditos)))
+                aceitas += sum(vereditos)
+            total += len(lote)
+            simbolos += sum(map(len, lote))
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    decorrido = time.perf_counter() - inicio
+    por_segundo = 1 / decorrido if decorrido else 0.0
+
+    print(f"cadeias: {total}  aceitas: {aceitas}  rejeitadas: {total - aceitas}", file=sys.stderr)
+    print(f"tempo: {decorrido:.3f} s  processos: {args.trabalhadores}  "
+          f"vazão: {total * por_segundo:,.0f} cadeias/s, {simbolos * por_segundo:,.0f} símbolos/s",
+          file=sys.stderr)
+    return 0
@@ -0,0 +1,210 @@
+"""Motor compilado para autômatos finitos determinísticos.
+
+O `Automato` de simulator_automato.py guarda as transições em vetores esparsos (ver
+nucleo.transicoes). Para simular muitas cadeias convertemos esse grafo numa tabela densa:
+estados viram inteiros, símbolos viram colunas e todas as transições ficam num único
+`array` plano, com uma linha extra (`morto`) que funciona como sumidouro de rejeição.
+
+As colunas não são os símbolos, e sim classes de equivalência deles: símbolos que levam
+cada estado ao mesmo destino (por exemplo, todas as letras de um identificador)
+dividem uma coluna, então a tabela cresce com o número de comportamentos distintos e
+não com o tamanho do alfabeto. Para cadeias de texto, `TabelaClasses` traduz cada
+caractere na sua classe com `str.translate`: os pontos ASCII ficam numa tabela
+completa e os demais são achados por bisseção em intervalos de pontos de código.
+"""
+from array import array
+from bisect import bisect_right
+
+from nucleo.rastro import Rastro
+
+TRECHO = 4096  # Caracteres traduzidos por vez: memória limitada e parada cedo no sumidouro
+LIMITE_MEMORIA = 1 << 16  # Pontos não ASCII memorizados pela TabelaClasses
+LIMITE_DENSA = 1 << 22  # Posições da tabela densa usada para achar as classes
+
+
+def agrupar_simbolos(simbolos, estados, origens, rotulos, destinos):
+    """Agrupa os códigos de símbolo 0..simbolos-1 em classes e monta a tabela por classe.
+
+    Dois códigos são equivalentes se têm as mesmas transições (origem, destino) em todos
+    os `estados`. Devolve `(classe de cada código, largura, tabela)`, com uma coluna por
+    classe; as classes são numeradas na ordem do primeiro código de cada uma.
+    """
+    classes = {}
+    if (estados + 1) * simbolos <= LIMITE_DENSA:
+        # A coluna de cada símbolo na tabela densa, lida por fatia estendida (em C)
+        densa = montar_tabela(estados, max(simbolos, 1), origens, rotulos, destinos)
+        classe = []
+        representantes = []
+        for codigo in range(simbolos):
+            coluna = densa[codigo::simbolos]
+            classe.append(classes.setdefault(coluna.tobytes(), len(classes)))
+            if len(classes) > len(representantes):
+                representantes.append(coluna)
+        largura = max(len(classes), 1)
+        if largura == simbolos:
+            return classe, largura, densa  # Nenhum símbolo equivalente a outro
+        tabela = array('i', [estados]) * ((estados + 1) * largura)
+        for coluna, valores in enumerate(representantes):
+            tabela[coluna::largura] = valores
+        return classe, largura, tabela
+
+    # Alfabeto grande demais para a tabela densa: as transições (origem, destino) de cada símbolo
+    pares = [[] for _ in range(simbolos)]
+    for origem, rotulo, destino in zip(origens, rotulos, destinos):
+        pares[rotulo].append((origem, destino))
+    classe = [classes.setdefault(tuple(sorted(transicoes)), len(classes)) for transicoes in pares]
+    largura = max(len(classes), 1)
+    colunas = [classe[rotulo] for rotulo in rotulos]
+    return classe, largura, montar_tabela(estados, largura, origens, colunas, destinos)
+
+
+def montar_tabela(estados, largura, origens, colunas, destinos):
+    """Tabela plana `(estados + 1) * largura` com as transições dadas e o resto no sumidouro."""
+    tabela = array('i', [estados]) * ((estados + 1) * largura)
+    for origem, coluna, destino in zip(origens, colunas, destinos):
+        tabela[origem * largura + coluna] = destino
+    return tabela
+
+
+class TabelaClasses(dict):
+    """Mapa ponto de código -> caractere da classe, para `str.translate`.
+
+    Os 128 pontos ASCII já estão no dicionário (o `translate` do CPython os guarda numa
+    tabela própria); os outros são buscados por bisseção nos intervalos de pontos
+    consecutivos de mesma classe e memorizados. Pontos sem símbolo viram `desconhecida`.
+    """
+
+    def __init__(self, colunas, desconhecida):
+        self.desconhecida = chr(desconhecida)
+        tabela = [self.desconhecida] * 128
+        resto = []
+        for simbolo, coluna in colunas.items():
+            if len(simbolo) == 1:
+                if ord(simbolo) < 128:
+                    tabela[ord(simbolo)] = chr(coluna)
+                else:
+                    resto.append((ord(simbolo), coluna))
+        super().__init__(enumerate(tabela))
+        # Intervalos [inicios[i], fins[i]) de pontos com a classe classes[i]
+        self.inicios, self.fins, self.classes = [], [], []
+        for ponto, coluna in sorted(resto):
+            if self.fins and self.fins[-1] == ponto and self.classes[-1] == chr(coluna):
+                self.fins[-1] += 1
+            else:
+                self.inicios.append(ponto)
+                self.fins.append(ponto + 1)
+                self.classes.append(chr(coluna))
+
+    def __missing__(self, ponto):
+        i = bisect_right(self.inicios, ponto) - 1
+        classe = self.classes[i] if i >= 0 and ponto < self.fins[i] else self.desconhecida
+        if len(self) < LIMITE_MEMORIA:
+            self[ponto] = classe
+        return classe
+
+
+class AutomatoCompilado:
+    """Forma compilada de um AFD: estados numerados, mapa símbolo -> coluna e tabela plana.
+
+    A posição `tabela[estado * largura + coluna]` guarda o destino da transição. Toda
+    transição ausente aponta para `morto`, que só leva a si mesmo e nunca aceita.
+    Várias entradas de `colunas` podem apontar para a mesma coluna (classe de símbolos).
+    """
+
+    def __init__(self, nomes, colunas, tabela, finais, inicial, largura=None):
+        self.nomes = nomes          # id -> nome do estado
+        self.colunas = colunas      # símbolo -> coluna
+        self.tabela = tabela        # array plano com (len(nomes) + 1) * largura destinos
+        self.finais = finais        # bytearray: 1 se o id é de aceitação (inclui o morto)
+        self.inicial = inicial
+        self.largura = largura if largura is not None else max(colunas.values(), default=0) + 1
+        self.morto = len(nomes)
+        self._classes = None  # TabelaClasses, montada no primeiro `avancar` sobre texto
+
+    def __getstate__(self):
+        # Tabela e nomes podem vir de um arquivo mapeado (memoryview): copiar para enviar
+        estado = self.__dict__.copy()
+        if not isinstance(self.tabela, array):
+            estado['tabela'] = array('i', self.tabela)
+        if not isinstance(self.nomes, list):
+            estado['nomes'] = list(self.nomes)
+        estado['_classes'] = None
+        return estado
+
+    @classmethod
+    def compilar(cls, automato):
+        grafo = automato.grafo
+        origens, rotulos, destinos = grafo.vetores()
+        nomes = list(grafo.nomes)
+        morto = len(nomes)
+        # Uma coluna por classe de símbolos equivalentes
+        classe, largura, tabela = agrupar_simbolos(len(grafo.simbolos), morto, origens, rotulos,
+                                                   destinos)
+        colunas = dict(zip(grafo.simbolos, classe))
+        finais = bytearray(automato.finais)
+        finais.append(0)
+
+        inicial = automato.estado_inicial
+        return cls(nomes, colunas, tabela, finais, morto if inicial is None else inicial.id, largura)
+
+    def passo(self, estado, simbolo):
+        """Id alcançado a partir de `estado` com um símbolo (ou `morto`)."""
+        coluna = self.colunas.get(simbolo)
+        if coluna is None:
+            return self.morto
+        return self.tabela[estado * self.largura + coluna]
+
+    def avancar(self, estado, cadeia):
+        """Consome `cadeia` a partir do id `estado` e devolve o id alcançado (ou `morto`)."""
+        if type(cadeia) is str and self.largura < 256:
+            return self._avancar_texto(estado, cadeia)
+        colunas = self.colunas
+        tabela = self.tabela
+        largura = self.largura
+        morto = self.morto
+        for simbolo in cadeia:
+            coluna = colunas.get(simbolo)
+            if coluna is None:
+                return morto
+            estado = tabela[estado * largura + coluna]
+            if estado == morto:
+                return morto
+        return estado
+
+    def _avancar_texto(self, estado, cadeia):
+        # Cada trecho vira uma cadeia de classes (um byte por caractere): o laço não
+        # consulta dicionário, e um caractere sem símbolo manda para o sumidouro
+        classes = self._classes
+        if classes is None:
+            classes = self._classes = TabelaClasses(self.colunas, self.largura)
+        desconhecida = classes.desconhecida
+        tabela = self.tabela
+        largura = self.largura
+        morto = self.morto
+        for inicio in range(0, len(cadeia), TRECHO):
+            traduzido = cadeia[inicio:inicio + TRECHO].translate(classes)
+            corte = traduzido.find(desconhecida)
+            if corte >= 0:
+                traduzido = traduzido[:corte]
+            for coluna in traduzido.encode('latin-1'):
+                estado = tabela[estado * largura + coluna]
+                if estado == morto:
+                    return morto
+            if corte >= 0:
+                return morto
+        return estado
+
+    def aceita(self, estado):
+        return bool(self.finais[estado])
+
+    def simular(self, cadeia):
+        return bool(self.finais[self.avancar(self.inicial, cadeia)])
+
+    def simular_passo(self, cadeia, rastro=None):
+        """Como `simular`, mas registra os passos em `rastro` (um `Rastro` completo por padrão).
+
+        Devolve (aceita, rastro); cada passo lido do rastro é (origem, símbolo, destino).
+        """
+        if rastro is None:
+            rastro = Rastro()
+        return bool(self.finais[rastro.gravar(self, cadeia)]), rastro
@@ -0,0 +1,91 @@
+"""Determinização preguiçosa (construção de subconjuntos sob demanda) com cache limitado.
+
+Determinizar um AFN grande de uma vez pode gerar um número exponencial de estados, e
+simular o AFN a cada entrada repete o mesmo trabalho. Aqui cada estado do AFD é uma
+configuração do `AFNBits` (a máscara inteira funciona como conjunto congelado e
+internado de estados do AFN) e só é criado quando alguma entrada chega a ele; suas
+transições são memorizadas à medida que são usadas. O número de estados guardados é
+limitado e o menos usado recentemente é descartado quando o limite é atingido.
+"""
+from collections import OrderedDict
+
+
+class DeterminizacaoPreguicosa:
+    """AFD construído sob demanda sobre um `AFNBits`, com despejo LRU e contadores."""
+
+    def __init__(self, afn, max_estados=4096):
+        if max_estados < 1:
+            raise ValueError("O limite de estados do AFD deve ser positivo.")
+        self.afn = afn
+        self.max_estados = max_estados
+        self._estados = OrderedDict()  # máscara -> {símbolo: máscara de destino}
+        self.acertos = 0   # transições respondidas pelo cache
+        self.falhas = 0    # transições calculadas no AFN
+        self.despejos = 0  # estados descartados pelo limite de memória
+
+    @property
+    def inicial(self):
+        return self.afn.inicial
+
+    def __len__(self):
+        return len(self._estados)
+
+    def _linha(self, mascara):
+        """Devolve as transições memorizadas de `mascara`, criando o estado se preciso."""
+        linha = self._estados.get(mascara)
+        if linha is None:
+            linha = self._estados[mascara] = {}
+            if len(self._estados) > self.max_estados:
+                self._estados.popitem(last=False)
+                self.despejos += 1
+        else:
+            self._estados.move_to_end(mascara)
+        return linha
+
+    def passo(self, mascara, simbolo):
+        linha = self._linha(mascara)
+        destino = linha.get(simbolo)
+        if destino is None:
+            self.falhas += 1
+            destino = linha[simbolo] = self.afn.passo(mascara, simbolo)
+        else:
+            self.acertos += 1
+        return destino
+
+    def avancar(self, mascara, cadeia):
+        afn = self.afn
+        linha = self._linha(mascara)
+        acertos = falhas = 0
+        for simbolo in cadeia:
+            destino = linha.get(simbolo)
+            if destino is None:
+                falhas += 1
+                destino = linha[simbolo] = afn.passo(mascara, simbolo)
+            else:
+                acertos += 1
+            mascara = destino
+            if not mascara:
+                break
+            linha = self._linha(mascara)
+        self.acertos += acertos
+        self.falhas += falhas
+        return mascara
+
+    def aceita(self, mascara):
+        return self.afn.aceita(mascara)
+
+    def simular(self, cadeia):
+        return self.afn.aceita(self.avancar(self.afn.inicial, cadeia))
+
+    def estatisticas(self):
+        return {
+            'estados': len(self._estados),
+            'max_estados': self.max_estados,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'despejos': self.despejos,
+        }
+
+    def limpar(self):
+        self._estados.clear()
+        self.acertos = self.falhas = self.despejos = 0
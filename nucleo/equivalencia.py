@@ -0,0 +1,289 @@
+"""Equivalência, inclusão e universalidade de linguagens, com um menor contraexemplo.
+
+Comparar as saídas em cadeias de amostra é lento e não prova nada; aqui a comparação
+é exata e não determiniza os autômatos por inteiro:
+
+- `equivalencia_afd` (Hopcroft–Karp): pares de estados, um de cada AFD, são visitados
+  em largura a partir dos iniciais e unidos numa união-busca. Um par já unido,
+  diretamente ou por transitividade, não é visitado de novo, então são no máximo tantos
+  pares quanto estados somados, em vez do produto inteiro.
+- `inclusao` e `universalidade` (anticadeias), para AFN com transições em vazio como os
+  de simulador_v2: a busca anda por pares (estado do primeiro, conjunto de estados do
+  segundo) e guarda, por estado, só os conjuntos mínimos já vistos. Um par cujo conjunto
+  contém o de outro já visitado não leva a contraexemplo que o outro não leve, e é
+  descartado sem gerar os subconjuntos da determinização. Também é descartado o par
+  cujo conjunto tem um estado que simula o do primeiro autômato: a simulação parte
+  dos estados de mesmo nome, então comparar um autômato com uma versão editada
+  dele não percorre de novo as partes que não mudaram.
+
+As buscas são em largura, então o contraexemplo é uma das menores cadeias em que os
+autômatos diferem. As funções devolvem None quando a propriedade vale (a cadeia vazia
+é um contraexemplo legítimo) e aceitam o `Automato` de nucleo.afd ou de nucleo.afn, o
+`AutomatoCompilado` ou o `AFNBits`.
+
+Uso: `python -m nucleo.equivalencia A B [--inclusao]` ou `python -m nucleo.equivalencia A --universal`.
+"""
+import argparse
+import sys
+
+from nucleo.afn import AFNBits
+from nucleo.carregador import carregar_definicao
+from nucleo.compilado import AutomatoCompilado
+
+
+def _compilado(automato):
+    return automato if isinstance(automato, AutomatoCompilado) else automato.compilar()
+
+
+def _deterministico(automato):
+    if isinstance(automato, AFNBits):  # `AFNBits.compilar` monta o motor, não um AFD
+        return False
+    return isinstance(automato, AutomatoCompilado) or hasattr(automato, 'compilar')
+
+
+def _afn(automato):
+    """Motor `AFNBits` do autômato; um AFD vira um AFN com no máximo um destino por símbolo."""
+    if isinstance(automato, AFNBits):
+        return automato
+    if not _deterministico(automato):
+        return automato.motor()
+    compilado = _compilado(automato)
+    tabela, largura, morto = compilado.tabela, compilado.largura, compilado.morto
+    simbolos = list(compilado.colunas)
+    origens, rotulos, destinos = [], [], []
+    for rotulo, simbolo in enumerate(simbolos):
+        coluna = compilado.colunas[simbolo]
+        for origem in range(morto):
+            destino = tabela[origem * largura + coluna]
+            if destino != morto:
+                origens.append(origem)
+                rotulos.append(rotulo)
+                destinos.append(destino)
+    finais = [estado for estado in range(morto) if compilado.finais[estado]]
+    inicial = None if compilado.inicial == morto else compilado.inicial
+    return AFNBits.montar(list(compilado.nomes), simbolos, origens, rotulos, destinos, finais,
+                          inicial)
+
+
+def _cadeia(visitados, indice):
+    """Refaz o caminho até `visitados[indice]`, cujos dois últimos campos são (anterior, símbolo)."""
+    simbolos = []
+    while True:
+        *_, indice, simbolo = visitados[indice]
+        if simbolo is None:  # Um dos pontos de partida
+            break
+        simbolos.append(simbolo)
+    return ''.join(reversed(simbolos))
+
+
+def equivalencia_afd(a, b):
+    """None se os AFDs aceitam a mesma linguagem; senão, uma das menores cadeias em que diferem."""
+    a, b = _compilado(a), _compilado(b)
+    # Símbolos com o mesmo par de colunas nos dois AFDs movem os pares de estados do
+    # mesmo jeito: basta um representante de cada par de classes
+    representantes = {}
+    for simbolo in sorted(a.colunas.keys() | b.colunas.keys()):
+        representantes.setdefault((a.colunas.get(simbolo), b.colunas.get(simbolo)), simbolo)
+    tabela_a, largura_a, morto_a, finais_a = a.tabela, a.largura, a.morto, a.finais
+    tabela_b, largura_b, morto_b, finais_b = b.tabela, b.largura, b.morto, b.finais
+    deslocamento = morto_a + 1  # Os estados de `b` vêm depois dos de `a` na união-busca
+    pai = list(range(deslocamento + morto_b + 1))
+
+    def raiz(x):
+        while pai[x] != x:
+            pai[x] = pai[pai[x]]  # Encurta o caminho pela metade
+            x = pai[x]
+        return x
+
+    # A lista é a fila da busca: (estado de a, estado de b, índice do anterior, símbolo)
+    visitados = [(a.inicial, b.inicial, None, None)]
+    if finais_a[a.inicial] != finais_b[b.inicial]:
+        return ''
+    pai[a.inicial] = b.inicial + deslocamento
+    atual = 0
+    while atual < len(visitados):
+        x, y, _, _ = visitados[atual]
+        for (coluna_a, coluna_b), simbolo in representantes.items():
+            proximo_x = morto_a if coluna_a is None else tabela_a[x * largura_a + coluna_a]
+            proximo_y = morto_b if coluna_b is None else tabela_b[y * largura_b + coluna_b]
+            raiz_x, raiz_y = raiz(proximo_x), raiz(proximo_y + deslocamento)
+            if raiz_x != raiz_y:
+                pai[raiz_x] = raiz_y
+                visitados.append((proximo_x, proximo_y, atual, simbolo))
+                if finais_a[proximo_x] != finais_b[proximo_y]:
+                    return _cadeia(visitados, len(visitados) - 1)
+        atual += 1
+    return None
+
+
+def _acrescentar(minimos, chave, conjunto):
+    """Guarda `conjunto` na anticadeia de `chave`, a menos que contenha um conjunto já guardado."""
+    anticadeia = minimos.get(chave)
+    if anticadeia is None:
+        minimos[chave] = [conjunto]
+        return True
+    contidos = False
+    for guardado in anticadeia:
+        comum = guardado & conjunto
+        if comum == guardado:
+            return False
+        if comum == conjunto:
+            contidos = True
+    if contidos:  # Conjuntos que contêm o novo deixam de ser mínimos
+        anticadeia[:] = [maior for maior in anticadeia if maior & conjunto != conjunto]
+    anticadeia.append(conjunto)
+    return True
+
+
+def _simulacao(a, b):
+    """Para cada estado de `a`, a máscara (zero ou um bit) do estado de mesmo nome em `b` que o simula.
+
+    Começa pelos pares de mesmo nome e descarta, até estabilizar, os pares em que `b`
+    não acompanha `a`: estado final que o outro não é, ou sucessor de `a` sem par entre
+    os sucessores de `b` pelo mesmo símbolo. O que sobra é uma simulação: a linguagem
+    do estado de `a` está contida na do seu par.
+    """
+    par = [b.ids.get(nome) for nome in a.nomes]
+    for estado, outro in enumerate(par):
+        if outro is not None and a.finais >> estado & 1 and not b.finais >> outro & 1:
+            par[estado] = None
+    alterado = True
+    while alterado:
+        alterado = False
+        for estado, outro in enumerate(par):
+            if outro is None:
+                continue
+            bit = 1 << estado
+            for simbolo, linha in a.sucessores.items():
+                if not a.origens[simbolo] & bit:
+                    continue
+                linha_b = b.sucessores.get(simbolo)
+                alcancados = linha_b[outro] if linha_b is not None else 0
+                destinos = linha[estado]
+                while destinos:
+                    menor = destinos & -destinos
+                    destinos ^= menor
+                    correspondente = par[menor.bit_length() - 1]
+                    if correspondente is None or not alcancados >> correspondente & 1:
+                        break
+                else:
+                    continue
+                par[estado] = None
+                alterado = True
+                break
+    return [0 if outro is None else 1 << outro for outro in par]
+
+
+def inclusao(a, b):
+    """None se toda cadeia aceita por `a` é aceita por `b`; senão, uma das menores que não é."""
+    a, b = _afn(a), _afn(b)
+    simbolos = sorted(a.sucessores)
+    finais_a, finais_b = a.finais, b.finais
+    simulado = _simulacao(a, b)
+    proximos = {}  # (conjunto de b, símbolo) -> conjunto seguinte: vários estados de a o repetem
+    minimos = {}  # estado de a -> anticadeia de conjuntos de estados de b
+    visitados = []  # fila da busca: (estado de a, conjunto de b, índice do anterior, símbolo)
+    estados = a.inicial
+    while estados:
+        menor = estados & -estados
+        estados ^= menor
+        estado = menor.bit_length() - 1
+        if not b.inicial & simulado[estado] and _acrescentar(minimos, estado, b.inicial):
+            visitados.append((estado, b.inicial, None, None))
+            if menor & finais_a and not b.inicial & finais_b:
+                return ''
+    atual = 0
+    while atual < len(visitados):
+        estado, conjunto, _, _ = visitados[atual]
+        bit = 1 << estado
+        for simbolo in simbolos:
+            if not a.origens[simbolo] & bit:
+                continue
+            destinos = a.sucessores[simbolo][estado]
+            proximo = proximos.get((conjunto, simbolo))
+            if proximo is None:
+                proximo = proximos[conjunto, simbolo] = b.passo(conjunto, simbolo)
+            while destinos:
+                menor = destinos & -destinos
+                destinos ^= menor
+                destino = menor.bit_length() - 1
+                if not proximo & simulado[destino] and _acrescentar(minimos, destino, proximo):
+                    visitados.append((destino, proximo, atual, simbolo))
+                    if menor & finais_a and not proximo & finais_b:
+                        return _cadeia(visitados, len(visitados) - 1)
+        atual += 1
+    return None
+
+
+def universalidade(a, alfabeto=None):
+    """None se `a` aceita toda cadeia sobre `alfabeto` (padrão: os símbolos de `a`); senão, uma das menores rejeitadas."""
+    a = _afn(a)
+    simbolos = sorted(a.sucessores if alfabeto is None else alfabeto)
+    finais = a.finais
+    if not a.inicial & finais:
+        return ''
+    minimos = {None: [a.inicial]}
+    visitados = [(a.inicial, None, None)]
+    atual = 0
+    while atual < len(visitados):
+        conjunto = visitados[atual][0]
+        for simbolo in simbolos:
+            proximo = a.passo(conjunto, simbolo)
+            if _acrescentar(minimos, None, proximo):
+                visitados.append((proximo, atual, simbolo))
+                if not proximo & finais:
+                    return _cadeia(visitados, len(visitados) - 1)
+        atual += 1
+    return None
+
+
+def equivalencia(a, b):
+    """None se `a` e `b` aceitam a mesma linguagem; senão, uma das menores cadeias em que diferem.
+
+    Dois AFDs usam Hopcroft–Karp; com algum AFN, a inclusão nos dois sentidos.
+    """
+    if _deterministico(a) and _deterministico(b):
+        return equivalencia_afd(a, b)
+    a, b = _afn(a), _afn(b)
+    contraexemplos = [c for c in (inclusao(a, b), inclusao(b, a)) if c is not None]
+    return min(contraexemplos, key=len, default=None)
+
+
+def _carregar(caminho):
+    definicao = carregar_definicao(caminho)
+    return definicao.para_compilado() if definicao.deterministico else definicao.para_afn()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m nucleo.equivalencia',
+                                     description="Compara as linguagens de dois autômatos.")
+    parser.add_argument('automato', help="arquivo do autômato (.txt ou .json)")
+    parser.add_argument('outro', nargs='?', help="autômato comparado com o primeiro")
+    parser.add_argument('--inclusao', action='store_true',
+                        help="só confere se a linguagem do primeiro está contida na do outro")
+    parser.add_argument('--universal', action='store_true',
+                        help="confere se o autômato aceita toda cadeia do seu alfabeto")
+    args = parser.parse_args(argv)
+    if args.universal == (args.outro is not None):
+        parser.error("informe dois autômatos ou um autômato com --universal")
+
+    try:
+        a = _carregar(args.automato)
+        b = _carregar(args.outro) if args.outro is not None else None
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"erro ao carregar o autômato: {e}")
+    if args.universal:
+        contraexemplo, mensagem = universalidade(a), "aceita todas as cadeias"
+    elif args.inclusao:
+        contraexemplo, mensagem = inclusao(a, b), "linguagem contida na do outro"
+    else:
+        contraexemplo, mensagem = equivalencia(a, b), "equivalentes"
+    if contraexemplo is None:
+        print(mensagem)
+        return 0
+    print(f"contraexemplo: {contraexemplo!r}")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Simulação em fluxo de arquivos grandes sobre a forma compilada de um AFD.
+
+O arquivo é lido em blocos de tamanho fixo (por leitura bufferizada ou por `mmap`) e
+decodificado de forma incremental, então um caractere multibyte partido entre dois
+blocos é tratado corretamente. O estado do AFD é carregado de um bloco para o outro;
+a memória usada depende só do tamanho do bloco, nunca do tamanho do arquivo.
+"""
+import codecs
+import mmap
+import os
+
+TAMANHO_BLOCO = 1 << 20  # 1 MiB
+
+
+def ler_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO, usar_mmap=False, codificacao='utf-8',
+               progresso=None):
+    """Gera o conteúdo de `caminho` como texto, em pedaços de até `tamanho_bloco` bytes.
+
+    `progresso(lidos, total)`, se dado, é chamado em bytes antes de cada pedaço; uma
+    exceção levantada por ele interrompe a leitura.
+    """
+    decodificador = codecs.getincrementaldecoder(codificacao)()
+    with open(caminho, 'rb') as arquivo:
+        total = os.fstat(arquivo.fileno()).st_size
+        if usar_mmap:
+            try:
+                mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                mapa = None  # Arquivo vazio não pode ser mapeado
+            if mapa is not None:
+                with mapa:
+                    if hasattr(mapa, 'madvise'):
+                        mapa.madvise(mmap.MADV_SEQUENTIAL)
+                    for inicio in range(0, len(mapa), tamanho_bloco):
+                        if progresso:
+                            progresso(inicio, total)
+                        texto = decodificador.decode(mapa[inicio:inicio + tamanho_bloco])
+                        if texto:
+                            yield texto
+        else:
+            while True:
+                if progresso:
+                    progresso(arquivo.tell(), total)
+                dados = arquivo.read(tamanho_bloco)
+                if not dados:
+                    break
+                texto = decodificador.decode(dados)
+                if texto:
+                    yield texto
+    texto = decodificador.decode(b'', final=True)
+    if texto:
+        yield texto
+
+
+def simular_cadeia(compilado, cadeia, progresso=None, tamanho_bloco=TAMANHO_BLOCO):
+    """Como `compilado.simular(cadeia)`, mas em blocos, chamando `progresso(consumidos, total)`.
+
+    Serve para rodar cadeias grandes fora da thread da interface: uma exceção levantada
+    por `progresso` interrompe a simulação.
+    """
+    estado = compilado.inicial
+    morto = compilado.morto
+    for inicio in range(0, len(cadeia), tamanho_bloco):
+        if progresso:
+            progresso(inicio, len(cadeia))
+        estado = compilado.avancar(estado, cadeia[inicio:inicio + tamanho_bloco])
+        if estado == morto:
+            return False
+    return compilado.aceita(estado)
+
+
+def simular_fluxo(compilado, caminho, **opcoes):
+    """Aceita ou rejeita o conteúdo inteiro do arquivo como uma única cadeia.
+
+    A leitura para assim que o AFD cai no sumidouro. `opcoes` são repassadas a `ler_blocos`.
+    """
+    estado = compilado.inicial
+    morto = compilado.morto
+    for texto in ler_blocos(caminho, **opcoes):
+        estado = compilado.avancar(estado, texto)
+        if estado == morto:
+            return False
+    return compilado.aceita(estado)
+
+
+def classificar_linhas(compilado, caminho, caminho_saida, aceita='aceita', rejeitada='rejeitada',
+                       **opcoes):
+    """Simula cada linha do arquivo e escreve um veredito por linha em `caminho_saida`.
+
+    Quebras de linha '\\n' e '\\r\\n' não fazem parte da cadeia. Uma linha que cai no
+    sumidouro tem o resto pulado até a próxima quebra. Devolve `(linhas, aceitas)`.
+    """
+    inicial = compilado.inicial
+    morto = compilado.morto
+    finais = compilado.finais
+    avancar = compilado.avancar
+    veredito = (rejeitada + '\n', aceita + '\n')
+
+    estado = inicial
+    aberta = False  # Há caracteres da linha atual ainda sem veredito
+    pendente = ''   # '\r' no fim de um bloco pode ser metade de um '\r\n'
+    linhas = aceitas = 0
+    with open(caminho_saida, 'w', encoding='utf-8') as saida:
+        for texto in ler_blocos(caminho, **opcoes):
+            if pendente:
+                texto = pendente + texto
+                pendente = ''
+            if texto.endswith('\r'):
+                texto, pendente = texto[:-1], '\r'
+            saidas = []
+            posicao = 0
+            tamanho = len(texto)
+            while posicao < tamanho:
+                quebra = texto.find('\n', posicao)
+                fim = tamanho if quebra < 0 else quebra
+                if quebra > posicao and texto[quebra - 1] == '\r':
+                    fim -= 1
+                if estado != morto and fim > posicao:
+                    estado = avancar(estado, texto[posicao:fim])
+                if quebra < 0:
+                    aberta = aberta or fim > posicao
+                    break
+                resultado = finais[estado]
+                saidas.append(veredito[resultado])
+                linhas += 1
+                aceitas += resultado
+                estado = inicial
+                aberta = False
+                posicao = quebra + 1
+            saida.write(''.join(saidas))
+        if pendente and estado != morto:
+            estado = avancar(estado, pendente)
+            aberta = True
+        if aberta:
+            resultado = finais[estado]
+            saida.write(veredito[resultado])
+            linhas += 1
+            aceitas += resultado
+    return linhas, aceitas
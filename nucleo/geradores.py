@@ -0,0 +1,147 @@
+"""Geradores de autômatos e cadeias aleatórios, para testes de escala e benchmarks.
+
+Os autômatos saem como definições no formato de teste_tamanho.json:
+`{"nome": ..., "estados": {nome: {"final": bool, "transicoes": {símbolo: destino}}}}`,
+com o primeiro estado como inicial. Em autômatos não determinísticos o destino pode ser
+uma lista de nomes e `%` marca as transições em vazio. A mesma semente gera sempre o
+mesmo autômato.
+
+Uso: `python -m nucleo.geradores {afd,afn} ESTADOS SIMBOLOS -o SAIDA [opções]`.
+"""
+import argparse
+import json
+import random
+import string
+import sys
+
+_SIMBOLOS_BASICOS = string.digits + string.ascii_lowercase + string.ascii_uppercase
+
+
+def alfabeto(tamanho):
+    """Lista de `tamanho` símbolos de um caractere: dígitos, letras e depois outros caracteres."""
+    simbolos = list(_SIMBOLOS_BASICOS[:tamanho])
+    simbolos.extend(chr(0x100 + i) for i in range(tamanho - len(simbolos)))
+    return simbolos
+
+
+def _sortear_finais(aleatorio, nomes, proporcao):
+    # Pelo menos um estado de aceitação, para que as cadeias não sejam todas rejeitadas
+    return set(aleatorio.sample(nomes, max(1, round(proporcao * len(nomes))))) if nomes else set()
+
+
+def afd_aleatorio(estados, simbolos, densidade=1.0, prob_final=0.25, semente=0):
+    """Definição de um AFD com `estados` estados sobre um alfabeto de `simbolos` símbolos.
+
+    Cada par (estado, símbolo) tem transição com probabilidade `densidade` (1.0 gera
+    um AFD completo) para um destino sorteado; uma fração `prob_final` dos estados
+    (pelo menos um) é de aceitação.
+    """
+    aleatorio = random.Random(semente)
+    nomes = [f"S{i}" for i in range(estados)]
+    finais = _sortear_finais(aleatorio, nomes, prob_final)
+    definicao = {}
+    for nome in nomes:
+        transicoes = {simbolo: aleatorio.choice(nomes)
+                      for simbolo in alfabeto(simbolos) if aleatorio.random() < densidade}
+        definicao[nome] = {"final": nome in finais, "transicoes": transicoes}
+    return {"nome": f"AFD_{estados}x{simbolos}", "estados": definicao}
+
+
+def afn_aleatorio(estados, simbolos, ramificacao=2, densidade=0.5, vazios=0.0, prob_final=0.25,
+                  semente=0):
+    """Definição de um AFN com `estados` estados sobre um alfabeto de `simbolos` símbolos.
+
+    Cada par (estado, símbolo) tem transição com probabilidade `densidade`, para 1 a
+    `ramificacao` destinos. `vazios` é o número médio de transições em vazio (`%`) por
+    estado: valores acima de 1 geram autômatos densos em vazio, com fechos grandes.
+    """
+    aleatorio = random.Random(semente)
+    nomes = [f"S{i}" for i in range(estados)]
+    finais = _sortear_finais(aleatorio, nomes, prob_final)
+    definicao = {}
+    for nome in nomes:
+        transicoes = {}
+        for simbolo in alfabeto(simbolos):
+            if aleatorio.random() < densidade:
+                quantidade = aleatorio.randint(1, ramificacao)
+                transicoes[simbolo] = sorted(set(aleatorio.choices(nomes, k=quantidade)))
+        # Número de transições em vazio sorteado em torno da média `vazios`
+        quantidade = int(vazios) + (aleatorio.random() < vazios - int(vazios))
+        if quantidade:
+            transicoes['%'] = sorted(set(aleatorio.choices(nomes, k=quantidade)))
+        definicao[nome] = {"final": nome in finais, "transicoes": transicoes}
+    return {"nome": f"AFN_{estados}x{simbolos}", "estados": definicao}
+
+
+def cadeias_aleatorias(simbolos, quantidade, tamanho, semente=0):
+    """Lista de `quantidade` cadeias de `tamanho` símbolos sorteados de `alfabeto(simbolos)`."""
+    aleatorio = random.Random(semente)
+    simbolos = alfabeto(simbolos)
+    return [''.join(aleatorio.choices(simbolos, k=tamanho)) for _ in range(quantidade)]
+
+
+def _destinos(destino):
+    return destino if isinstance(destino, list) else [destino]
+
+
+def salvar_json(definicao, caminho):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(definicao, f, indent=4, ensure_ascii=False)
+
+
+def salvar_txt(definicao, caminho):
+    """Salva a definição no formato .txt (#states/#initial/#accepting/#alphabet/#transitions)."""
+    estados = definicao["estados"]
+    alfabeto_usado = {simbolo for campos in estados.values() for simbolo in campos["transicoes"]}
+    alfabeto_usado.discard('%')
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write("#states\n")
+        f.writelines(f"{nome}\n" for nome in estados)
+        f.write("#initial\n")
+        f.write(f"{next(iter(estados))}\n")
+        f.write("#accepting\n")
+        f.writelines(f"{nome}\n" for nome, campos in estados.items() if campos["final"])
+        f.write("#alphabet\n")
+        f.writelines(f"{simbolo}\n" for simbolo in sorted(alfabeto_usado))
+        f.write("#transitions\n")
+        for nome, campos in estados.items():
+            for simbolo, destino in campos["transicoes"].items():
+                f.writelines(f"{nome}:{simbolo}>{alvo}\n" for alvo in _destinos(destino))
+
+
+def salvar(definicao, caminho):
+    """Salva em JSON ou .txt, conforme a extensão de `caminho`."""
+    if caminho.endswith('.json'):
+        salvar_json(definicao, caminho)
+    else:
+        salvar_txt(definicao, caminho)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m nucleo.geradores',
+                                     description="Gera um autômato aleatório (.txt ou .json).")
+    parser.add_argument('tipo', choices=('afd', 'afn'))
+    parser.add_argument('estados', type=int)
+    parser.add_argument('simbolos', type=int, help="tamanho do alfabeto")
+    parser.add_argument('-o', '--saida', required=True, help="arquivo de saída (.txt ou .json)")
+    parser.add_argument('--densidade', type=float, help="probabilidade de cada transição existir")
+    parser.add_argument('--ramificacao', type=int, default=2, help="máximo de destinos (AFN)")
+    parser.add_argument('--vazios', type=float, default=0.0,
+                        help="média de transições em vazio por estado (AFN)")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.tipo == 'afd':
+        definicao = afd_aleatorio(args.estados, args.simbolos,
+                                  1.0 if args.densidade is None else args.densidade,
+                                  semente=args.semente)
+    else:
+        definicao = afn_aleatorio(args.estados, args.simbolos, args.ramificacao,
+                                  0.5 if args.densidade is None else args.densidade,
+                                  args.vazios, semente=args.semente)
+    salvar(definicao, args.saida)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
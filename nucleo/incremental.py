@@ -0,0 +1,81 @@
+"""Simulação incremental de uma cadeia que está sendo editada (resultado ao digitar).
+
+A cada alteração do texto, só o trecho depois do maior prefixo comum com o texto
+anterior é simulado de novo: a configuração do motor é guardada por posição, e a
+simulação recomeça da configuração guardada mais próxima antes da alteração.
+
+A memória é limitada: enquanto o texto tem até `capacidade` símbolos guardamos a
+configuração depois de cada um; quando passa disso, metade dos pontos é descartada e
+o intervalo entre eles dobra. Assim nunca há mais que `capacidade` configurações, e
+uma edição refaz no máximo um intervalo antes dela (um único símbolo em cadeias
+curtas, o caso comum ao digitar).
+
+Funciona com os motores de nucleo.linha_do_tempo: o `AutomatoCompilado` (AFD), o
+`AFNBits` e a `DeterminizacaoPreguicosa` (AFN).
+"""
+CAPACIDADE = 4096
+
+
+def prefixo_comum(a, b):
+    """Tamanho do maior prefixo comum entre `a` e `b` (comparando fatias, não símbolo a símbolo)."""
+    menor = min(len(a), len(b))
+    if a[:menor] == b[:menor]:
+        return menor
+    inicio, fim = 0, menor  # a[:inicio] == b[:inicio] e a[:fim] != b[:fim]
+    while fim - inicio > 1:
+        meio = (inicio + fim) // 2
+        if a[inicio:meio] == b[inicio:meio]:
+            inicio = meio
+        else:
+            fim = meio
+    return inicio
+
+
+class SimulacaoIncremental:
+    """Configuração de `motor` depois do texto atual, atualizada a cada edição."""
+
+    def __init__(self, motor, capacidade=CAPACIDADE, morto=None):
+        if capacidade < 2:
+            raise ValueError("A capacidade do cache deve ser de pelo menos 2 configurações.")
+        self.motor = motor
+        self.capacidade = capacidade
+        # Configuração sem saída: o sumidouro do AFD ou a máscara vazia do AFN
+        self.morto = morto if morto is not None else getattr(motor, 'morto', 0)
+        self.cadeia = ""
+        self.intervalo = 1
+        self.marcos = [motor.inicial]  # configuração nas posições 0, intervalo, 2 * intervalo...
+        self.configuracao = motor.inicial
+        self.refeitos = 0  # símbolos simulados na última atualização
+
+    def aceita(self):
+        return self.motor.aceita(self.configuracao)
+
+    def atualizar(self, cadeia):
+        """Passa a simular `cadeia` e devolve a configuração depois dela."""
+        comum = prefixo_comum(self.cadeia, cadeia)
+        if comum == 0:
+            self.intervalo = 1  # Texto novo: volta à precisão de um símbolo
+        # Pontos de controle até o prefixo comum continuam valendo
+        del self.marcos[comum // self.intervalo + 1:]
+        self.cadeia = cadeia
+        motor = self.motor
+        intervalo = self.intervalo
+        posicao = (len(self.marcos) - 1) * intervalo
+        configuracao = self.marcos[-1]
+        self.refeitos = 0
+        while configuracao != self.morto and posicao + intervalo <= len(cadeia):
+            configuracao = motor.avancar(configuracao, cadeia[posicao:posicao + intervalo])
+            self.refeitos += intervalo
+            posicao += intervalo
+            self.marcos.append(configuracao)
+            if len(self.marcos) > self.capacidade:
+                del self.marcos[1::2]
+                intervalo = self.intervalo = intervalo * 2
+                posicao = (len(self.marcos) - 1) * intervalo
+                configuracao = self.marcos[-1]
+        if configuracao != self.morto and posicao < len(cadeia):
+            configuracao = motor.avancar(configuracao, cadeia[posicao:])
+            self.refeitos += len(cadeia) - posicao
+        # Com um ponto de controle morto, qualquer continuação é rejeitada sem simular
+        self.configuracao = configuracao
+        return configuracao
@@ -0,0 +1,222 @@
+"""Posicionamento de estados por forças (Fruchterman-Reingold com grade), em NumPy.
+
+Não depende do graphviz. Estados ligados por transições se atraem com força d²/k e
+todos se repelem com força k²/d, onde k é a `distancia` ideal. Como no algoritmo
+original, a repulsão só é calculada entre estados a menos de 2k, encontrados por uma
+grade de células de lado 2k (a célula de cada estado e as 8 vizinhas); uma gravidade
+fraca mantém componentes desconexos perto do centro. Cada iteração é vetorizada: o
+custo é proporcional ao número de estados vezes a ocupação das células, e não ao
+quadrado do número de estados.
+
+`LayoutIncremental` reaproveita as posições anteriores quando o autômato cresce: os
+estados novos nascem perto dos vizinhos e poucas iterações, a temperatura baixa e só
+em volta do que mudou, acomodam o desenho sem embaralhar o que já estava posicionado.
+"""
+import numpy as np
+
+DISTANCIA = 80.0  # Distância ideal entre estados (k)
+GRAVIDADE = 0.02
+ITERACOES = 100
+ITERACOES_MINIMAS = 30
+# Estados x iterações de um layout completo: acima de ORCAMENTO / ITERACOES estados, o
+# número padrão de iterações cai (até ITERACOES_MINIMAS), pois cada uma custa O(estados).
+# Tempos medidos com `python -m nucleo.benchmark --layout`.
+ORCAMENTO = 100_000
+ITERACOES_INCREMENTAIS = 30
+RAIO_LOCAL = 3  # Em múltiplos de k: alcance da reacomodação depois de uma alteração
+
+
+def _arestas(quantidade, origens, destinos):
+    """Pares (u, v) distintos e sem laços; transições paralelas ou opostas contam uma vez."""
+    origens = np.asarray(origens, dtype=np.int64)
+    destinos = np.asarray(destinos, dtype=np.int64)
+    validas = origens != destinos
+    u = np.minimum(origens, destinos)[validas]
+    v = np.maximum(origens, destinos)[validas]
+    chaves = np.unique(u * quantidade + v)
+    return chaves // quantidade, chaves % quantidade
+
+
+def _pares_proximos(posicoes, lado):
+    """Pares (i, j), i != j, de estados na mesma célula da grade ou em células vizinhas.
+
+    Cada par aparece uma vez: além da própria célula, só metade da vizinhança (as 4
+    células "à frente") é consultada.
+    """
+    celulas = np.floor((posicoes - posicoes.min(axis=0)) / lado).astype(np.int64)
+    altura = int(celulas[:, 1].max()) + 3
+    chaves = (celulas[:, 0] + 1) * altura + (celulas[:, 1] + 1)
+    ordem = np.argsort(chaves, kind='stable')
+    ocupadas, inicio, ocupacao = np.unique(chaves[ordem], return_index=True, return_counts=True)
+
+    pares_i, pares_j = [], []
+    for deslocamento in (0, 1, altura - 1, altura, altura + 1):
+        vizinha = chaves + deslocamento
+        indice = np.minimum(np.searchsorted(ocupadas, vizinha), len(ocupadas) - 1)
+        estados = np.flatnonzero(ocupadas[indice] == vizinha)
+        indice = indice[estados]
+        quantos = ocupacao[indice]
+        # Cada estado contra todos os da célula vizinha: trechos [inicio, inicio + ocupacao) de `ordem`
+        primeiros = np.cumsum(quantos) - quantos
+        i = np.repeat(estados, quantos)
+        j = ordem[np.repeat(inicio[indice] - primeiros, quantos) + np.arange(quantos.sum())]
+        if deslocamento == 0:
+            i, j = i[i < j], j[i < j]
+        pares_i.append(i)
+        pares_j.append(j)
+    return np.concatenate(pares_i), np.concatenate(pares_j)
+
+
+def _repulsao(posicoes, distancia):
+    """Soma das forças de repulsão entre estados a menos de 2k (por grade de células)."""
+    quantidade = len(posicoes)
+    i, j = _pares_proximos(posicoes, 2 * distancia)
+    x, y = posicoes[:, 0], posicoes[:, 1]
+    dx = x[i] - x[j]
+    dy = y[i] - y[j]
+    quadrado = np.maximum(dx * dx + dy * dy, 1e-4)
+    # k² / d na direção da diferença: k² * diferença / d², só para d < 2k
+    fator = np.where(quadrado < 4 * distancia * distancia, distancia * distancia / quadrado, 0.0)
+    dx *= fator
+    dy *= fator
+    forca = np.empty_like(posicoes)
+    forca[:, 0] = np.bincount(i, dx, quantidade) - np.bincount(j, dx, quantidade)
+    forca[:, 1] = np.bincount(i, dy, quantidade) - np.bincount(j, dy, quantidade)
+    return forca
+
+
+def iteracoes_padrao(quantidade):
+    """Iterações de um layout completo de `quantidade` estados quando nenhuma é pedida."""
+    return max(ITERACOES_MINIMAS, min(ITERACOES, ORCAMENTO // max(quantidade, 1)))
+
+
+def posicionar(quantidade, origens=(), destinos=(), posicoes=None, iteracoes=None,
+               temperatura=None, distancia=DISTANCIA, semente=0, fixos=None, gravidade=GRAVIDADE,
+               progresso=None):
+    """Devolve as posições (matriz `quantidade` x 2) dos estados 0..quantidade-1.
+
+    `origens`/`destinos` são os ids de cada transição. `posicoes` iniciais, se dadas,
+    são refinadas; senão os estados começam espalhados ao acaso num quadrado com área
+    proporcional à quantidade. `temperatura` é o deslocamento máximo da 1ª iteração e
+    `fixos`, uma máscara de estados que exercem força mas não se movem. Sem
+    `iteracoes`, usa `iteracoes_padrao(quantidade)`.
+    `progresso(iteracao, iteracoes)`, se dado, é chamado a cada iteração.
+    """
+    if quantidade == 0:
+        return np.zeros((0, 2))
+    gerador = np.random.default_rng(semente)
+    if posicoes is None:
+        lado = distancia * np.sqrt(quantidade) * 1.5
+        posicoes = gerador.uniform(0, lado, (quantidade, 2))
+    else:
+        # Estados no mesmo ponto não se repelem: uma perturbação mínima os separa
+        posicoes = np.array(posicoes, dtype=np.float64)
+        ruido = gerador.normal(0, distancia * 1e-3, posicoes.shape)
+        if fixos is not None:
+            ruido[fixos] = 0
+        posicoes += ruido
+    if quantidade == 1:
+        return posicoes
+    u, v = _arestas(quantidade, origens, destinos)
+    iteracoes = iteracoes_padrao(quantidade) if iteracoes is None else iteracoes
+    if temperatura is None:
+        temperatura = distancia * np.sqrt(quantidade) / 4
+    resfriamento = (distancia * 0.05 / temperatura) ** (1 / max(iteracoes, 1))
+
+    for iteracao in range(iteracoes):
+        if progresso:
+            progresso(iteracao, iteracoes)
+        forca = _repulsao(posicoes, distancia)
+        if len(u):
+            diferenca = posicoes[v] - posicoes[u]
+            comprimento = np.hypot(diferenca[:, 0], diferenca[:, 1])[:, None]
+            atracao = diferenca * comprimento / distancia  # d² / k na direção da aresta
+            for eixo in (0, 1):
+                forca[:, eixo] += np.bincount(u, atracao[:, eixo], quantidade)
+                forca[:, eixo] -= np.bincount(v, atracao[:, eixo], quantidade)
+        if gravidade:
+            forca -= gravidade * (posicoes - posicoes.mean(axis=0)) * distancia / 10
+        if fixos is not None:
+            forca[fixos] = 0
+        # Deslocamento na direção da força, limitado pela temperatura
+        modulo = np.maximum(np.hypot(forca[:, 0], forca[:, 1]), 1e-9)[:, None]
+        posicoes += forca / modulo * np.minimum(modulo, temperatura)
+        temperatura *= resfriamento
+    return posicoes
+
+
+def alinhar(posicoes):
+    """Gira o desenho para que a maior extensão fique na horizontal (telas são largas)."""
+    posicoes = np.asarray(posicoes, dtype=np.float64)
+    if len(posicoes) < 2:
+        return posicoes.copy()
+    centro = posicoes.mean(axis=0)
+    _, _, eixos = np.linalg.svd(posicoes - centro, full_matrices=False)
+    return (posicoes - centro) @ eixos.T + centro
+
+
+class LayoutIncremental:
+    """Mantém as posições entre chamadas; só refaz o layout inteiro na primeira vez."""
+
+    def __init__(self, distancia=DISTANCIA, semente=0):
+        self.distancia = distancia
+        self.semente = semente
+        self.posicoes = np.zeros((0, 2))
+
+    def atualizar(self, quantidade, origens=(), destinos=(), alterados=None, progresso=None):
+        """Posições para o autômato atual; os ids existentes mantêm a vizinhança de antes.
+
+        `alterados` são os ids cujas transições mudaram (por exemplo, as pontas de uma
+        transição nova). Se dados, só os estados novos e os que estão a até
+        `RAIO_LOCAL` * k deles se movem; senão todos se acomodam. O layout completo, da
+        primeira vez, sai girado por `alinhar`.
+        """
+        anteriores = len(self.posicoes)
+        if anteriores == 0 or quantidade < anteriores or quantidade > 2 * anteriores:
+            self.posicoes = alinhar(posicionar(quantidade, origens, destinos, distancia=self.distancia,
+                                               semente=self.semente, progresso=progresso))
+            return self.posicoes
+        origens = np.asarray(origens, dtype=np.int64)
+        destinos = np.asarray(destinos, dtype=np.int64)
+        posicoes = np.empty((quantidade, 2))
+        posicoes[:anteriores] = self.posicoes
+        if quantidade > anteriores:
+            gerador = np.random.default_rng(self.semente + quantidade)
+            centro = self.posicoes.mean(axis=0)
+            for novo in range(anteriores, quantidade):
+                # Perto da média dos vizinhos já posicionados, ou do centro se não houver
+                vizinhos = np.concatenate((destinos[origens == novo], origens[destinos == novo]))
+                vizinhos = vizinhos[vizinhos < novo]
+                base = posicoes[vizinhos].mean(axis=0) if len(vizinhos) else centro
+                posicoes[novo] = base + gerador.normal(0, self.distancia / 2, 2)
+        if alterados is None:
+            self.posicoes = posicionar(quantidade, origens, destinos, posicoes,
+                                       iteracoes=ITERACOES_INCREMENTAIS,
+                                       temperatura=self.distancia / 2, distancia=self.distancia,
+                                       progresso=progresso)
+            return self.posicoes
+
+        regiao = np.union1d(np.asarray(list(alterados), dtype=np.int64),
+                            np.arange(anteriores, quantidade))
+        if len(regiao) == 0:
+            self.posicoes = posicoes
+            return posicoes
+        # Distância de cada estado à região alterada; um contorno fixo, um pouco maior,
+        # segura o resto do desenho no lugar
+        proximidade = np.full(quantidade, np.inf)
+        for inicio in range(0, len(regiao), 256):
+            trecho = posicoes[regiao[inicio:inicio + 256]]
+            distancias = np.hypot(*(posicoes[:, None, :] - trecho[None, :, :]).transpose(2, 0, 1))
+            proximidade = np.minimum(proximidade, distancias.min(axis=1))
+        local = np.flatnonzero(proximidade <= (RAIO_LOCAL + 2) * self.distancia)
+        novo_id = np.full(quantidade, -1)
+        novo_id[local] = np.arange(len(local))
+        internas = (novo_id[origens] >= 0) & (novo_id[destinos] >= 0)
+        posicoes[local] = posicionar(len(local), novo_id[origens[internas]],
+                                     novo_id[destinos[internas]], posicoes[local],
+                                     iteracoes=ITERACOES_INCREMENTAIS,
+                                     temperatura=self.distancia / 2, distancia=self.distancia,
+                                     fixos=proximidade[local] > RAIO_LOCAL * self.distancia,
+                                     gravidade=0, progresso=progresso)
+        self.posicoes = posicoes
+        return posicoes
@@ -0,0 +1,110 @@
+"""Linha do tempo de uma simulação, com acesso aleatório por pontos de controle.
+
+Para mostrar uma simulação passo a passo com avanço, recuo e salto para qualquer
+posição, a configuração do motor é guardada a cada `intervalo` símbolos. A
+configuração de uma posição qualquer parte do ponto de controle anterior e refaz no
+máximo `intervalo` passos, em vez de simular desde o início da cadeia.
+
+Funciona com qualquer motor que ofereça `inicial`, `passo(config, simbolo)`,
+`avancar(config, cadeia)` e `aceita(config)`: o `AutomatoCompilado` (AFD), o `AFNBits`
+(AFN) e o modelo de simulador_passo_a_passo.py.
+"""
+INTERVALO = 1024
+
+
+class LinhaDoTempo:
+    """Posição atual e configurações de uma simulação de `cadeia` em `motor`."""
+
+    def __init__(self, motor, cadeia, intervalo=INTERVALO, morto=None):
+        if intervalo < 1:
+            raise ValueError("O intervalo entre pontos de controle deve ser positivo.")
+        self.motor = motor
+        self.cadeia = cadeia
+        self.intervalo = intervalo
+        # Configuração sem saída: o sumidouro do AFD ou a máscara vazia do AFN
+        self.morto = morto if morto is not None else getattr(motor, 'morto', 0)
+        self.marcos = [motor.inicial]  # configuração nas posições 0, intervalo, 2 * intervalo...
+        self.parada = None  # posição em que a configuração ficou sem saída, se já conhecida
+        self.final = None   # configuração depois da cadeia inteira, se já calculada
+        self.posicao = 0
+        self.configuracao = motor.inicial
+        if self.configuracao == self.morto:
+            self.parada = 0
+
+    def __len__(self):
+        return len(self.cadeia)
+
+    @property
+    def fim(self):
+        """Última posição que vale a pena mostrar: o fim da cadeia ou onde ela foi rejeitada."""
+        self._estender(len(self.cadeia))
+        return len(self.cadeia) if self.parada is None else self.parada
+
+    @property
+    def terminou(self):
+        return self.posicao >= self.fim
+
+    def aceita(self):
+        """Resultado da simulação da cadeia inteira."""
+        return self.motor.aceita(self.configuracao_em(len(self.cadeia)))
+
+    def _estender(self, posicao):
+        """Calcula os pontos de controle até `posicao`, parando se a configuração morrer."""
+        motor = self.motor
+        intervalo = self.intervalo
+        if self.parada is not None:
+            posicao = min(posicao, self.parada - 1)
+        while len(self.marcos) * intervalo <= posicao:
+            inicio = (len(self.marcos) - 1) * intervalo
+            configuracao = motor.avancar(self.marcos[-1], self.cadeia[inicio:inicio + intervalo])
+            if configuracao == self.morto:
+                self._localizar_parada(len(self.marcos) - 1)
+                return
+            self.marcos.append(configuracao)
+        if self.parada is None and self.final is None and posicao == len(self.cadeia):
+            # Trecho final, menor que um intervalo
+            inicio = (len(self.marcos) - 1) * intervalo
+            self.final = motor.avancar(self.marcos[-1], self.cadeia[inicio:])
+            if self.final == self.morto:
+                self._localizar_parada(len(self.marcos) - 1)
+
+    def _localizar_parada(self, bloco):
+        """Acha a primeira posição sem saída, refazendo passo a passo desde o ponto de controle `bloco`."""
+        configuracao = self.marcos[bloco]
+        for posicao in range(bloco * self.intervalo, len(self.cadeia)):
+            configuracao = self.motor.passo(configuracao, self.cadeia[posicao])
+            if configuracao == self.morto:
+                self.parada = posicao + 1
+                return
+
+    def configuracao_em(self, posicao):
+        """Configuração depois de consumir os `posicao` primeiros símbolos."""
+        posicao = max(0, min(posicao, len(self.cadeia)))
+        if posicao == self.posicao:
+            return self.configuracao
+        if posicao == self.posicao + 1:
+            return self.motor.passo(self.configuracao, self.cadeia[self.posicao])
+        self._estender(posicao)
+        if self.parada is not None and posicao >= self.parada:
+            return self.morto
+        if posicao == len(self.cadeia) and self.final is not None:
+            return self.final
+        bloco = posicao // self.intervalo
+        return self.motor.avancar(self.marcos[bloco], self.cadeia[bloco * self.intervalo:posicao])
+
+    def ir_para(self, posicao):
+        """Move a posição atual (limitada a 0..len) e devolve a configuração nela."""
+        posicao = max(0, min(posicao, len(self.cadeia)))
+        self.configuracao = self.configuracao_em(posicao)
+        self.posicao = posicao
+        if self.configuracao == self.morto and self.parada is None:
+            # Morreu em algum ponto até `posicao` (um salto dentro do bloco ainda não
+            # estendido, ou um passo): a parada é procurada desde o ponto de controle anterior
+            self._localizar_parada(min(posicao // self.intervalo, len(self.marcos) - 1))
+        return self.configuracao
+
+    def avancar(self, passos=1):
+        return self.ir_para(self.posicao + passos)
+
+    def voltar(self, passos=1):
+        return self.ir_para(self.posicao - passos)
@@ -0,0 +1,112 @@
+"""Simulação em lote com NumPy sobre a forma compilada de um AFD.
+
+Em vez de chamar `Automato.simular` uma cadeia por vez, as cadeias são codificadas
+numa matriz de colunas (uma linha por cadeia, preenchida até o maior tamanho) e o
+estado de todas avança junto, uma coluna por passo, com consultas vetorizadas na
+tabela de transições.
+"""
+import numpy as np
+
+
+def tabela_numpy(compilado):
+    """Devolve a tabela do AFD como vetor plano com uma coluna extra para símbolos desconhecidos.
+
+    A coluna extra (índice `compilado.largura`) leva qualquer estado ao sumidouro.
+    """
+    linhas = compilado.morto + 1
+    tabela = np.frombuffer(compilado.tabela, dtype=np.int32).reshape(linhas, compilado.largura)
+    desconhecido = np.full((linhas, 1), compilado.morto, dtype=np.int32)
+    return np.hstack((tabela, desconhecido)).ravel()
+
+
+def tabela_codigos(compilado):
+    """Mapa ponto de código -> coluna para os símbolos de um caractere.
+
+    Devolve `(ascii, inicios, colunas)`: `ascii` tem as colunas dos 128 pontos ASCII e,
+    para os demais, o ponto p tem a coluna `colunas[i]` do intervalo que começa em
+    `inicios[i] <= p` (busca por bisseção, ver nucleo.compilado.TabelaClasses). Pontos
+    sem símbolo recebem a coluna de símbolo desconhecido, `compilado.largura`.
+    """
+    desconhecido = compilado.largura
+    tabela_ascii = np.full(128, desconhecido, dtype=np.int32)
+    resto = []
+    for simbolo, coluna in compilado.colunas.items():
+        if len(simbolo) == 1:
+            if ord(simbolo) < 128:
+                tabela_ascii[ord(simbolo)] = coluna
+            else:
+                resto.append((ord(simbolo), coluna))
+    # Intervalos de pontos consecutivos com a mesma coluna, o i-ésimo de inicios[i] até
+    # inicios[i + 1]; lacunas viram intervalos de símbolo desconhecido. Intervalos vazios
+    # (início repetido) não atrapalham: a bisseção fica com o último
+    inicios, colunas = [128], [desconhecido]
+    fim = 128
+    for ponto, coluna in sorted(resto):
+        if ponto != fim:
+            inicios.append(fim)
+            colunas.append(desconhecido)
+        if ponto != fim or colunas[-1] != coluna:
+            inicios.append(ponto)
+            colunas.append(coluna)
+        fim = ponto + 1
+    inicios.append(fim)
+    colunas.append(desconhecido)
+    return tabela_ascii, np.array(inicios, dtype=np.int64), np.array(colunas, dtype=np.int32)
+
+
+def codificar(cadeias, codigos):
+    """Codifica `cadeias` numa matriz preenchida de colunas.
+
+    `codigos` vem de `tabela_codigos`. Devolve `(matriz, tamanhos)`; posições além do
+    tamanho de cada cadeia guardam a coluna de símbolo desconhecido e nunca são lidas
+    pela simulação.
+    """
+    tabela_ascii, inicios, colunas = codigos
+    tamanhos = np.fromiter((len(c) for c in cadeias), dtype=np.int64, count=len(cadeias))
+    maior = int(tamanhos.max()) if len(cadeias) else 0
+    desconhecido = colunas[0]
+    matriz = np.full((len(cadeias), maior), desconhecido, dtype=np.int32)
+    if maior:
+        texto = ''.join(cadeias).encode('utf-32-le')
+        pontos = np.frombuffer(texto, dtype='<u4')
+        codificados = tabela_ascii[np.minimum(pontos, 127)]
+        outros = pontos >= 128
+        if outros.any():
+            codificados[outros] = colunas[np.searchsorted(inicios, pontos[outros], side='right') - 1]
+        # A máscara percorre a matriz por linhas, na mesma ordem da concatenação
+        matriz[np.arange(maior) < tamanhos[:, None]] = codificados
+    return matriz, tamanhos
+
+
+def simular_lote(compilado, cadeias, tamanho_bloco=65536):
+    """Simula várias cadeias ao mesmo tempo.
+
+    Devolve `(aceitas, finais)`: um vetor booleano de aceitação e o vetor com o id do
+    estado final de cada cadeia (`compilado.morto` quando ela foi rejeitada no meio),
+    ambos na ordem de `cadeias`.
+    """
+    cadeias = list(cadeias)
+    tabela = tabela_numpy(compilado)
+    codigos = tabela_codigos(compilado)
+    largura = compilado.largura + 1
+    morto = compilado.morto
+    finais_aceitos = np.frombuffer(bytes(compilado.finais), dtype=np.uint8).astype(bool)
+
+    # Ordenar por tamanho decrescente: no passo j só as primeiras linhas ainda têm símbolos
+    ordem = sorted(range(len(cadeias)), key=lambda i: len(cadeias[i]), reverse=True)
+    finais = np.empty(len(cadeias), dtype=np.int32)
+    for inicio in range(0, len(ordem), tamanho_bloco):
+        indices = ordem[inicio:inicio + tamanho_bloco]
+        matriz, tamanhos = codificar([cadeias[i] for i in indices], codigos)
+        estados = np.full(len(indices), compilado.inicial, dtype=np.int32)
+        ativas = len(indices)
+        for coluna in range(matriz.shape[1]):
+            while ativas and tamanhos[ativas - 1] <= coluna:
+                ativas -= 1
+            atuais = estados[:ativas]
+            estados[:ativas] = tabela[atuais * largura + matriz[:ativas, coluna]]
+            # Parar cedo quando todas as cadeias ainda ativas já caíram no sumidouro
+            if coluna % 64 == 63 and not (estados[:ativas] != morto).any():
+                break
+        finais[indices] = estados
+    return finais_aceitos[finais], finais
@@ -0,0 +1,157 @@
+"""Minimização de AFDs: remoção de estados inalcançáveis e mortos e algoritmo de Hopcroft.
+
+Trabalha sobre o `Automato` de simulator_automato.py (transições parciais: símbolo sem
+transição rejeita a cadeia). O autômato é completado com um sumidouro implícito, as
+classes de equivalência são obtidas por refinamento de partições em O(n log n) e o
+bloco que contém o sumidouro, os estados mortos, é descartado do resultado.
+"""
+
+
+class RelatorioMinimizacao:
+    """Quanto o autômato encolheu em cada etapa da minimização."""
+
+    def __init__(self, estados_originais, transicoes_originais, inalcancaveis, mortos,
+                 estado_morto, estados_finais, transicoes_finais):
+        self.estados_originais = estados_originais
+        self.transicoes_originais = transicoes_originais
+        self.inalcancaveis = inalcancaveis  # nomes removidos por não serem alcançáveis
+        self.mortos = mortos                # nomes removidos por não alcançarem aceitação
+        self.estado_morto = estado_morto    # representante do sumidouro (None se não havia)
+        self.estados_finais = estados_finais
+        self.transicoes_finais = transicoes_finais
+
+    @property
+    def equivalentes(self):
+        """Estados fundidos com outros equivalentes."""
+        vivos = self.estados_originais - len(self.inalcancaveis) - len(self.mortos)
+        return vivos - self.estados_finais
+
+    def __str__(self):
+        return (
+            f"Estados: {self.estados_originais} -> {self.estados_finais} "
+            f"({len(self.inalcancaveis)} inalcançáveis, {len(self.mortos)} mortos, "
+            f"{self.equivalentes} equivalentes fundidos); "
+            f"transições: {self.transicoes_originais} -> {self.transicoes_finais}"
+        )
+
+
+def minimizar(automato):
+    """Devolve `(novo_automato, relatorio)` com o AFD mínimo equivalente a `automato`.
+
+    Cada estado do resultado recebe o nome do primeiro estado original do seu bloco (o
+    estado inicial mantém o próprio nome), então o resultado pode ser salvo diretamente.
+    """
+    grafo = automato.grafo
+    nomes = grafo.nomes
+    origens, rotulos, destinos = grafo.vetores()
+    inicio = grafo.inicio  # Linha (CSR) de cada estado nos vetores
+    transicoes_originais = len(origens)
+    novo = type(automato)(automato.nome)
+    if automato.estado_inicial is None:
+        return novo, RelatorioMinimizacao(len(nomes), transicoes_originais, list(nomes), [], None, 0, 0)
+
+    # Estados alcançáveis a partir do inicial, em ordem de descoberta
+    inicial = automato.estado_inicial.id
+    alcancaveis = [inicial]
+    vistos = bytearray(len(nomes))
+    vistos[inicial] = 1
+    for estado in alcancaveis:
+        for destino in destinos[inicio[estado]:inicio[estado + 1]]:
+            if not vistos[destino]:
+                vistos[destino] = 1
+                alcancaveis.append(destino)
+    inalcancaveis = [nome for nome, visto in zip(nomes, vistos) if not visto]
+
+    # Numeração densa; o id `morto` é o sumidouro implícito que completa o AFD
+    ids = {estado: i for i, estado in enumerate(alcancaveis)}
+    morto = len(alcancaveis)
+    codigos = sorted({rotulos[i] for estado in alcancaveis for i in range(inicio[estado], inicio[estado + 1])})
+    inversas = {codigo: [[] for _ in range(morto + 1)] for codigo in codigos}
+    for origem, estado in enumerate(alcancaveis):
+        linha = dict(zip(rotulos[inicio[estado]:inicio[estado + 1]],
+                         destinos[inicio[estado]:inicio[estado + 1]]))
+        for codigo in codigos:
+            destino = linha.get(codigo)
+            inversas[codigo][morto if destino is None else ids[destino]].append(origem)
+    for codigo in codigos:
+        inversas[codigo][morto].append(morto)
+
+    finais = automato.finais
+    blocos, bloco_de = _hopcroft(morto + 1, [ids[e] for e in alcancaveis if finais[e]], inversas)
+
+    # O bloco do sumidouro reúne todos os estados mortos
+    bloco_morto = bloco_de[morto]
+    mortos = [nomes[alcancaveis[i]] for i in sorted(blocos[bloco_morto]) if i != morto]
+    estado_morto = mortos[0] if mortos else None
+
+    representante = {}
+    for i, estado in enumerate(alcancaveis):
+        bloco = bloco_de[i]
+        if bloco != bloco_morto and bloco not in representante:
+            representante[bloco] = estado
+    if bloco_de[ids[inicial]] == bloco_morto:
+        # Linguagem vazia: resta apenas o estado inicial, sem transições
+        novo.adicionar_estado(nomes[inicial], final=False)
+        mortos = [nome for nome in mortos if nome != nomes[inicial]]
+        relatorio = RelatorioMinimizacao(
+            len(nomes), transicoes_originais, inalcancaveis, mortos, nomes[inicial], 1, 0)
+        return novo, relatorio
+    representante[bloco_de[ids[inicial]]] = inicial
+
+    for bloco, estado in representante.items():
+        novo.adicionar_estado(nomes[estado], finais[estado])
+    novo.definir_estado_inicial(nomes[inicial])
+    simbolos = grafo.simbolos
+    transicoes_finais = 0
+    for bloco, estado in representante.items():
+        for i in range(inicio[estado], inicio[estado + 1]):
+            bloco_destino = bloco_de[ids[destinos[i]]]
+            if bloco_destino != bloco_morto:
+                novo.adicionar_transicao(nomes[estado], simbolos[rotulos[i]],
+                                         nomes[representante[bloco_destino]])
+                transicoes_finais += 1
+
+    relatorio = RelatorioMinimizacao(
+        len(nomes), transicoes_originais, inalcancaveis, mortos, estado_morto,
+        len(representante), transicoes_finais)
+    return novo, relatorio
+
+
+def _hopcroft(total, finais, inversas):
+    """Refinamento de partições de Hopcroft sobre estados 0..total-1.
+
+    `inversas[simbolo][q]` lista os estados que vão para `q` com `simbolo` (ou o código dele). Devolve a
+    lista de blocos (conjuntos de ids) e o vetor bloco_de[estado].
+    """
+    finais = set(finais)
+    nao_finais = set(range(total)) - finais
+    blocos = [b for b in (finais, nao_finais) if b]
+    bloco_de = [0] * total
+    for indice, bloco in enumerate(blocos):
+        for estado in bloco:
+            bloco_de[estado] = indice
+
+    # Basta começar pelo menor bloco; o outro é coberto pelos refinamentos
+    pendentes = {min(range(len(blocos)), key=lambda i: len(blocos[i]))} if len(blocos) > 1 else set()
+    while pendentes:
+        divisor = tuple(blocos[pendentes.pop()])
+        for inversa in inversas.values():
+            # Pré-imagem do divisor, agrupada pelo bloco de cada estado
+            atingidos = {}
+            for destino in divisor:
+                for origem in inversa[destino]:
+                    atingidos.setdefault(bloco_de[origem], set()).add(origem)
+            for indice, parte in atingidos.items():
+                bloco = blocos[indice]
+                if len(parte) == len(bloco):
+                    continue
+                # O pedaço menor vira bloco novo e entra na fila de divisores
+                if len(parte) > len(bloco) - len(parte):
+                    parte = bloco - parte
+                bloco -= parte
+                novo_indice = len(blocos)
+                blocos.append(parte)
+                for estado in parte:
+                    bloco_de[estado] = novo_indice
+                pendentes.add(novo_indice)
+    return blocos, bloco_de
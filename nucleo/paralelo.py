@@ -0,0 +1,109 @@
+"""Simulação paralela especulativa de uma única cadeia muito longa.
+
+A cadeia é dividida em blocos. Para cada bloco, um processo calcula o mapa
+"estado de partida -> estado de chegada" considerando todos os estados em que o bloco
+pode começar; no fim, os mapas são compostos em ordem a partir do estado inicial.
+Partidas que chegam ao mesmo estado seguem juntas dali em diante (o AFD é
+determinístico), e as que caem no sumidouro são descartadas, então na prática só
+umas poucas partidas vivas são acompanhadas por bloco.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+TAMANHO_MINIMO = 1 << 20  # Cadeias menores que isso são simuladas sequencialmente
+MAX_PARTIDAS = 256        # Acima disso a especulação não compensa
+CONTEXTO = 8              # Símbolos do bloco anterior usados para restringir as partidas
+
+_compilado = None  # Autômato compilado de cada processo trabalhador
+
+
+def _iniciar_trabalhador(compilado):
+    global _compilado
+    _compilado = compilado
+
+
+def mapear_bloco(compilado, texto, partidas):
+    """Devolve {partida: chegada} para cada estado de `partidas` que sobrevive a `texto`.
+
+    Partidas ausentes do resultado terminam no sumidouro.
+    """
+    colunas = compilado.colunas
+    tabela = compilado.tabela
+    largura = compilado.largura
+    morto = compilado.morto
+    grupos = {estado: [estado] for estado in partidas if estado != morto}
+    for posicao, simbolo in enumerate(texto):
+        if len(grupos) <= 1:
+            # Todas as partidas vivas convergiram: o resto é uma simulação comum
+            if grupos:
+                (atual, membros), = grupos.items()
+                chegada = compilado.avancar(atual, texto[posicao:])
+                grupos = {} if chegada == morto else {chegada: membros}
+            break
+        coluna = colunas.get(simbolo)
+        if coluna is None:
+            return {}
+        novos = {}
+        for atual, membros in grupos.items():
+            destino = tabela[atual * largura + coluna]
+            if destino == morto:
+                continue
+            if destino in novos:
+                novos[destino].extend(membros)
+            else:
+                novos[destino] = membros
+        grupos = novos
+    return {partida: chegada for chegada, membros in grupos.items() for partida in membros}
+
+
+def _mapear(texto, partidas):
+    return mapear_bloco(_compilado, texto, partidas)
+
+
+def partidas_possiveis(compilado, contexto):
+    """Estados em que um bloco pode começar, dado o final (`contexto`) do bloco anterior."""
+    tabela = compilado.tabela
+    largura = compilado.largura
+    estados = range(compilado.morto)
+    for simbolo in contexto:
+        coluna = compilado.colunas.get(simbolo)
+        if coluna is None:
+            return set()
+        estados = {tabela[estado * largura + coluna] for estado in estados}
+        estados.discard(compilado.morto)
+    return set(estados)
+
+
+def estado_final_paralelo(compilado, cadeia, trabalhadores=None, tamanho_minimo=TAMANHO_MINIMO,
+                          max_partidas=MAX_PARTIDAS):
+    """Id do estado alcançado ao consumir `cadeia`, dividindo o trabalho entre processos.
+
+    Recorre à simulação sequencial para cadeias curtas, para um único trabalhador ou
+    quando algum bloco teria mais de `max_partidas` estados de partida possíveis.
+    """
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    if trabalhadores <= 1 or len(cadeia) < max(tamanho_minimo, trabalhadores):
+        return compilado.avancar(compilado.inicial, cadeia)
+
+    tamanho = -(-len(cadeia) // trabalhadores)
+    blocos = [cadeia[i:i + tamanho] for i in range(0, len(cadeia), tamanho)]
+    partidas = [[compilado.inicial]]
+    for anterior in blocos[:-1]:
+        possiveis = partidas_possiveis(compilado, anterior[-CONTEXTO:])
+        if len(possiveis) > max_partidas:
+            return compilado.avancar(compilado.inicial, cadeia)
+        partidas.append(sorted(possiveis))
+
+    with ProcessPoolExecutor(trabalhadores, initializer=_iniciar_trabalhador,
+                             initargs=(compilado,)) as executor:
+        mapas = executor.map(_mapear, blocos, partidas)
+        estado = compilado.inicial
+        for mapa in mapas:
+            estado = mapa.get(estado, compilado.morto)
+            if estado == compilado.morto:
+                break
+    return estado
+
+
+def simular_paralelo(compilado, cadeia, **opcoes):
+    return compilado.aceita(estado_final_paralelo(compilado, cadeia, **opcoes))
@@ -0,0 +1,38 @@
+"""Modelo mínimo de AFD usado pela demonstração de simulador_passo_a_passo.py."""
+
+
+class Automato:
+    # Implementação do autômato com transições e estados (simples para exemplo)
+    def __init__(self, estados, transicoes, estado_inicial, estados_finais):
+        self.estados = estados
+        self.transicoes = transicoes
+        self.estado_inicial = estado_inicial
+        self.estado_atual = estado_inicial
+        self.estados_finais = estados_finais
+
+    # Interface de motor (inicial, passo, avancar, aceita), usada por nucleo.linha_do_tempo;
+    # a configuração é o nome do estado e None quando não há transição
+    morto = None
+
+    @property
+    def inicial(self):
+        return self.estado_inicial
+
+    def passo(self, estado, simbolo):
+        return self.transicoes.get((estado, simbolo))
+
+    def avancar(self, estado, cadeia):
+        for simbolo in cadeia:
+            estado = self.transicoes.get((estado, simbolo))
+            if estado is None:
+                return None
+        return estado
+
+    def aceita(self, estado):
+        return estado in self.estados_finais
+
+    def proximo_estado(self, simbolo):
+        if (self.estado_atual, simbolo) in self.transicoes:
+            self.estado_atual = self.transicoes[(self.estado_atual, simbolo)]
+            return self.estado_atual
+        return None
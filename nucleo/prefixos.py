@@ -0,0 +1,53 @@
+"""Simulação em lote de cadeias com prefixos em comum, percorrendo a trie delas uma vez.
+
+Corpora de teste (caminhos de URL, identificadores, mensagens de protocolo) repetem
+longos prefixos, e simular cadeia por cadeia refaz o mesmo prefixo milhares de vezes.
+Aqui o trabalho é proporcional ao número de arestas distintas da trie das cadeias, e
+não à soma dos tamanhos.
+
+A trie não é montada com nós: em ordem lexicográfica, as cadeias aparecem na ordem de
+uma busca em profundidade da trie, e o maior prefixo comum entre vizinhas é a
+profundidade em que cada uma se separa do ramo da anterior. Uma pilha guarda a
+configuração do motor em cada profundidade do ramo compartilhado com a próxima cadeia;
+cada cadeia retoma da configuração onde se separa da anterior e consome o resto de uma
+vez com `avancar`. Uma configuração morta na pilha rejeita de imediato todas as cadeias
+com aquele prefixo.
+
+Funciona com qualquer motor com `inicial`, `passo`, `avancar` e `aceita` (ver
+nucleo.linha_do_tempo): AFD compilado, `AFNBits` ou `DeterminizacaoPreguicosa`.
+"""
+from itertools import repeat
+
+from nucleo.incremental import prefixo_comum
+
+
+def simular_prefixos(motor, cadeias, morto=None):
+    """Devolve um bytearray de vereditos (1 se aceita), na ordem de `cadeias`."""
+    cadeias = cadeias if isinstance(cadeias, list) else list(cadeias)
+    # Configuração sem saída: o sumidouro do AFD ou a máscara vazia do AFN
+    morto = morto if morto is not None else getattr(motor, 'morto', 0)
+    passo = motor.passo
+    avancar = motor.avancar
+    aceita = motor.aceita
+    ordem = sorted(range(len(cadeias)), key=cadeias.__getitem__)
+    vereditos = bytearray(len(cadeias))
+    pilha = [motor.inicial]  # pilha[d]: configuração depois dos d primeiros símbolos do ramo
+    for posicao, indice in enumerate(ordem):
+        cadeia = cadeias[indice]
+        # Profundidade em que a próxima cadeia se separa desta: até ali, o ramo é comum
+        seguinte = ordem[posicao + 1] if posicao + 1 < len(ordem) else None
+        comum = prefixo_comum(cadeia, cadeias[seguinte]) if seguinte is not None else 0
+        configuracao = pilha[-1]
+        for simbolo in cadeia[len(pilha) - 1:comum]:
+            if configuracao == morto:
+                pilha.extend(repeat(morto, comum + 1 - len(pilha)))
+                break
+            configuracao = passo(configuracao, simbolo)
+            pilha.append(configuracao)
+        if len(cadeia) < len(pilha):
+            configuracao = pilha[len(cadeia)]
+        elif configuracao != morto:
+            configuracao = avancar(configuracao, cadeia[len(pilha) - 1:])
+        vereditos[indice] = aceita(configuracao)
+        del pilha[comum + 1:]
+    return vereditos
@@ -0,0 +1,145 @@
+"""Vários autômatos numa única passada: autômato produto construído sob demanda.
+
+Conferir uma cadeia contra dezenas de autômatos, um de cada vez, lê a cadeia dezenas
+de vezes. O produto anda com todos juntos: seu estado é a tupla das configurações dos
+componentes (ids de AFD, máscaras de AFN) e guarda a máscara de bits dos componentes
+que aceitam nele. Como na determinização preguiçosa, só os estados e transições
+alcançados pelas entradas são criados, e cada transição calculada fica memorizada:
+depois de aquecido, cada símbolo custa uma consulta num dicionário, não importa
+quantos autômatos há. Passando de `max_estados`, a memória é esvaziada e reconstruída
+aos poucos (`limpezas` conta quantas vezes).
+
+`ProdutoPreguicoso` segue a interface de motor (`inicial`, `passo`, `avancar`,
+`aceita`); `casar` devolve, para cada cadeia, o conjunto de autômatos que a aceitam.
+"""
+from collections.abc import Mapping
+
+MAX_ESTADOS = 1 << 16
+_INICIAL = 0  # id fixo: sempre o primeiro estado internado
+
+
+def motor_de(automato):
+    """Motor de simulação de um `Automato` de nucleo.afd ou nucleo.afn (ou o próprio motor)."""
+    if hasattr(automato, 'avancar'):
+        return automato
+    if hasattr(automato, 'compilar'):
+        return automato.compilar()
+    return automato.motor()
+
+
+class ProdutoPreguicoso:
+    """Produto dos `motores`, com estados e transições criados à medida que são usados.
+
+    As configurações trocadas com quem usa o motor são tuplas (uma configuração por
+    componente), válidas mesmo depois de uma limpeza da memória.
+    """
+
+    def __init__(self, motores, max_estados=MAX_ESTADOS):
+        if max_estados < 2:
+            raise ValueError("O limite de estados do produto deve ser de pelo menos 2.")
+        self.motores = list(motores)
+        self.max_estados = max_estados
+        self.inicial = tuple(motor.inicial for motor in self.motores)
+        # Configuração sem saída de cada componente: o sumidouro do AFD ou a máscara vazia
+        self.morto = tuple(getattr(motor, 'morto', 0) for motor in self.motores)
+        self.limpezas = 0
+        self._limpar()
+
+    def __len__(self):
+        return len(self._configuracoes)
+
+    def _limpar(self):
+        self._ids = {}             # tupla de configurações -> id
+        self._configuracoes = []   # id -> tupla
+        self._linhas = []          # id -> {símbolo: id de destino}
+        self._aceitas = []         # id -> máscara dos componentes que aceitam
+        self._internar(self.inicial)
+        self._morto = self._internar(self.morto)  # 0 se a própria configuração inicial é morta
+
+    def _internar(self, configuracao):
+        estado = self._ids.get(configuracao)
+        if estado is None:
+            estado = self._ids[configuracao] = len(self._configuracoes)
+            self._configuracoes.append(configuracao)
+            self._linhas.append({})
+            mascara = 0
+            for i, (motor, componente) in enumerate(zip(self.motores, configuracao)):
+                if motor.aceita(componente):
+                    mascara |= 1 << i
+            self._aceitas.append(mascara)
+        return estado
+
+    def _calcular(self, estado, simbolo):
+        """Id do destino de `estado` com `simbolo`; pode esvaziar a memória e renumerar `estado`."""
+        configuracao = self._configuracoes[estado]
+        destino = tuple(motor.passo(componente, simbolo)
+                        for motor, componente in zip(self.motores, configuracao))
+        if len(self._configuracoes) >= self.max_estados and destino not in self._ids:
+            self._limpar()
+            self.limpezas += 1
+            estado = self._internar(configuracao)
+        destino = self._internar(destino)
+        self._linhas[estado][simbolo] = destino
+        return destino
+
+    def passo(self, configuracao, simbolo):
+        estado = self._internar(configuracao)
+        destino = self._linhas[estado].get(simbolo)
+        if destino is None:
+            destino = self._calcular(estado, simbolo)
+        return self._configuracoes[destino]
+
+    def avancar(self, configuracao, cadeia):
+        estado = self._avancar(self._internar(configuracao), cadeia)
+        return self._configuracoes[estado]
+
+    def _avancar(self, estado, cadeia):
+        linhas = self._linhas
+        morto = self._morto
+        for simbolo in cadeia:
+            destino = linhas[estado].get(simbolo)
+            if destino is None:
+                destino = self._calcular(estado, simbolo)
+                linhas = self._linhas  # Outra lista se a memória foi esvaziada
+            estado = destino
+            if estado == morto:
+                break
+        return estado
+
+    def aceitas(self, configuracao):
+        """Máscara de bits dos componentes (pela posição em `motores`) que aceitam na configuração."""
+        return self._aceitas[self._internar(configuracao)]
+
+    def aceita(self, configuracao):
+        """Se algum componente aceita."""
+        return bool(self.aceitas(configuracao))
+
+    def classificar(self, cadeia):
+        """Máscara dos componentes que aceitam `cadeia`."""
+        estado = self._avancar(_INICIAL, cadeia)
+        return self._aceitas[estado]
+
+
+def casar(automatos, cadeias, max_estados=MAX_ESTADOS):
+    """Para cada cadeia, o frozenset dos autômatos que a aceitam, lendo cada cadeia uma vez.
+
+    `automatos` é uma lista (os conjuntos têm as posições) ou um dicionário (os conjuntos
+    têm as chaves) de `Automato`s de nucleo.afd ou nucleo.afn, ou de motores.
+    """
+    if isinstance(automatos, Mapping):
+        chaves = list(automatos)
+        automatos = automatos.values()
+    else:
+        automatos = list(automatos)
+        chaves = list(range(len(automatos)))
+    produto = ProdutoPreguicoso(map(motor_de, automatos), max_estados)
+    conjuntos = {}  # máscara -> frozenset das chaves
+    resultado = []
+    for cadeia in cadeias:
+        mascara = produto.classificar(cadeia)
+        conjunto = conjuntos.get(mascara)
+        if conjunto is None:
+            conjunto = conjuntos[mascara] = frozenset(
+                chave for i, chave in enumerate(chaves) if mascara >> i & 1)
+        resultado.append(conjunto)
+    return resultado
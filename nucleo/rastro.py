@@ -0,0 +1,142 @@
+"""Registro compacto dos passos de uma simulação de AFD (ver `AutomatoCompilado.simular_passo`).
+
+Os passos ficam em vetores `array` de ids, e não numa lista de tuplas de strings: o
+nome dos estados e o símbolo só são montados quando um passo é lido. Além do registro
+completo há dois modos limitados:
+
+    Rastro(ultimos=N)   só os N últimos passos (os anteriores são simulados sem registro)
+    Rastro(a_cada=K)    um passo a cada K símbolos (posições 0, K, 2K, ...)
+
+Os dois podem ser combinados. Nos modos limitados, os trechos não registrados passam
+pelo laço comum de `avancar`, então o custo fica perto de uma simulação sem rastro.
+"""
+from array import array
+
+
+class Rastro:
+    """Passos (origem, símbolo, destino) de uma simulação, guardados como inteiros."""
+
+    def __init__(self, ultimos=None, a_cada=1):
+        if ultimos is not None and ultimos < 1:
+            raise ValueError("ultimos deve ser pelo menos 1.")
+        if a_cada < 1:
+            raise ValueError("a_cada deve ser pelo menos 1.")
+        self.ultimos = ultimos
+        self.a_cada = a_cada
+        self.nomes = ()
+        self.cadeia = ''
+        self.estados = array('i')   # modo completo: estado antes de cada símbolo e o último
+        self.posicoes = array('q')  # modos limitados: posição, origem e destino de cada passo
+        self.origens = array('i')
+        self.destinos = array('i')
+
+    @property
+    def completo(self):
+        return self.ultimos is None and self.a_cada == 1
+
+    def gravar(self, compilado, cadeia):
+        """Simula `cadeia` em `compilado` registrando os passos; devolve o id alcançado (ou `morto`)."""
+        self.nomes = compilado.nomes
+        self.cadeia = cadeia
+        for vetor in (self.estados, self.posicoes, self.origens, self.destinos):
+            del vetor[:]
+        estado = compilado.inicial
+        if estado == compilado.morto:
+            return estado
+        if self.completo:
+            return self._gravar_completo(compilado, estado, cadeia)
+        if self.ultimos is None:
+            return self._gravar_amostras(compilado, estado, cadeia, 0, len(cadeia))
+
+        # Blocos de `ultimos` passos registráveis avançam sem registro; no fim, só os dois
+        # últimos blocos completos e o bloco final são refeitos registrando
+        bloco = self.ultimos * self.a_cada
+        marcos = [(0, estado)]
+        inicio = 0
+        while inicio < len(cadeia):
+            fim = min(inicio + bloco, len(cadeia))
+            estado = compilado.avancar(estado, cadeia[inicio:fim])
+            if estado == compilado.morto:
+                break
+            inicio = fim
+            marcos.append((inicio, estado))
+            del marcos[:-3]
+        inicio, estado = marcos[0]
+        estado = self._gravar_amostras(compilado, estado, cadeia, inicio, len(cadeia))
+        excesso = len(self.posicoes) - self.ultimos
+        if excesso > 0:
+            for vetor in (self.posicoes, self.origens, self.destinos):
+                del vetor[:excesso]
+        return estado
+
+    def _gravar_completo(self, compilado, estado, cadeia):
+        colunas = compilado.colunas
+        tabela = compilado.tabela
+        largura = compilado.largura
+        morto = compilado.morto
+        self.estados.append(estado)
+        guardar = self.estados.append
+        for simbolo in cadeia:
+            coluna = colunas.get(simbolo)
+            if coluna is None:
+                return morto
+            estado = tabela[estado * largura + coluna]
+            if estado == morto:
+                return morto
+            guardar(estado)
+        return estado
+
+    def _gravar_amostras(self, compilado, estado, cadeia, inicio, fim):
+        """Registra os passos nas posições múltiplas de `a_cada` entre `inicio` e `fim`."""
+        colunas = compilado.colunas
+        tabela = compilado.tabela
+        largura = compilado.largura
+        morto = compilado.morto
+        a_cada = self.a_cada
+        for posicao in range(inicio, fim, a_cada):
+            coluna = colunas.get(cadeia[posicao])
+            if coluna is None:
+                return morto
+            destino = tabela[estado * largura + coluna]
+            if destino == morto:
+                return morto
+            self.posicoes.append(posicao)
+            self.origens.append(estado)
+            self.destinos.append(destino)
+            estado = destino
+            if a_cada > 1:
+                estado = compilado.avancar(estado, cadeia[posicao + 1:min(posicao + a_cada, fim)])
+                if estado == morto:
+                    return morto
+        return estado
+
+    def __len__(self):
+        if self.completo:
+            return max(len(self.estados) - 1, 0)
+        return len(self.posicoes)
+
+    def _indice(self, indice):
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError(indice)
+        return indice
+
+    def posicao(self, indice):
+        """Posição, na cadeia, do símbolo consumido no passo `indice`."""
+        indice = self._indice(indice)
+        return indice if self.completo else self.posicoes[indice]
+
+    def __getitem__(self, indice):
+        """Passo `indice` como (origem, símbolo, destino), com os nomes dos estados."""
+        indice = self._indice(indice)
+        if self.completo:
+            origem, destino = self.estados[indice], self.estados[indice + 1]
+            posicao = indice
+        else:
+            origem, destino = self.origens[indice], self.destinos[indice]
+            posicao = self.posicoes[indice]
+        return self.nomes[origem], self.cadeia[posicao], self.nomes[destino]
+
+    def __iter__(self):
+        return (self[indice] for indice in range(len(self)))
@@ -0,0 +1,62 @@
+"""Verificação do orçamento de tempo de importação do núcleo.
+
+Uso: `python -m nucleo.tempo_importacao [--orcamento MS]`. Os módulos do núcleo são
+importados em interpretadores novos; o comando falha (código de saída 1) se o melhor
+tempo medido passar do orçamento ou se PyQt5, graphviz ou NumPy forem carregados.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+MODULOS = ('nucleo.afd', 'nucleo.afn', 'nucleo.passo_a_passo')
+PROIBIDOS = ('PyQt5', 'graphviz', 'numpy')
+ORCAMENTO_MS = 30.0
+
+_SCRIPT = """
+import json, sys, time
+inicio = time.perf_counter()
+for modulo in {modulos!r}:
+    __import__(modulo)
+decorrido = time.perf_counter() - inicio
+print(json.dumps([decorrido, [n for n in {proibidos!r} if n in sys.modules]]))
+"""
+
+
+def medir(modulos=MODULOS, repeticoes=5):
+    """Devolve (melhor tempo em ms, dependências proibidas carregadas) ao importar `modulos`."""
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = _SCRIPT.format(modulos=tuple(modulos), proibidos=PROIBIDOS)
+    melhor = None
+    carregados = set()
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-c', script], cwd=raiz, check=True,
+                               capture_output=True, text=True).stdout
+        decorrido, proibidos = json.loads(saida)
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+        carregados.update(proibidos)
+    return melhor * 1000, sorted(carregados)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o tempo de importação do núcleo.")
+    parser.add_argument('--orcamento', type=float, default=ORCAMENTO_MS,
+                        help="tempo máximo permitido, em milissegundos")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    tempo, carregados = medir(repeticoes=args.repeticoes)
+    print(f"Importação do núcleo: {tempo:.1f} ms (orçamento: {args.orcamento:.1f} ms)")
+    falhou = False
+    if carregados:
+        print(f"Dependências de interface carregadas: {', '.join(carregados)}")
+        falhou = True
+    if tempo > args.orcamento:
+        print("Orçamento de tempo de importação excedido.")
+        falhou = True
+    return 1 if falhou else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Armazenamento compacto das transições dos autômatos editáveis.
+
+Em vez de um objeto com dicionário por estado (ou de uma chave `(str, str)` por
+transição), cada autômato guarda uma tabela de nomes (id <-> nome), uma de símbolos
+(código <-> símbolo) e três vetores `array` com a origem, o código do símbolo e o
+destino de cada transição: 12 bytes por transição.
+
+Os vetores ficam em formato CSR: ordenados por origem, com o começo da linha de cada
+estado em `inicio`. Transições novas são acrescentadas ao fim, fora de ordem; as
+leituras examinam essa cauda e, quando ela passa de `LIMITE_CAUDA`, os vetores são
+reordenados de uma vez. Sem `multiplos` (AFD), a transição mais recente de cada
+(origem, símbolo) é a que vale e o destino `REMOVIDA` marca uma remoção; com
+`multiplos` (AFN), transições não são removidas.
+"""
+from array import array
+from bisect import bisect_left
+
+LIMITE_CAUDA = 256  # Transições fora de ordem toleradas antes de reordenar os vetores
+REMOVIDA = -1
+
+
+class TabelaTransicoes:
+    """Nomes, símbolos e transições de um autômato em tabelas e vetores de inteiros."""
+
+    def __init__(self, multiplos=False):
+        self.multiplos = multiplos    # vários destinos por (origem, símbolo), como num AFN
+        self.nomes = []               # id -> nome do estado
+        self.ids = {}                 # nome -> id
+        self.simbolos = []            # código -> símbolo
+        self.codigos = {}             # símbolo -> código
+        self.origens = array('i')
+        self.rotulos = array('i')     # código do símbolo de cada transição
+        self.destinos = array('i')
+        self.inicio = array('i', [0])  # linha de cada id dentro do trecho ordenado
+        self.ordenadas = 0            # as transições [0, ordenadas) estão em ordem e sem repetição
+        self.versao = 0               # muda a cada alteração, para invalidar caches de leitura
+
+    @classmethod
+    def de_vetores(cls, nomes, simbolos, origens, rotulos, destinos, multiplos=False,
+                   ordenados=False, ids=None):
+        """Monta a tabela a partir de ids; `ordenados` indica vetores já em ordem e sem repetição.
+
+        `ids` (nome -> id), se já existir, é copiado em vez de refeito a partir de `nomes`.
+        """
+        tabela = cls(multiplos)
+        tabela.nomes = list(nomes)
+        if ids is None:
+            tabela.ids = dict(zip(tabela.nomes, range(len(tabela.nomes))))
+        else:
+            tabela.ids = dict(ids)
+        tabela.simbolos = list(simbolos)
+        tabela.codigos = dict(zip(tabela.simbolos, range(len(tabela.simbolos))))
+        tabela.origens = array('i', origens)
+        tabela.rotulos = array('i', rotulos)
+        tabela.destinos = array('i', destinos)
+        if ordenados:
+            tabela.ordenadas = len(tabela.origens)
+            tabela._indexar()
+        return tabela
+
+    def estado(self, nome):
+        """Id de `nome`, criando o estado se ele for novo."""
+        estado = self.ids.get(nome)
+        if estado is None:
+            estado = self.ids[nome] = len(self.nomes)
+            self.nomes.append(nome)
+            self.versao += 1
+        return estado
+
+    def codigo(self, simbolo):
+        """Código de `simbolo`, criando-o se ele for novo."""
+        codigo = self.codigos.get(simbolo)
+        if codigo is None:
+            codigo = self.codigos[simbolo] = len(self.simbolos)
+            self.simbolos.append(simbolo)
+        return codigo
+
+    def acrescentar(self, origem, codigo, destino):
+        self.origens.append(origem)
+        self.rotulos.append(codigo)
+        self.destinos.append(destino)
+        self.versao += 1
+
+    def remover(self, origem, codigo):
+        if self.multiplos:
+            raise ValueError("Remoção de transições não suportada com vários destinos.")
+        self.acrescentar(origem, codigo, REMOVIDA)
+
+    def compactar(self):
+        """Reordena os vetores por (origem, símbolo), aplicando substituições e remoções."""
+        total = len(self.origens)
+        if self.ordenadas == total:
+            if len(self.inicio) != len(self.nomes) + 1:
+                self._indexar()  # Estados criados depois da última ordenação
+            return
+        largura = len(self.simbolos)
+        destinos_possiveis = len(self.nomes) + 1
+        chaves = []
+        for origem, rotulo, destino in zip(self.origens, self.rotulos, self.destinos):
+            chave = origem * largura + rotulo
+            if self.multiplos:
+                # O destino entra na chave: só transições idênticas são repetições
+                chave = chave * destinos_possiveis + destino + 1
+            chaves.append(chave)
+        ordem = sorted(range(total), key=chaves.__getitem__)
+        origens, rotulos, destinos = array('i'), array('i'), array('i')
+        for posicao, indice in enumerate(ordem):
+            # A ordenação é estável: entre chaves iguais vale a última, a mais recente
+            if posicao + 1 < total and chaves[ordem[posicao + 1]] == chaves[indice]:
+                continue
+            destino = self.destinos[indice]
+            if destino == REMOVIDA:
+                continue
+            origens.append(self.origens[indice])
+            rotulos.append(self.rotulos[indice])
+            destinos.append(destino)
+        self.origens, self.rotulos, self.destinos = origens, rotulos, destinos
+        self.ordenadas = len(self.origens)
+        self._indexar()
+
+    def _indexar(self):
+        self.inicio = array('i', [bisect_left(self.origens, estado)
+                                  for estado in range(len(self.nomes) + 1)])
+
+    def vetores(self):
+        """(origens, rótulos, destinos) ordenados por origem, sem repetições nem remoções.
+
+        Depois desta chamada, a linha do estado `e` é o trecho `inicio[e]:inicio[e + 1]`.
+        """
+        self.compactar()
+        return self.origens, self.rotulos, self.destinos
+
+    def quantidade(self):
+        """Número de transições."""
+        self.compactar()
+        return len(self.origens)
+
+    def linha(self, origem):
+        """Transições que saem de `origem`: {código: destino}, ou {código: [destinos]} se `multiplos`."""
+        if len(self.origens) - self.ordenadas > LIMITE_CAUDA:
+            self.compactar()
+        total = len(self.origens)
+        pares = ()
+        if origem + 1 < len(self.inicio):
+            a, b = self.inicio[origem], self.inicio[origem + 1]
+            pares = zip(self.rotulos[a:b], self.destinos[a:b])
+        cauda = [i for i in range(self.ordenadas, total) if self.origens[i] == origem]
+        if not self.multiplos:
+            linha = dict(pares)
+            for i in cauda:
+                if self.destinos[i] == REMOVIDA:
+                    linha.pop(self.rotulos[i], None)
+                else:
+                    linha[self.rotulos[i]] = self.destinos[i]
+            return linha
+        linha = {}
+        for codigo, destino in pares:
+            linha.setdefault(codigo, []).append(destino)
+        for i in cauda:
+            destinos = linha.setdefault(self.rotulos[i], [])
+            if self.destinos[i] not in destinos:
+                destinos.append(self.destinos[i])
+        return linha
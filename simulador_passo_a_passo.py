@@ -1,21 +1,11 @@
 import sys
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QVBoxLayout
-from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPainter, QBrush, QPen, QColor
-
-class Automato:
-    # Implementação do autômato com transições e estados (simples para exemplo)
-    def __init__(self, estados, transicoes, estado_inicial, estados_finais):
-        self.estados = estados
-        self.transicoes = transicoes
-        self.estado_atual = estado_inicial
-        self.estados_finais = estados_finais
-
-    def proximo_estado(self, simbolo):
-        if (self.estado_atual, simbolo) in self.transicoes:
-            self.estado_atual = self.transicoes[(self.estado_atual, simbolo)]
-            return self.estado_atual
-        return None
+from nucleo.passo_a_passo import Automato
+from nucleo.layout import alinhar, posicionar
+from nucleo.linha_do_tempo import LinhaDoTempo
+from controle_linha_do_tempo import ControleLinhaDoTempo
 
 class SimulatorApp(QWidget):
     def __init__(self):
@@ -29,15 +19,17 @@ class SimulatorApp(QWidget):
         self.start_button = QPushButton("Iniciar", self)
         self.start_button.clicked.connect(self.iniciar_simulacao)
 
+        # Linha do tempo: avançar, voltar, saltar para um passo e velocidade
+        self.controle = ControleLinhaDoTempo(self)
+        self.controle.posicao_alterada.connect(self.exibir_passo)
+
         layout = QVBoxLayout()
         layout.addWidget(self.label)
         layout.addWidget(self.start_button)
+        layout.addStretch()
+        layout.addWidget(self.controle)
         self.setLayout(layout)
 
-        # Timer para simulação passo-a-passo
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.proximo_passo)
-
         # Configuração do autômato (exemplo)
         estados = {"q0", "q1", "q2"}
         transicoes = {
@@ -45,58 +37,76 @@ class SimulatorApp(QWidget):
             ("q1", "b"): "q2"
         }
         self.automato = Automato(estados, transicoes, "q0", {"q2"})
+        self.posicoes = self.posicionar_estados()
         self.cadeia = "ab"
         self.index = 0
+        self.linha = None
 
     def iniciar_simulacao(self):
-        self.automato.estado_atual = "q0"  # Reset do estado inicial
-        self.index = 0  # Reset do índice da cadeia
+        # A linha do tempo guarda pontos de controle; qualquer passo é recalculado a partir deles
+        self.linha = LinhaDoTempo(self.automato, self.cadeia)
+        self.controle.definir_linha(self.linha)
         self.label.setText("Simulação em andamento...")
-        self.timer.start(1000)  # Iniciar timer com intervalo de 1 segundo
+        self.controle.reproduzir()
 
     def proximo_passo(self):
-        if self.index < len(self.cadeia):
-            simbolo = self.cadeia[self.index]
-            novo_estado = self.automato.proximo_estado(simbolo)
-            self.index += 1
+        self.controle.avancar()
 
-            if novo_estado:
-                self.label.setText(f"Estado atual: {novo_estado}")
-                self.update()  # Atualizar interface gráfica para refletir novo estado
-            else:
-                self.label.setText("Cadeia rejeitada.")
-                self.timer.stop()
+    def exibir_passo(self, posicao):
+        self.index = posicao
+        self.automato.estado_atual = self.linha.configuracao
+        if posicao < self.linha.fim:
+            self.label.setText(f"Estado atual: {self.automato.estado_atual}")
+        elif self.automato.estado_atual is not None and self.automato.aceita(self.automato.estado_atual):
+            self.label.setText("Cadeia aceita!")
         else:
-            # Verifica se o estado final é de aceitação
-            if self.automato.estado_atual in self.automato.estados_finais:
-                self.label.setText("Cadeia aceita!")
-            else:
-                self.label.setText("Cadeia rejeitada.")
-            self.timer.stop()
+            self.label.setText("Cadeia rejeitada.")
+        self.update()  # Atualizar interface gráfica para refletir novo estado
+
+    def posicionar_estados(self):
+        """Posições (layout por forças, nucleo.layout) do centro de cada estado."""
+        nomes = sorted(self.automato.estados)
+        ids = {nome: i for i, nome in enumerate(nomes)}
+        pares = [(ids[origem], ids[destino]) for (origem, _), destino in self.automato.transicoes.items()]
+        posicoes = alinhar(posicionar(len(nomes), [o for o, _ in pares], [d for _, d in pares]))
+        return dict(zip(nomes, map(tuple, posicoes.tolist())))
 
     def paintEvent(self, event):
         # Método para desenhar os estados e transições do autômato
         qp = QPainter()
         qp.begin(self)
 
+        # Layout ajustado à área livre da janela (entre os botões e a linha do tempo)
+        xs = [x for x, _ in self.posicoes.values()]
+        ys = [y for _, y in self.posicoes.values()]
+        largura, altura = self.width() - 170, self.height() - 250
+        largura_layout, altura_layout = max(xs) - min(xs), max(ys) - min(ys)
+        escala = min(largura / max(largura_layout, 1), altura / max(altura_layout, 1))
+        x0 = 85 + (largura - largura_layout * escala) / 2
+        y0 = 125 + (altura - altura_layout * escala) / 2
+        estados_pos = {estado: (int(x0 + (x - min(xs)) * escala), int(y0 + (y - min(ys)) * escala))
+                       for estado, (x, y) in self.posicoes.items()}
+
+        # Desenhar transições (linhas entre os centros, com o símbolo no meio)
+        qp.setPen(QPen(Qt.black, 2))
+        for (origem, simbolo), destino in self.automato.transicoes.items():
+            (x1, y1), (x2, y2) = estados_pos[origem], estados_pos[destino]
+            qp.drawLine(x1, y1, x2, y2)
+            qp.drawText((x1 + x2) // 2, (y1 + y2) // 2 - 5, simbolo)
+
         # Desenhar estados (círculos) com destaque para o estado atual
-        estados_pos = {"q0": (100, 200), "q1": (300, 200), "q2": (500, 200)}
-        for estado, pos in estados_pos.items():
+        for estado, (x, y) in estados_pos.items():
             if estado == self.automato.estado_atual:
                 qp.setBrush(QBrush(QColor("red")))  # Estado atual destacado em vermelho
             else:
                 qp.setBrush(QBrush(QColor("lightgray")))
-            qp.drawEllipse(pos[0], pos[1], 50, 50)
-            qp.drawText(pos[0] + 20, pos[1] + 30, estado)
-
-        # Desenhar transições (linhas com setas)
-        qp.setPen(QPen(Qt.black, 2))
-        qp.drawLine(150, 225, 300, 225)  # Transição q0 -> q1
-        qp.drawLine(350, 225, 500, 225)  # Transição q1 -> q2
+            qp.drawEllipse(x - 25, y - 25, 50, 50)
+            qp.drawText(x - 5, y + 5, estado)
 
         qp.end()
 
-app = QApplication(sys.argv)
-simulator_app = SimulatorApp()
-simulator_app.show()
-sys.exit(app.exec_())
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    simulator_app = SimulatorApp()
+    simulator_app.show()
+    sys.exit(app.exec_())
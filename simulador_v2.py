@@ -1,94 +1,16 @@
 import sys
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QLineEdit, QHBoxLayout, QFileDialog
-from PyQt5.QtCore import QTimer, Qt, QPointF
-from PyQt5.QtGui import QPainter, QFont
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QCheckBox
-import math
+from nucleo.afn import Automato
+from nucleo.equivalencia import equivalencia
+from nucleo.layout import LayoutIncremental
+from cena_automato import VisaoAutomato
+from trabalhos import FilaTrabalhos
+from nucleo.linha_do_tempo import LinhaDoTempo
+from nucleo.incremental import SimulacaoIncremental
+from controle_linha_do_tempo import ControleLinhaDoTempo
 
-class Automato:
-    def __init__(self):
-        self.estados = set()
-        self.transicoes = {}  # Transições agora vão armazenar múltiplos destinos
-        self.estado_atual = None
-        self.estados_finais = set()
-        self.estado_inicial_configurado = None  # Armazena o estado inicial configurado
-
-    def adicionar_transicao(self, origem, simbolo, destino):
-        """Adiciona uma transição do estado 'origem' para o estado 'destino' usando o 'simbolo'.
-        Se simbolo for '%', é uma transição em vazio."""
-        self.estados.add(origem)
-        self.estados.add(destino)
-        
-        chave = (origem, simbolo)  # A chave da transição inclui o símbolo
-        if chave not in self.transicoes:
-            self.transicoes[chave] = set()
-        self.transicoes[chave].add(destino)
-
-    def definir_estado_inicial(self, estado):
-        self.estado_atual = estado
-        self.estado_inicial_configurado = estado 
-
-    def definir_estados_finais(self, finais):
-        self.estados_finais = set(finais)
-
-    def proximo_estado(self, simbolo):
-        """Para AFN com transições em vazio (`%` ou `ε`), devolve todos os estados possíveis, incluindo os alcançados por transições em vazio."""
-        estados_possiveis = set()
-        estados_a_processar = {self.estado_atual}
-
-        while estados_a_processar:
-            estado_atual = estados_a_processar.pop()
-
-            # Verifica transições com o símbolo fornecido
-            chave_simbolo = (estado_atual, simbolo)
-            if chave_simbolo in self.transicoes:
-                estados_possiveis.update(self.transicoes[chave_simbolo])
-
-            # Verifica transições em vazio (`%`)
-            chave_epsilon = (estado_atual, '%')
-            if chave_epsilon in self.transicoes:
-                for novo_estado in self.transicoes[chave_epsilon]:
-                    if novo_estado not in estados_possiveis:
-                        estados_a_processar.add(novo_estado)
-
-        return estados_possiveis
-
-
-
-    def iniciar_simulacao(self):
-        self.cadeia = self.input_cadeia.text().strip()
-        self.index = 0
-        self.automato.definir_estado_inicial(self.automato.estado_inicial_configurado)
-        self.timer.start(1000)  # Intervalo de 1 segundo entre cada passo da simulação
-        self.proximo_passo()  # Executa o primeiro passo imediatamente
-
-    def proximo_passo(self):
-        if self.index < len(self.cadeia):
-            simbolo = self.cadeia[self.index]
-            estados_possiveis = self.automato.proximo_estado(simbolo)
-
-            if estados_possiveis:
-                self.automato.estado_atual = list(estados_possiveis)[0]  # Escolhe um estado arbitrariamente
-                self.index += 1
-            else:
-                self.timer.stop()
-                self.label.setText("Cadeia rejeitada!")
-                return
-        else:
-            # Processa transições em vazio após consumir toda a cadeia
-            estados_possiveis = self.automato.proximo_estado('%')
-            if not estados_possiveis:
-                self.timer.stop()
-                if self.automato.estado_atual in self.automato.estados_finais:
-                    self.label.setText("Cadeia aceita!")
-                else:
-                    self.label.setText("Cadeia rejeitada!")
-                return
-
-        # Continua a simulação para o próximo passo
-        self.timer.start(1000)
-
-                
 class SimulatorApp(QWidget):
     def __init__(self):
         super().__init__()
@@ -113,6 +35,10 @@ class SimulatorApp(QWidget):
         self.botao_adicionar_transicao.clicked.connect(self.adicionar_transicao)
         self.input_cadeia = QLineEdit(self)
         self.input_cadeia.setPlaceholderText("Digite a cadeia para simulação")
+        self.input_cadeia.textChanged.connect(self.simular_ao_digitar)
+        self.veredito_label = QLabel("", self)
+        # Largura fixa: o campo não muda de tamanho a cada tecla
+        self.veredito_label.setMinimumWidth(self.veredito_label.fontMetrics().horizontalAdvance("✗ rejeitada") + 10)
         self.start_button = QPushButton("Iniciar Simulação", self)
         self.start_button.clicked.connect(self.iniciar_simulacao)
         # Botões para salvar e carregar
@@ -120,6 +46,8 @@ class SimulatorApp(QWidget):
         self.botao_salvar.clicked.connect(self.salvar_projeto)
         self.botao_carregar = QPushButton("Carregar Projeto", self)
         self.botao_carregar.clicked.connect(self.carregar_projeto)
+        self.botao_comparar = QPushButton("Comparar com Projeto", self)
+        self.botao_comparar.clicked.connect(self.comparar_projeto)
         # Layout principal
         layout = QVBoxLayout()
         layout.addWidget(self.label)
@@ -134,44 +62,102 @@ class SimulatorApp(QWidget):
         layout_transicoes.addWidget(self.input_transicao_destino)
         layout_transicoes.addWidget(self.botao_adicionar_transicao)
         layout.addLayout(layout_transicoes)
-        layout.addWidget(self.input_cadeia)
+        layout_cadeia = QHBoxLayout()
+        layout_cadeia.addWidget(self.input_cadeia)
+        layout_cadeia.addWidget(self.veredito_label)
+        layout.addLayout(layout_cadeia)
         layout.addWidget(self.start_button)
+        # Linha do tempo da simulação: avançar, voltar, saltar para um passo e velocidade
+        self.controle = ControleLinhaDoTempo(self)
+        self.controle.posicao_alterada.connect(self.exibir_passo)
+        layout.addWidget(self.controle)
         # Adicionar os botões ao layout
         layout.addWidget(self.botao_salvar)
         layout.addWidget(self.botao_carregar)
+        layout.addWidget(self.botao_comparar)
+        # Desenho do autômato: cena com itens retidos, zoom pela roda e arraste para mover
+        self.visao = VisaoAutomato(self)
+        layout.addWidget(self.visao, 1)
         self.setLayout(layout)
-        # Timer para simulação
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.proximo_passo)
+        self.chave_cena = None  # Estrutura desenhada na cena (para não remontá-la à toa)
+        # Layout por forças (nucleo.layout), calculado numa thread do pool
+        self.layout_forcas = None
+        self.enquadrar_pendente = False
+        self.alterados = set()  # Estados com transições novas desde o último layout
+        self.trabalhos = FilaTrabalhos(self)
         # Inicializar o autômato
         self.automato = Automato()
         self.cadeia = "%"
         self.index = 0
+        self.configuracao = 0  # Máscara dos estados ativos na simulação passo a passo
+        self.estados_ativos = set()
+        self.linha = None  # Linha do tempo (com pontos de controle) da simulação atual
+        self.incremental = None  # Resultado ao digitar, resimulando só a partir da edição
+        self.texto_configuracao = None  # Texto dos campos de configuração já passado ao autômato
+
+    def aplicar_configuracao(self):
+        """Passa ao autômato o estado inicial e os finais dos campos e redesenha a cena.
+
+        Os campos só são relidos quando o texto deles muda, não a cada tecla da cadeia.
+        """
+        texto = (self.input_estado_inicial.text(), self.input_estados_finais.text())
+        if texto == self.texto_configuracao:
+            return
+        self.texto_configuracao = texto
+        estado_inicial, finais = texto
+        estados_finais = set(finais.split(','))
+        # Só se mudaram, para não recompilar
+        if estado_inicial and estado_inicial != self.automato.estado_inicial_configurado:
+            self.automato.definir_estado_inicial(estado_inicial)
+        if estados_finais != self.automato.estados_finais:
+            self.automato.definir_estados_finais(estados_finais)
+        self.atualizar_cena()  # Marcadores de estado final conforme a configuração aplicada
 
     def iniciar_simulacao(self):
-        estado_inicial = self.input_estado_inicial.text()
-        estados_finais = self.input_estados_finais.text().split(',')
-
         # Configurações iniciais
-        if estado_inicial:
-            self.automato.definir_estado_inicial(estado_inicial)
-        self.automato.definir_estados_finais(estados_finais)
-        
+        self.aplicar_configuracao()
+
         # Obter a cadeia do campo de entrada
         self.cadeia = self.input_cadeia.text()
-        
-        # Resetar o índice e iniciar a simulação
+        self.linha = LinhaDoTempo(self.automato.motor(), self.cadeia)
+        self.controle.definir_linha(self.linha)
+
         if self.cadeia == "":  # Cadeia vazia
-            self.index = 0
             self.label.setText("Simulação em andamento para cadeia vazia...")
-            self.timer.start(1000)  # Intervalo de 1 segundo
-        elif self.cadeia:  # Cadeia não vazia
-            self.index = 0
-            self.label.setText("Simulação em andamento...")
-            self.timer.start(1000)  # Intervalo de 1 segundo
         else:
-            self.label.setText("Por favor, insira uma cadeia válida.")
+            self.label.setText("Simulação em andamento...")
+        self.controle.reproduzir()
+
+    def simular_ao_digitar(self):
+        """Mostra se a cadeia digitada é aceita, resimulando só a partir da edição."""
+        self.aplicar_configuracao()
+        # O AFD preguiçoso é refeito junto com o motor quando o autômato muda
+        motor = self.automato.determinizacao()
+        if self.incremental is None or self.incremental.motor is not motor:
+            self.incremental = SimulacaoIncremental(motor)
+        self.incremental.atualizar(self.input_cadeia.text())
+        self.veredito_label.setText("✓ aceita" if self.incremental.aceita() else "✗ rejeitada")
 
+    def proximo_passo(self):
+        self.controle.avancar()
+
+    def exibir_passo(self, posicao):
+        motor = self.linha.motor
+        self.index = posicao
+        self.configuracao = self.linha.configuracao
+        if not self.configuracao:
+            self.label.setText("Cadeia rejeitada!")
+        elif posicao == len(self.cadeia):
+            # Cadeia consumida: aceita se algum estado ativo for final
+            if motor.aceita(self.configuracao):
+                self.label.setText("Cadeia aceita!")
+            else:
+                self.label.setText("Cadeia rejeitada!")
+        else:
+            self.label.setText(f"Passo {posicao} de {len(self.cadeia)}")
+        self.estados_ativos = motor.estados(self.configuracao)
+        self.atualizar_cena()
+        self.visao.cena.destacar(self.estados_ativos)
 
 
     def adicionar_transicao(self):
@@ -183,239 +169,152 @@ class SimulatorApp(QWidget):
             # Se o símbolo estiver vazio, tratamos como transição em vazio
             simbolo = '%' if not simbolo else simbolo  
             self.automato.adicionar_transicao(origem, simbolo, destino)
+            self.alterados.update((origem, destino))
             if simbolo == '%':
                 self.label.setText(f"Transição adicionada: {origem} --ε--> {destino}")
             else:
                 self.label.setText(f"Transição adicionada: {origem} --{simbolo}--> {destino}")
+            self.simular_ao_digitar()
+            self.atualizar_cena()
         else:
             self.label.setText("Por favor, preencha os campos de origem e destino.")
 
     def simular_cadeia(self, cadeia):
-        estados_atuais = {self.automato.estado_inicial_configurado}
-        indice_cadeia = 0
-
-        while indice_cadeia <= len(cadeia):
-            novos_estados = set()
-            for estado in estados_atuais:
-                # Processar transições em vazio
-                if (estado, '%') in self.automato.transicoes:
-                    novos_estados.update(self.automato.transicoes[(estado, '%')])
-
-                # Processar transições com o símbolo atual (se houver)
-                if indice_cadeia < len(cadeia):
-                    simbolo_atual = cadeia[indice_cadeia]
-                    if (estado, simbolo_atual) in self.automato.transicoes:
-                        novos_estados.update(self.automato.transicoes[(estado, simbolo_atual)])
-
-            estados_atuais = novos_estados
-
-            # Avançar o índice apenas se um símbolo da cadeia for consumido
-            if indice_cadeia < len(cadeia) and any(
-                (estado, cadeia[indice_cadeia]) in self.automato.transicoes for estado in estados_atuais
-            ):
-                indice_cadeia += 1
-
-            if not estados_atuais:
-                break
-
-        if any(estado in self.automato.estados_finais for estado in estados_atuais):
-            return True  # Cadeia aceita
-        else:
-            return False  # Cadeia rejeitada
-
-        
-    def proximo_estado(self, simbolo):
-        """Para AFN com transições ε, devolve todos os estados possíveis, incluindo os alcançados por ε-transições."""
-        estados_possiveis = set()
-        estados_a_processar = {self.estado_atual}
-
-        while estados_a_processar:
-            estado_atual = estados_a_processar.pop()
-            
-            # Verifica transições com o símbolo fornecido ou transições ε
-            chave_simbolo = (estado_atual, simbolo)
-            chave_epsilon = (estado_atual, 'ε')
-
-            # Adiciona os estados alcançados pela transição com símbolo
-            if chave_simbolo in self.transicoes:
-                estados_possiveis.update(self.transicoes[chave_simbolo])
-            
-            # Adiciona os estados alcançados por transições ε
-            if chave_epsilon in self.transicoes:
-                for novo_estado in self.transicoes[chave_epsilon]:
-                    if novo_estado not in estados_possiveis:
-                        estados_a_processar.add(novo_estado)
-
-        return estados_possiveis
+        # Configuração como máscara de bits: cada símbolo custa alguns OR por estado ativo
+        return self.automato.simular(cadeia)
 
+    def salvar_projeto(self):
+        nome_arquivo, _ = QFileDialog.getSaveFileName(self, "Salvar Projeto", "", "Arquivos de Texto (*.txt)")
+        if not nome_arquivo.endswith(".txt"):
+            nome_arquivo += ".txt"
     
-def salvar_projeto(self):
-    nome_arquivo, _ = QFileDialog.getSaveFileName(self, "Salvar Projeto", "", "Arquivos de Texto (*.txt)")
-    if not nome_arquivo.endswith(".txt"):
-        nome_arquivo += ".txt"
-    
-    if nome_arquivo:
-        with open(nome_arquivo, 'w') as f:
-            # Salvar estados
-            f.write("#states\n")
-            for estado in self.automato.estados:
-                f.write(f"{estado}\n")
+        if nome_arquivo:
+            with open(nome_arquivo, 'w') as f:
+                # Salvar estados
+                # Inicial e finais vêm dos campos de texto e podem não ter transições
+                finais = {estado for estado in self.automato.estados_finais if estado}
+                estados = set(self.automato.estados) | finais
+                if self.automato.estado_inicial_configurado is not None:
+                    estados.add(self.automato.estado_inicial_configurado)
+                f.write("#states\n")
+                for estado in estados:
+                    f.write(f"{estado}\n")
             
-            # Salvar estado inicial
-            f.write("#initial\n")
-            f.write(f"{self.automato.estado_inicial_configurado}\n")  # Use o estado inicial configurado
+                # Salvar estado inicial
+                f.write("#initial\n")
+                if self.automato.estado_inicial_configurado is not None:
+                    f.write(f"{self.automato.estado_inicial_configurado}\n")  # Use o estado inicial configurado
             
-            # Salvar estados finais
-            f.write("#accepting\n")
-            if self.automato.estados_finais:
-                f.write("\n".join(self.automato.estados_finais) + "\n")
+                # Salvar estados finais
+                f.write("#accepting\n")
+                if finais:
+                    f.write("\n".join(finais) + "\n")
             
-            # Salvar alfabeto
-            f.write("#alphabet\n")
-            alfabeto = {simbolo for (_, simbolo) in self.automato.transicoes.keys()}
-            for simbolo in alfabeto:
-                f.write(f"{'%' if simbolo == '%' else simbolo}\n")  # Salvar '%' para transições em vazio
+                # Salvar alfabeto
+                f.write("#alphabet\n")
+                alfabeto = {simbolo for (_, simbolo) in self.automato.transicoes.keys()}
+                for simbolo in alfabeto:
+                    f.write(f"{'%' if simbolo == '%' else simbolo}\n")  # Salvar '%' para transições em vazio
             
-            # Salvar transições
-            f.write("#transitions\n")
-            for (origem, simbolo), destinos in self.automato.transicoes.items():
-                for destino in destinos:
-                    f.write(f"{origem}:{'%' if simbolo == '%' else simbolo}>{destino}\n")
+                # Salvar transições
+                f.write("#transitions\n")
+                for (origem, simbolo), destinos in self.automato.transicoes.items():
+                    for destino in destinos:
+                        f.write(f"{origem}:{'%' if simbolo == '%' else simbolo}>{destino}\n")
+
+    def carregar_projeto(self):
+        nome_arquivo, _ = QFileDialog.getOpenFileName(self, "Carregar Projeto", "", "Autômatos (*.txt *.json)")
+        if nome_arquivo:
+            try:
+                # Leitura validada: vários destinos por símbolo e '%' são mantidos como estão
+                automato = Automato.carregar(nome_arquivo)
+            except (OSError, ValueError) as e:
+                self.label.setText(f"Erro ao carregar o autômato: {e}")
+                return
 
-def carregar_projeto(self):
-    nome_arquivo, _ = QFileDialog.getOpenFileName(self, "Carregar Projeto", "", "Arquivos de Texto (*.txt)")
-    if nome_arquivo:
+            self.controle.definir_linha(None)
+            self.linha = None
+            self.automato = automato
+            self.texto_configuracao = None  # Configuração a passar ao autômato novo
+            self.input_estado_inicial.setText(automato.estado_inicial_configurado or "")
+            self.input_estados_finais.setText(",".join(sorted(automato.estados_finais)))
+            self.configuracao = 0
+            self.estados_ativos = set()
+            self.label.setText(f"Autômato carregado: {len(automato.estados)} estados.")
+            self.simular_ao_digitar()
+            self.atualizar_cena()
+            self.visao.cena.destacar(self.estados_ativos)
+
+    def comparar_projeto(self):
+        nome_arquivo, _ = QFileDialog.getOpenFileName(self, "Comparar com Projeto", "", "Autômatos (*.txt *.json)")
+        if not nome_arquivo:
+            return
         try:
-            with open(nome_arquivo, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-                # Limpar espaços e quebras de linha extras
-                lines = [line.strip() for line in lines if line.strip()]
-
-                # Iniciar variáveis
-                estados = set()
-                transicoes = {}
-                estado_inicial = None
-                estados_finais = set()
-                alfabeto = set()
-
-                # Processar as linhas
-                section = None
-                for line in lines:
-                    if line.startswith("#"):
-                        section = line[1:].strip()  # Pega a seção após o #
-                    else:
-                        if section == "states":
-                            estados.add(line)
-                        elif section == "initial":
-                            estado_inicial = line
-                        elif section == "accepting":
-                            if line:
-                                estados_finais.add(line)
-                        elif section == "alphabet":
-                            alfabeto.add('%' if line == '%' else line)
-                        elif section == "transitions":
-                            origem, resto = line.split(":")
-                            simbolo, destino = resto.split(">")
-                            transicoes[(origem, '%' if simbolo == '%' else simbolo)] = destino
-
-                # Carregar no autômato
-                self.automato.estados = estados
-                self.automato.estado_atual = estado_inicial
-                self.automato.estados_finais = estados_finais
-                for (origem, simbolo), destino in transicoes.items():
-                    self.automato.adicionar_transicao(origem, simbolo if simbolo != '%' else 'ε', destino)
-
-                self.atualizar_interface()
-
-        except Exception as e:
-            print(f"Erro ao carregar o autômato: {e}")
-
-    def paintEvent(self):
-        qp = QPainter()
-        qp.begin(self)
-
-        qp.setFont(QFont("Arial", 10))
-        center_x, center_y = 400, 300  # Centro do círculo
-        radius = 200  # Raio do círculo
-
-        # Distribuir estados em um círculo
-        estados_pos = {}
-        num_estados = len(self.automato.estados)
-        angle_step = 2 * math.pi / num_estados if num_estados > 0 else 0
-        for i, estado in enumerate(self.automato.estados):
-            angle = i * angle_step
-            x = center_x + radius * math.cos(angle)
-            y = center_y + radius * math.sin(angle)
-            estados_pos[estado] = QPointF(x, y)
-
-        # Desenhar estados
-        for estado, pos in estados_pos.items():
-            if estado == self.automato.estado_atual:
-                qp.setBrush(Qt.green)  # Estado atual em verde
+            outro = Automato.carregar(nome_arquivo)
+        except (OSError, ValueError) as e:
+            self.label.setText(f"Erro ao carregar o autômato: {e}")
+            return
+        self.aplicar_configuracao()
+        # Motores montados aqui: o trabalho só lê as máscaras
+        atual, comparado = self.automato.motor(), outro.motor()
+
+        def mostrar(contraexemplo):
+            if contraexemplo is None:
+                self.label.setText("Os autômatos aceitam a mesma linguagem.")
             else:
-                qp.setBrush(Qt.white)  # Outros estados em branco
-
-            # Desenhar o círculo principal
-            qp.drawEllipse(pos, 20, 20)
-
-            # Desenhar círculo interno para estados finais
-            if estado in self.automato.estados_finais:
-                qp.setBrush(Qt.NoBrush)  # Não preencher o círculo interno
-                qp.drawEllipse(pos - QPointF(5, 5), 30, 30)  # Círculo maior
-
-            # Adicionar texto do estado
-            qp.setBrush(Qt.NoBrush)  # Sem preenchimento para texto
-            qp.drawText(int(pos.x() - 10), int(pos.y() + 5), estado)
-
-        # Desenhar transições com deslocamento
-        processed_transitions = {}  # Rastreamento de transições já desenhadas
-        for (origem, simbolo), destinos in self.automato.transicoes.items():
-            for destino in destinos:
-                origem_pos = estados_pos[origem]
-                destino_pos = estados_pos[destino]
-
-                # Deslocamento baseado em transições duplicadas
-                key = (origem, destino)
-                if key not in processed_transitions:
-                    processed_transitions[key] = 0
-                offset = 20 * processed_transitions[key]  # Incremento para transições sobrepostas
-                processed_transitions[key] += 1
-
-                # Adicionar deslocamento para evitar sobreposição
-                mid_x = (origem_pos.x() + destino_pos.x()) / 2
-                mid_y = (origem_pos.y() + destino_pos.y()) / 2
-                if origem != destino:
-                    mid_x += offset
-                    mid_y += offset
-                else:
-                    # Desenhar loops com curva
-                    qp.drawEllipse(origem_pos.x() - 30, origem_pos.y() - 60, 60, 40)
-
-                # Linha da transição (ajustada para loops e deslocamento)
-                if origem != destino:
-                    qp.drawLine(origem_pos, destino_pos)
-
-                # Desenhar símbolo próximo ao meio da linha ou na curva
-                simbolo_texto = "(ε)" if simbolo == 'ε' else simbolo
-                qp.drawText(int(mid_x), int(mid_y), simbolo_texto)
-
-                # Desenhar seta para indicar a direção
-                if origem != destino:
-                    line = QPointF(destino_pos.x() - origem_pos.x(), destino_pos.y() - origem_pos.y())
-                    angle = math.atan2(line.y(), line.x())
-                    end_x = destino_pos.x() - 20 * math.cos(angle)
-                    end_y = destino_pos.y() - 20 * math.sin(angle)
-                    arrow_size = 10
-                    arrow_angle = math.pi / 6
-                    arrow_x1 = end_x - arrow_size * math.cos(angle - arrow_angle)
-                    arrow_y1 = end_y - arrow_size * math.sin(angle - arrow_angle)
-                    arrow_x2 = end_x - arrow_size * math.cos(angle + arrow_angle)
-                    arrow_y2 = end_y - arrow_size * math.sin(angle + arrow_angle)
-                    qp.drawPolygon(QPointF(end_x, end_y), QPointF(arrow_x1, arrow_y1), QPointF(arrow_x2, arrow_y2))
-
-        qp.end()
-
+                cadeia = f"'{contraexemplo}'" if contraexemplo else "vazia"
+                aceito_por = "este autômato" if atual.simular(contraexemplo) else "o arquivo comparado"
+                self.label.setText(f"Linguagens diferentes: a cadeia {cadeia} só é aceita por {aceito_por}.")
+
+        self.label.setText("Comparando os autômatos...")
+        self.trabalhos.enviar('comparar', lambda progresso: equivalencia(atual, comparado), mostrar,
+                              lambda e: self.label.setText(f"Erro na comparação: {e}"))
+
+    def atualizar_cena(self):
+        """Remonta os itens da cena só se a estrutura do autômato mudou desde a última vez.
+
+        O layout roda no pool: pedidos seguidos (várias transições adicionadas) são
+        coalescidos e a cena é remontada quando as posições ficam prontas.
+        """
+        grafo = self.automato.grafo
+        finais = frozenset(self.automato.estados_finais)
+        chave = (id(self.automato), grafo.versao, finais)
+        if chave == self.chave_cena:
+            return
+        novo = self.chave_cena is None or self.chave_cena[0] != id(self.automato)
+        self.chave_cena = chave
+        if novo:
+            self.layout_forcas = LayoutIncremental()
+            self.enquadrar_pendente = True
+            alterados = None
+        else:
+            alterados = [grafo.ids[nome] for nome in self.alterados if nome in grafo.ids]
+        self.alterados = set()
+        nomes = list(grafo.nomes)
+        simbolos = grafo.simbolos
+        origens, rotulos, destinos = grafo.vetores()
+        transicoes = [(nomes[origem], simbolos[rotulo], nomes[destino])
+                      for origem, rotulo, destino in zip(origens, rotulos, destinos)]
+        layout = self.layout_forcas
+        origens, destinos = list(origens), list(destinos)
+
+        def posicionar(progresso):
+            return layout.atualizar(len(nomes), origens, destinos, alterados, progresso).tolist()
+
+        def montar(posicoes):
+            self.visao.cena.montar(nomes, transicoes, finais, posicoes)
+            if self.enquadrar_pendente:
+                self.visao.enquadrar()
+                self.enquadrar_pendente = False
+            self.visao.cena.destacar(self.estados_ativos)
+
+        self.trabalhos.enviar('layout', posicionar, montar,
+                              lambda e: self.label.setText(f"Erro no layout: {e}"))
+
+    def closeEvent(self, event):
+        self.trabalhos.cancelar()
+        self.trabalhos.esperar()
+        super().closeEvent(event)
 
 
 if __name__ == "__main__":
@@ -1,159 +1,13 @@
 import sys
-import os
-import json
-import graphviz
-from PyQt5 import QtWidgets, QtGui, QtCore
-from PyQt5.QtCore import QTimer
-
-
-# Classe para representar um estado do autômato
-class Estado:
-    def __init__(self, nome, final=False):
-        self.nome = nome
-        self.final = final
-        self.transicoes = {}  # { símbolo: estado }
-
-# Classe para representar um autômato
-class Automato:
-    def __init__(self, nome):
-        self.nome = nome
-        self.estados = {}
-        self.estado_inicial = None
-
-    def definir_estado_inicial(self, nome):
-        if nome in self.estados:
-            self.estado_inicial = self.estados[nome]
-        else:
-            raise ValueError(f"Estado inicial '{nome}' não existe no automato.")
-        
-    def adicionar_estado(self, nome, final=False):
-        estado = Estado(nome, final)
-        self.estados[nome] = estado
-        if self.estado_inicial is None:
-            self.estado_inicial = estado
-
-    def adicionar_transicao(self, origem, simbolo, destino):
-        if origem in self.estados and destino in self.estados:
-            self.estados[origem].transicoes[simbolo] = self.estados[destino]
-        else:
-            raise ValueError("Estado de origem ou destino não existe.")
-
-    def simular(self, cadeia):
-        estado_atual = self.estado_inicial
-        for simbolo in cadeia:
-            if simbolo in estado_atual.transicoes:
-                estado_atual = estado_atual.transicoes[simbolo]
-            else:
-                # Cadeia rejeitada
-                return False  
-                # Aceitar ou rejeitar baseado no estado final
-        return estado_atual.final  
-    
-    # Formatação requisitada do arquivo txt
-    def salvar(self, caminho):
-        with open(caminho, 'w') as f:
-            # Escrevendo estados
-            f.write("#states\n")
-            for estado in self.estados.values():
-                f.write(f"{estado.nome}\n")
-            # Escrevendo estado inicial
-            f.write("#initial\n")
-            f.write(f"{self.estado_inicial.nome}\n")
-            # Escrevendo estados de aceitação
-            f.write("#accepting\n")
-            for estado in self.estados.values():
-                if estado.final:
-                    f.write(f"{estado.nome}\n")
-            # Escrevendo alfabeto (obtendo a partir das transições)
-            f.write("#alphabet\n")
-            alfabeto = set(simbolo for estado in self.estados.values() for simbolo in estado.transicoes.keys())
-            for simbolo in sorted(alfabeto):
-                f.write(f"{simbolo}\n")
-            # Escrevendo transições
-            f.write("#transitions\n")
-            for estado in self.estados.values():
-                for simbolo, destino in estado.transicoes.items():
-                    f.write(f"{estado.nome}:{simbolo}>{destino.nome}\n")
-
-    @classmethod
-    def carregar(cls, caminho):
-        if not caminho.endswith('.txt'):
-            raise ValueError("O arquivo deve estar no formato .txt.")
-    
-        with open(caminho, 'r') as f:
-            linhas = f.readlines()
-            
-        automato = None
-        secao = None
-        for linha in linhas:
-            linha = linha.strip()
-            
-            # Mudança de seção
-            if linha.startswith("#"):
-                secao = linha
-                continue
-            
-            # Processando seções
-            if secao == "#states":
-                if automato is None:
-                    automato = cls("AutomatoCarregado")
-                automato.adicionar_estado(linha, final=False)
-            
-            elif secao == "#initial":
-                automato.definir_estado_inicial(linha)
-            
-            elif secao == "#accepting":
-                automato.estados[linha].final = True
-            
-            elif secao == "#alphabet":
-                pass  # Alfabeto não precisa ser armazenado explicitamente.
-            
-            elif secao == "#transitions":
-                origem, resto = linha.split(":")
-                simbolo, destino = resto.split(">")
-                automato.adicionar_transicao(origem, simbolo, destino)
-        return automato
-
-    def gerar_grafo(self, caminho_imagem):
-        caminho_imagem_sem_extensao = os.path.splitext(caminho_imagem)[0]
-        caminho_imagem_completo = os.path.abspath(caminho_imagem_sem_extensao)
-        dot = graphviz.Digraph(format='png')
-        dot.attr('node', shape='circle')
-
-        for estado in self.estados.values():
-            if estado.final:
-                dot.node(estado.nome, shape='doublecircle')
-            else:
-                dot.node(estado.nome)
-
-        for estado in self.estados.values():
-            for simbolo, destino in estado.transicoes.items():
-                dot.edge(estado.nome, destino.nome, label=simbolo)
-
-        # Estado inicial
-        if self.estado_inicial:
-            dot.node('', shape='none', label='')
-            dot.edge('', self.estado_inicial.nome)
-        # Cria grafico
-        dot.render(caminho_imagem_completo, cleanup=True)
-        # Verificar se a imagem foi criada com sucesso
-        caminho_imagem_final = caminho_imagem_completo + '.png'
-        if not os.path.exists(caminho_imagem_final):
-            raise FileNotFoundError(f"A imagem não foi criada no caminho: {caminho_imagem_final}")
-        
-    def simular_passo(self, cadeia):
-        estado_atual = self.estado_inicial
-        self.passos = []
-        for simbolo in cadeia:
-            if simbolo in estado_atual.transicoes:
-                estado_destino = estado_atual.transicoes[simbolo]
-                self.passos.append((estado_atual.nome, simbolo, estado_destino.nome))
-                estado_atual = estado_destino
-            else:
-                # Caso cadeia rejeitada
-                return False, self.passos 
-                # Aceitar ou rejeitar baseado no estado final
-        return estado_atual.final, self.passos 
+from PyQt5 import QtWidgets, QtGui, QtCore, QtSvg
+from nucleo.afd import Automato, carregar_automato
+from nucleo.cache_grafo import CacheGrafos, chave
+from nucleo.equivalencia import equivalencia_afd
+from nucleo.fluxo import simular_cadeia, simular_fluxo
+from nucleo.incremental import SimulacaoIncremental
+from nucleo.linha_do_tempo import LinhaDoTempo
+from controle_linha_do_tempo import ControleLinhaDoTempo
+from trabalhos import FilaTrabalhos
 
 
 # Classe interface gráfica com PyQt5
@@ -161,6 +15,15 @@ class App(QtWidgets.QWidget):
     def __init__(self):
         super().__init__()
         self.automato = None
+        self.passos = None  # Linha do tempo da simulação passo a passo (nomes decodificados ao exibir)
+        self.passo_atual = 0
+        # Simulação e renderização rodam em threads do pool, fora do laço de eventos
+        self.trabalhos = FilaTrabalhos(self)
+        # Imagens em SVG num cache fora da pasta de trabalho; o Qt redimensiona sem o graphviz
+        self.cache_grafos = CacheGrafos()
+        self.svg = None
+        # Resultado ao digitar: só o trecho depois da edição é simulado de novo
+        self.incremental = None
         self.initUI()
 
     def initUI(self):
@@ -215,22 +78,53 @@ class App(QtWidgets.QWidget):
         cadeia_layout = QtWidgets.QHBoxLayout()
         self.cadeia_entry = QtWidgets.QLineEdit()
         self.cadeia_entry.setPlaceholderText("Cadeia a ser testada")
+        self.cadeia_entry.textChanged.connect(self.simular_ao_digitar)
+        self.veredito_label = QtWidgets.QLabel("")
+        # Largura fixa: o campo não muda de tamanho a cada tecla
+        self.veredito_label.setMinimumWidth(self.veredito_label.fontMetrics().horizontalAdvance("✗ rejeitada") + 10)
         self.simular_button = QtWidgets.QPushButton("Simular")
         self.simular_button.clicked.connect(self.simular)
+        self.simular_arquivo_button = QtWidgets.QPushButton("Simular Arquivo")
+        self.simular_arquivo_button.clicked.connect(self.simular_arquivo)
+        self.simular_passo_button = QtWidgets.QPushButton("Passo a Passo")
+        self.simular_passo_button.clicked.connect(self.simular_passo_a_passo)
         cadeia_layout.addWidget(self.cadeia_entry)
+        cadeia_layout.addWidget(self.veredito_label)
         cadeia_layout.addWidget(self.simular_button)
+        cadeia_layout.addWidget(self.simular_passo_button)
+        cadeia_layout.addWidget(self.simular_arquivo_button)
         self.cadeia_group.setLayout(cadeia_layout)
         layout.addWidget(self.cadeia_group)
+        # Linha do tempo do passo a passo: avançar, voltar, saltar para um passo e velocidade
+        self.controle = ControleLinhaDoTempo(self)
+        self.controle.posicao_alterada.connect(self.mostrar_passo)
+        layout.addWidget(self.controle)
 
         # Exibição do resultado
         self.resultado_label = QtWidgets.QLabel("")
         self.resultado_label.setAlignment(QtCore.Qt.AlignCenter)
         layout.addWidget(self.resultado_label)
 
+        # Progresso dos trabalhos em segundo plano (visível só enquanto há algum)
+        self.progresso_widget = QtWidgets.QWidget()
+        progresso_layout = QtWidgets.QHBoxLayout()
+        progresso_layout.setContentsMargins(0, 0, 0, 0)
+        self.progresso_bar = QtWidgets.QProgressBar()
+        self.progresso_bar.setRange(0, 0)
+        self.cancelar_button = QtWidgets.QPushButton("Cancelar")
+        self.cancelar_button.clicked.connect(self.cancelar_trabalhos)
+        progresso_layout.addWidget(self.progresso_bar)
+        progresso_layout.addWidget(self.cancelar_button)
+        self.progresso_widget.setLayout(progresso_layout)
+        self.progresso_widget.hide()
+        self.trabalhos.ocupacao_alterada.connect(self.exibir_ocupacao)
+        layout.addWidget(self.progresso_widget)
+
         # Exibição da imagem do automato
         self.imagem_label = QtWidgets.QLabel("Imagem do autômato aparecerá aqui")
         self.imagem_label.setAlignment(QtCore.Qt.AlignCenter)
-        layout.addWidget(self.imagem_label)
+        self.imagem_label.setSizePolicy(QtWidgets.QSizePolicy.Ignored, QtWidgets.QSizePolicy.Ignored)
+        layout.addWidget(self.imagem_label, 1)
 
         # Grupo de gerenciamento de automatos (Salvar/Carregar)
         self.gerenciar_group = QtWidgets.QGroupBox("Gerenciar Autômatos")
@@ -241,9 +135,15 @@ class App(QtWidgets.QWidget):
         self.carregar_button.clicked.connect(self.carregar_automato)
         self.exibir_grafo_button = QtWidgets.QPushButton("Exibir Automato")
         self.exibir_grafo_button.clicked.connect(self.exibir_grafo)
+        self.minimizar_button = QtWidgets.QPushButton("Minimizar Automato")
+        self.minimizar_button.clicked.connect(self.minimizar_automato)
+        self.comparar_button = QtWidgets.QPushButton("Comparar com Arquivo")
+        self.comparar_button.clicked.connect(self.comparar_automato)
         gerenciar_layout.addWidget(self.salvar_button)
         gerenciar_layout.addWidget(self.carregar_button)
         gerenciar_layout.addWidget(self.exibir_grafo_button)
+        gerenciar_layout.addWidget(self.minimizar_button)
+        gerenciar_layout.addWidget(self.comparar_button)
         self.gerenciar_group.setLayout(gerenciar_layout)
         layout.addWidget(self.gerenciar_group)
         # Definindo o layout da janela
@@ -254,6 +154,7 @@ class App(QtWidgets.QWidget):
         if nome:
             self.automato = Automato(nome)
             self.resultado_label.setText(f"Automato '{nome}' criado com sucesso!")
+            self.simular_ao_digitar()
         else:
             self.resultado_label.setText("Insira um nome válido para o autômato.")
 
@@ -264,6 +165,7 @@ class App(QtWidgets.QWidget):
             if nome:
                 self.automato.adicionar_estado(nome, final)
                 self.resultado_label.setText(f"Estado '{nome}' adicionado com sucesso!")
+                self.simular_ao_digitar()
             else:
                 self.resultado_label.setText("Insira um nome válido para o estado.")
         else:
@@ -278,6 +180,7 @@ class App(QtWidgets.QWidget):
                 try:
                     self.automato.adicionar_transicao(origem, simbolo, destino)
                     self.resultado_label.setText(f"Transição adicionada: {origem} --{simbolo}--> {destino}")
+                    self.simular_ao_digitar()
                 except ValueError as e:
                     self.resultado_label.setText(str(e))
             else:
@@ -285,38 +188,110 @@ class App(QtWidgets.QWidget):
         else:
             self.resultado_label.setText("Crie um automato primeiro.")
     
+    def exibir_ocupacao(self, ocupada):
+        self.progresso_bar.setRange(0, 0)  # Indeterminado até o primeiro aviso de progresso
+        self.progresso_widget.setVisible(ocupada)
+
+    def mostrar_progresso(self, feito, total):
+        if total:
+            self.progresso_bar.setRange(0, 1000)
+            self.progresso_bar.setValue(feito * 1000 // total)
+
+    def cancelar_trabalhos(self):
+        self.trabalhos.cancelar()
+        self.resultado_label.setText("Operação cancelada.")
+
+    def simular_ao_digitar(self):
+        """Mostra se a cadeia digitada é aceita, resimulando só a partir da edição."""
+        if not self.automato:
+            self.veredito_label.setText("")
+            return
+        compilado = self.automato.compilar()
+        if self.incremental is None or self.incremental.motor is not compilado:
+            # Autômato novo ou alterado: as configurações guardadas não valem mais
+            self.incremental = SimulacaoIncremental(compilado)
+        self.incremental.atualizar(self.cadeia_entry.text())
+        self.veredito_label.setText("✓ aceita" if self.incremental.aceita() else "✗ rejeitada")
+
     def simular(self):
         if self.automato:
             cadeia = self.cadeia_entry.text()
             if cadeia:
-                resultado = self.automato.simular(cadeia)
-                if resultado:
-                    self.resultado_label.setText(f"A cadeia '{cadeia}' foi aceita pelo autômato.")
-                else:
-                    self.resultado_label.setText(f"A cadeia '{cadeia}' foi rejeitada pelo autômato.")
+                # Compilado aqui, na thread da interface; a thread do pool só lê a tabela pronta
+                compilado = self.automato.compilar()
+
+                def concluido(resultado):
+                    if resultado:
+                        self.resultado_label.setText(f"A cadeia '{cadeia}' foi aceita pelo autômato.")
+                    else:
+                        self.resultado_label.setText(f"A cadeia '{cadeia}' foi rejeitada pelo autômato.")
+
+                self.resultado_label.setText("Simulando...")
+                self.trabalhos.enviar('simulacao', lambda progresso: simular_cadeia(compilado, cadeia, progresso),
+                                      concluido, self.mostrar_erro, self.mostrar_progresso)
             else:
                 self.resultado_label.setText("Insira uma cadeia para simulação.")
         else:
             self.resultado_label.setText("Crie um automato primeiro.")
     
+    def simular_arquivo(self):
+        if self.automato:
+            caminho, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Simular Arquivo", "", "Todos os arquivos (*)")
+            if caminho:
+                compilado = self.automato.compilar()
+
+                def concluido(resultado):
+                    if resultado:
+                        self.resultado_label.setText(f"O conteúdo de '{caminho}' foi aceito pelo autômato.")
+                    else:
+                        self.resultado_label.setText(f"O conteúdo de '{caminho}' foi rejeitado pelo autômato.")
+
+                def falhou(e):
+                    if isinstance(e, (OSError, UnicodeDecodeError)):
+                        self.resultado_label.setText(f"Erro ao ler o arquivo: {str(e)}")
+                    else:
+                        self.mostrar_erro(e)
+
+                self.resultado_label.setText(f"Simulando '{caminho}'...")
+                self.trabalhos.enviar('simulacao',
+                                      lambda progresso: simular_fluxo(compilado, caminho, progresso=progresso),
+                                      concluido, falhou, self.mostrar_progresso)
+        else:
+            self.resultado_label.setText("Crie um automato primeiro.")
+
+    def mostrar_erro(self, e):
+        self.resultado_label.setText(f"Erro: {str(e)}")
+
     #### Função teste para simular a execução do autômato ##############
     #def simular(self):
 
 
-    def mostrar_passo(self):
-        if self.passo_atual < len(self.passos):
-            estado_nome, simbolo = self.passos[self.passo_atual]
-            self.resultado_label.setText(f"Passo {self.passo_atual + 1}: Estado '{estado_nome}', Símbolo: '{simbolo}'")
-            self.passo_atual += 1
+    def simular_passo_a_passo(self):
+        if self.automato:
+            cadeia = self.cadeia_entry.text()
+            # Pontos de controle a cada poucos símbolos: qualquer passo é recalculado a partir deles
+            self.passos = LinhaDoTempo(self.automato.compilar(), cadeia)
+            self.controle.definir_linha(self.passos)
+            self.controle.reproduzir()
         else:
+            self.resultado_label.setText("Crie um automato primeiro.")
+
+    def mostrar_passo(self, posicao):
+        self.passo_atual = posicao
+        linha = self.passos
+        if posicao < linha.fim:
+            # Só o passo exibido tem os nomes montados a partir dos ids
+            compilado = linha.motor
+            origem = linha.configuracao
+            destino = linha.configuracao_em(posicao + 1)
+            self.resultado_label.setText(f"Passo {posicao + 1}: Estado '{compilado.nomes[origem]}', "
+                                         f"Símbolo: '{linha.cadeia[posicao]}' -> "
+                                         f"'{compilado.nomes[destino] if destino != compilado.morto else '-'}'")
+        elif linha.aceita():
             # Exibe o resultado final após a última transição
-            if self.resultado_final:
-                self.resultado_label.setText("Cadeia aceita pelo autômato.")
-            else:
-                self.resultado_label.setText("Cadeia rejeitada pelo autômato.")
-            
-            # Para o timer após mostrar todos os passos
-            self.timer.stop()
+            self.resultado_label.setText("Cadeia aceita pelo autômato.")
+        else:
+            self.resultado_label.setText("Cadeia rejeitada pelo autômato.")
 
 
 
@@ -335,32 +310,113 @@ class App(QtWidgets.QWidget):
             try:
                 self.automato = Automato.carregar(caminho)
                 self.resultado_label.setText(f"Automato '{self.automato.nome}' carregado com sucesso!")
+                self.simular_ao_digitar()
             except Exception as e:
                 self.resultado_label.setText(f"Erro ao carregar o automato: {str(e)}")
 
 
+    def minimizar_automato(self):
+        if self.automato:
+            self.automato, relatorio = self.automato.minimizar()
+            self.resultado_label.setText(f"Automato minimizado. {relatorio}")
+            self.simular_ao_digitar()
+        else:
+            self.resultado_label.setText("Crie ou carregue um automato primeiro.")
+
+    def comparar_automato(self):
+        if not self.automato:
+            self.resultado_label.setText("Crie ou carregue um automato primeiro.")
+            return
+        caminho, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Comparar com Arquivo", "",
+                                                           "Autômatos (*.txt *.json *.afdb)")
+        if not caminho:
+            return
+        try:
+            outro = carregar_automato(caminho)
+        except Exception as e:
+            self.resultado_label.setText(f"Erro ao carregar o automato: {str(e)}")
+            return
+        # Formas compiladas montadas aqui: o trabalho só lê as tabelas
+        atual, comparado = self.automato.compilar(), outro.compilar()
+
+        def mostrar(contraexemplo):
+            if contraexemplo is None:
+                self.resultado_label.setText("Os autômatos aceitam a mesma linguagem.")
+            else:
+                cadeia = f"'{contraexemplo}'" if contraexemplo else "vazia"
+                aceito_por = "este automato" if atual.simular(contraexemplo) else "o arquivo comparado"
+                self.resultado_label.setText(f"Linguagens diferentes: a cadeia {cadeia} só é aceita por {aceito_por}.")
+
+        self.resultado_label.setText("Comparando os autômatos...")
+        self.trabalhos.enviar('comparar', lambda progresso: equivalencia_afd(atual, comparado),
+                              mostrar, self.mostrar_erro)
+
     def exibir_grafo(self):
         if self.automato:
-            caminho_imagem = "automato.png"
+            # Estrutura já renderizada (mesmo antes de edições desfeitas): nada de graphviz
+            chave_imagem = chave(self.automato.assinatura(), 'svg')
+            caminho = self.cache_grafos.obter(chave_imagem, 'svg')
+            if caminho:
+                try:
+                    with open(caminho, 'rb') as f:
+                        self.exibir_svg(f.read())
+                    return
+                except OSError:
+                    pass  # Apagado por outra instância: renderiza de novo
             try:
-                self.automato.gerar_grafo(caminho_imagem)
-                
-                # Forçar o carregamento da imagem e atualizar a QLabel
-                pixmap = QtGui.QPixmap()
-                pixmap.load(caminho_imagem)  # Usar load em vez de atribuir diretamente
-                if pixmap.isNull():
-                    self.resultado_label.setText("Erro ao carregar a imagem do autômato.")
-                else:
-                    self.imagem_label.setPixmap(pixmap)
-                    self.imagem_label.repaint()  # Forçar atualização da QLabel
-                    self.resultado_label.setText("Imagem do autômato gerada com sucesso.")
-            except FileNotFoundError as e:
-                self.resultado_label.setText(str(e))
+                # A descrição é montada aqui; o `dot` roda no pool
+                dot = self.automato.grafo_dot('svg')
             except Exception as e:
                 self.resultado_label.setText(f"Erro: {str(e)}")
+                return
+
+            def renderizar(progresso):
+                with open(self.cache_grafos.guardar(chave_imagem, 'svg', dot), 'rb') as f:
+                    return f.read()
+
+            def falhou(e):
+                if isinstance(e, FileNotFoundError):
+                    self.resultado_label.setText(str(e))
+                else:
+                    self.mostrar_erro(e)
+
+            self.resultado_label.setText("Gerando a imagem do autômato...")
+            self.trabalhos.enviar('grafo', renderizar, self.exibir_svg, falhou)
         else:
             self.resultado_label.setText("Crie ou carregue um automato primeiro.")
 
+    def exibir_svg(self, dados):
+        svg = QtSvg.QSvgRenderer(QtCore.QByteArray(dados))
+        if not svg.isValid():
+            self.resultado_label.setText("Erro ao carregar a imagem do autômato.")
+            return
+        self.svg = svg
+        self.desenhar_svg()
+        self.resultado_label.setText("Imagem do autômato gerada com sucesso.")
+
+    def desenhar_svg(self):
+        # Rasteriza o SVG no tamanho atual do rótulo, mantendo a proporção
+        tamanho = self.svg.defaultSize().scaled(self.imagem_label.size(), QtCore.Qt.KeepAspectRatio)
+        if tamanho.isEmpty():
+            return
+        pixmap = QtGui.QPixmap(tamanho)
+        pixmap.fill(QtCore.Qt.transparent)
+        pintor = QtGui.QPainter(pixmap)
+        self.svg.render(pintor)
+        pintor.end()
+        self.imagem_label.setPixmap(pixmap)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.svg is not None:
+            self.desenhar_svg()
+
+    def closeEvent(self, event):
+        # Não deixa threads do pool rodando depois que a janela fecha
+        self.trabalhos.cancelar()
+        self.trabalhos.esperar()
+        super().closeEvent(event)
+
 if __name__ == '__main__':
     app = QtWidgets.QApplication(sys.argv)
     ex = App()
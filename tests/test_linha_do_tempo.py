@@ -0,0 +1,26 @@
+from nucleo.afd import Automato
+from nucleo.linha_do_tempo import LinhaDoTempo
+
+
+def _motor():
+    # q0 -a-> q1, sem saída de q1: 'aaaaaaa' é rejeitada na posição 2
+    automato = Automato("parada")
+    automato.adicionar_estado("q0")
+    automato.adicionar_estado("q1", final=True)
+    automato.definir_estado_inicial("q0")
+    automato.adicionar_transicao("q0", "a", "q1")
+    return automato.compilar()
+
+
+def test_salto_e_passos_concordam_na_parada():
+    motor = _motor()
+    for cadeia in ("aaaaaaa", "a" * 40):
+        for intervalo in (1, 2, 3, 4, 8, 1024):
+            for destino in range(len(cadeia) + 1):
+                salto = LinhaDoTempo(motor, cadeia, intervalo=intervalo)
+                salto.ir_para(destino)
+                passos = LinhaDoTempo(motor, cadeia, intervalo=intervalo)
+                for _ in range(destino):
+                    passos.avancar()
+                assert (salto.parada, salto.fim) == (passos.parada, passos.fim) == (
+                    2 if destino >= 2 else None, 2), (cadeia, intervalo, destino)
@@ -0,0 +1,12 @@
+from nucleo.tempo_importacao import MODULOS, ORCAMENTO_MS, PROIBIDOS, medir
+
+
+def test_importacao_dentro_do_orcamento():
+    tempo, _ = medir(repeticoes=3)
+    assert tempo <= ORCAMENTO_MS, f"importação do núcleo levou {tempo:.1f} ms"
+
+
+def test_importacao_nao_carrega_interface():
+    # Cada medida roda num interpretador novo: o sys.modules deste processo não interfere
+    _, carregados = medir(('nucleo',) + MODULOS, repeticoes=1)
+    assert not carregados, f"{', '.join(carregados)} carregados (proibidos: {PROIBIDOS})"
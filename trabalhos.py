@@ -0,0 +1,120 @@
+"""Execução de simulações e renderizações fora da thread da interface (PyQt5).
+
+`FilaTrabalhos.enviar(chave, funcao, ...)` roda `funcao(progresso)` numa thread do
+`QThreadPool` e devolve o resultado por sinais, que o Qt entrega na thread da
+interface. Por chave, só um trabalho roda de cada vez: um envio novo cancela o que
+está rodando e fica à espera dele; envios repetidos nesse meio tempo substituem o
+que esperava, de modo que só o mais recente chega a rodar.
+
+O cancelamento é cooperativo: `progresso(feito, total)` levanta `Cancelado` quando o
+trabalho foi cancelado. Um trabalho que não chama `progresso` (como o `dot` do
+graphviz) roda até o fim, mas o resultado é descartado.
+"""
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class Cancelado(Exception):
+    """Levantada por `progresso` dentro de um trabalho cancelado."""
+
+
+class _Sinais(QObject):
+    progresso = pyqtSignal(int, int)
+    concluido = pyqtSignal(object)
+    falhou = pyqtSignal(object)
+    terminou = pyqtSignal()
+
+
+class _Trabalho(QRunnable):
+    def __init__(self, funcao):
+        super().__init__()
+        self.setAutoDelete(False)  # A fila guarda a referência até o sinal `terminou`
+        self.funcao = funcao
+        self.sinais = _Sinais()
+        self.cancelado = threading.Event()
+
+    def progresso(self, feito, total):
+        if self.cancelado.is_set():
+            raise Cancelado()
+        self.sinais.progresso.emit(feito, total)
+
+    def run(self):
+        try:
+            resultado = self.funcao(self.progresso)
+        except Cancelado:
+            pass
+        except Exception as e:
+            if not self.cancelado.is_set():
+                self.sinais.falhou.emit(e)
+        else:
+            if not self.cancelado.is_set():
+                self.sinais.concluido.emit(resultado)
+        finally:
+            self.sinais.terminou.emit()
+
+
+class FilaTrabalhos(QObject):
+    """Trabalhos identificados por chave, com progresso, cancelamento e coalescência."""
+    ocupacao_alterada = pyqtSignal(bool)  # emitido quando a fila começa ou deixa de ter trabalho
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool if pool is not None else QThreadPool.globalInstance()
+        self._atuais = {}     # chave -> _Trabalho rodando
+        self._pendentes = {}  # chave -> pedido mais recente à espera do atual
+
+    def enviar(self, chave, funcao, concluido=None, falhou=None, progresso=None):
+        """Agenda `funcao(progresso)`; `concluido(resultado)`, `falhou(erro)` e
+        `progresso(feito, total)` são chamados na thread da interface."""
+        pedido = (funcao, concluido, falhou, progresso)
+        atual = self._atuais.get(chave)
+        if atual is not None:
+            atual.cancelado.set()
+            self._pendentes[chave] = pedido
+            return
+        self._iniciar(chave, pedido)
+
+    def _iniciar(self, chave, pedido):
+        funcao, concluido, falhou, progresso = pedido
+        trabalho = _Trabalho(funcao)
+        if concluido:
+            trabalho.sinais.concluido.connect(concluido)
+        if falhou:
+            trabalho.sinais.falhou.connect(falhou)
+        if progresso:
+            trabalho.sinais.progresso.connect(progresso)
+        trabalho.sinais.terminou.connect(lambda: self._terminou(chave, trabalho))
+        ocupada = self.ocupada()
+        self._atuais[chave] = trabalho
+        self.pool.start(trabalho)
+        if not ocupada:
+            self.ocupacao_alterada.emit(True)
+
+    def _terminou(self, chave, trabalho):
+        if self._atuais.get(chave) is trabalho:
+            del self._atuais[chave]
+        pedido = self._pendentes.pop(chave, None)
+        if pedido is not None:
+            self._iniciar(chave, pedido)
+        elif not self.ocupada():
+            self.ocupacao_alterada.emit(False)
+
+    def ocupada(self, chave=None):
+        """Se há trabalho rodando ou à espera (com a `chave`, ou qualquer um)."""
+        if chave is None:
+            return bool(self._atuais or self._pendentes)
+        return chave in self._atuais or chave in self._pendentes
+
+    def cancelar(self, chave=None):
+        """Cancela o trabalho da `chave` (ou todos) e descarta o que estava à espera."""
+        chaves = list(self._atuais) if chave is None else [chave]
+        for chave in chaves:
+            self._pendentes.pop(chave, None)
+            atual = self._atuais.get(chave)
+            if atual is not None:
+                atual.cancelado.set()
+
+    def esperar(self, msecs=-1):
+        """Bloqueia até as threads do pool terminarem (ao fechar a janela)."""
+        return self.pool.waitForDone(msecs)